@@ -0,0 +1,66 @@
+"""
+Shared queries over loan_applications for the manager dashboard.
+Keyset pagination on (created_at, id), newest first, with status and date filters.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Columns needed to build ApplicationSummary
+SUMMARY_COLUMNS = "id,session_id,name,income_claimed,loan_amount,credit_score,final_status,created_at,updated_at"
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just after row in (created_at, id) order."""
+    payload = json.dumps({"created_at": row["created_at"], "id": row["id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Return the cursor's (created_at, id), re-serialized from a parsed timestamp and
+    UUID so nothing but those can reach the PostgREST filter string. Raises
+    ValueError when the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        created_at = datetime.fromisoformat(payload["created_at"])
+        row_id = uuid.UUID(payload["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    return created_at.isoformat(), str(row_id)
+
+
+def application_page_query(
+    supabase: Any,
+    columns: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Any:
+    """
+    Build a query for one page of applications, newest first.
+    The (created_at DESC, id DESC) composite index serves both the order and
+    the keyset condition.
+    """
+    query = supabase.table("loan_applications").select(columns)
+
+    if status:
+        query = query.eq("final_status", status)
+    if created_from:
+        query = query.gte("created_at", created_from.isoformat())
+    if created_to:
+        query = query.lt("created_at", created_to.isoformat())
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+        )
+
+    return query.order("created_at", desc=True).order("id", desc=True).limit(limit)
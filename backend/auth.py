@@ -1,48 +1,207 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from config import settings
-from database import get_supabase
+from database import get_supabase, run_query
+from password_hasher import password_hasher, pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.JWT_EXPIRATION_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+        expire = datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
+    # jti identifies the token in the revocation list
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except JWTError:
         return None
 
+
+@dataclass(frozen=True)
+class ManagerIdentity:
+    """The manager a verified token belongs to."""
+    id: str
+    email: str
+    token_id: str
+    expires_at: float
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified tokens keyed by SHA-256 of the token, so a token is only
+    decoded and its HMAC checked once. Entries are dropped when the token expires.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, ManagerIdentity]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[ManagerIdentity]:
+        with self._lock:
+            identity = self._entries.get(key)
+            if identity is None:
+                return None
+            if identity.expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return identity
+
+    def put(self, key: str, identity: ManagerIdentity) -> None:
+        with self._lock:
+            self._entries[key] = identity
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RevocationList:
+    """
+    Token ids revoked before they expire, e.g. on logout. Revocations are written to
+    the revoked_tokens table and every worker re-reads it at most every
+    TOKEN_REVOCATION_REFRESH_SECONDS, so a token revoked on one worker is rejected
+    everywhere within that interval (immediately on the worker that revoked it).
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._revoked: Dict[str, float] = {}
+        self._refreshed_at = float("-inf")
+
+    def is_revoked(self, token_id: str) -> bool:
+        return token_id in self._revoked
+
+    async def revoke(self, token_id: str, manager_id: str, expires_at: float) -> None:
+        self._revoked[token_id] = expires_at
+        supabase = get_supabase()
+        await run_query(supabase.table("revoked_tokens").upsert({
+            "token_id": token_id,
+            "manager_id": manager_id,
+            "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc).isoformat()
+        }))
+
+    async def refresh_if_stale(self) -> None:
+        now = time.monotonic()
+        if now - self._refreshed_at < self.refresh_seconds:
+            return
+        # Claim this refresh before awaiting so concurrent requests do not all query
+        self._refreshed_at = now
+        try:
+            supabase = get_supabase()
+            result = await run_query(
+                supabase.table("revoked_tokens").select("token_id,expires_at")
+                .gt("expires_at", datetime.utcnow().isoformat())
+            )
+        except Exception as e:
+            logger.error(f"Failed to refresh revoked tokens: {e}")
+            return
+
+        wall_now = time.time()
+        revoked = {token_id: expires_at for token_id, expires_at in self._revoked.items() if expires_at > wall_now}
+        for row in result.data or []:
+            try:
+                revoked[row["token_id"]] = datetime.fromisoformat(row["expires_at"]).timestamp()
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Skipping unreadable revoked_tokens row {row!r}: {e}")
+                if row.get("token_id"):
+                    # Still revoked; re-read on the next refresh
+                    revoked[row["token_id"]] = wall_now + self.refresh_seconds
+        self._revoked = revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+class TokenVerifier:
+    """Verifies manager tokens through the cache and the revocation list."""
+
+    def __init__(self, cache: VerifiedTokenCache, revocations: RevocationList):
+        self.cache = cache
+        self.revocations = revocations
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str) -> Optional[ManagerIdentity]:
+        key = self.token_key(token)
+        identity = self.cache.get(key, time.time())
+        if identity is None:
+            payload = verify_token(token)
+            if not payload or "id" not in payload:
+                return None
+            identity = ManagerIdentity(
+                id=str(payload["id"]),
+                email=payload.get("email", ""),
+                # Tokens issued without a jti are revoked by their hash
+                token_id=payload.get("jti") or key,
+                expires_at=float(payload["exp"])
+            )
+            self.cache.put(key, identity)
+
+        if self.revocations.is_revoked(identity.token_id):
+            return None
+        return identity
+
+    async def revoke(self, token: str, identity: ManagerIdentity) -> None:
+        self.cache.discard(self.token_key(token))
+        await self.revocations.revoke(identity.token_id, identity.id, identity.expires_at)
+
+
+token_verifier = TokenVerifier(
+    VerifiedTokenCache(settings.TOKEN_CACHE_SIZE),
+    RevocationList(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+)
+
 async def authenticate_manager(email: str, password: str) -> Optional[dict]:
     supabase = get_supabase()
 
-    result = supabase.table("managers").select("*").eq("email", email).maybe_single().execute()
+    result = await run_query(supabase.table("managers").select("*").eq("email", email).maybe_single())
 
     if not result.data:
         return None
 
     manager = result.data
 
-    if not verify_password(password, manager["password_hash"]):
+    # bcrypt runs in the password hashing pool; raises PasswordHasherBusy when it is full
+    verified, new_hash = await password_hasher.verify_and_update(password, manager["password_hash"])
+    if not verified:
         return None
 
+    if new_hash is not None:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it now that we know the password
+        await run_query(supabase.table("managers").update({"password_hash": new_hash}).eq("id", manager["id"]))
+
     return {
         "id": manager["id"],
         "email": manager["email"],
@@ -0,0 +1,143 @@
+"""
+Shared boto3 client factory
+Creates each AWS client on first use from one shared session, with connection pool
+sizes, timeouts and retry mode taken from settings. Clients are cached and safe to
+share across the blocking_pools threads; each service's connection pool is sized to
+its thread pool so calls never queue for a connection.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ClientSpec:
+    """How to build the client for one AWS service."""
+    region: str
+    max_pool_connections: int
+    read_timeout: float
+    endpoint_url: Optional[str] = None
+
+
+def client_specs() -> Dict[str, ClientSpec]:
+    return {
+        "bedrock-runtime": ClientSpec(settings.BEDROCK_REGION, settings.BEDROCK_POOL_SIZE, settings.BEDROCK_READ_TIMEOUT_SECONDS),
+        "textract": ClientSpec(settings.TEXTRACT_REGION, settings.TEXTRACT_POOL_SIZE, settings.AWS_READ_TIMEOUT_SECONDS),
+        "sagemaker-runtime": ClientSpec(settings.SAGEMAKER_REGION, settings.SAGEMAKER_POOL_SIZE, settings.SAGEMAKER_READ_TIMEOUT_SECONDS),
+        "s3": ClientSpec(settings.S3_REGION, settings.S3_POOL_SIZE, settings.AWS_READ_TIMEOUT_SECONDS, settings.S3_ENDPOINT_URL or None),
+        "sns": ClientSpec(settings.SNS_REGION, settings.SNS_POOL_SIZE, settings.AWS_READ_TIMEOUT_SECONDS),
+    }
+
+
+class PoolUsage:
+    """
+    Counts in-flight API calls for one client via botocore events. A synchronous
+    call holds one pooled connection for its duration, so in-flight calls at the
+    pool size means the next call opens a connection that is discarded afterwards.
+    """
+
+    def __init__(self, max_pool_connections: int):
+        self.max_pool_connections = max_pool_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.saturated_calls = 0
+        self._lock = threading.Lock()
+
+    def before_call(self, **kwargs: Any) -> None:
+        with self._lock:
+            if self.in_flight >= self.max_pool_connections:
+                self.saturated_calls += 1
+            self.in_flight += 1
+            self.calls += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def after_call(self, **kwargs: Any) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_pool_connections": self.max_pool_connections,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "calls": self.calls,
+                "saturated_calls": self.saturated_calls,
+                "utilization": round(self.in_flight / self.max_pool_connections, 3)
+            }
+
+
+class AWSClientFactory:
+    """Lazily created, cached boto3 clients built from one shared session."""
+
+    def __init__(self, specs: Dict[str, ClientSpec]):
+        self.specs = specs
+        self._session: Any = None
+        self._clients: Dict[str, Any] = {}
+        self._usage: Dict[str, PoolUsage] = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self) -> Any:
+        if self._session is None:
+            # boto3 is imported with the first client so processes that never call
+            # AWS (mock mode, workers without OCR) do not pay for it at startup
+            import boto3
+            self._session = boto3.session.Session(
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+                region_name=settings.AWS_REGION
+            )
+        return self._session
+
+    def _config(self, spec: ClientSpec) -> Any:
+        from botocore.config import Config
+        return Config(
+            max_pool_connections=spec.max_pool_connections,
+            connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=spec.read_timeout,
+            retries={"mode": settings.AWS_RETRY_MODE, "max_attempts": settings.AWS_MAX_ATTEMPTS},
+            tcp_keepalive=settings.AWS_TCP_KEEPALIVE
+        )
+
+    def get(self, service: str) -> Any:
+        """
+        Return the shared client for an AWS service, creating it on first use.
+
+        Session.client is not thread-safe, so creation happens under a lock; the
+        returned client is.
+        """
+        client = self._clients.get(service)
+        if client is not None:
+            return client
+
+        with self._lock:
+            if service not in self._clients:
+                spec = self.specs[service]
+                client = self._get_session().client(
+                    service,
+                    region_name=spec.region,
+                    endpoint_url=spec.endpoint_url,
+                    config=self._config(spec)
+                )
+                usage = PoolUsage(spec.max_pool_connections)
+                client.meta.events.register("before-call.*", usage.before_call)
+                client.meta.events.register("after-call.*", usage.after_call)
+                client.meta.events.register("after-call-error.*", usage.after_call)
+                self._usage[service] = usage
+                self._clients[service] = client
+                logger.info(f"{service} client created (max_pool_connections={spec.max_pool_connections})")
+            return self._clients[service]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Connection pool usage for every client created so far."""
+        return {service: usage.as_dict() for service, usage in list(self._usage.items())}
+
+
+aws_clients = AWSClientFactory(client_specs())
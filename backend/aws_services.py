@@ -3,35 +3,47 @@ AWS Services Integration Module
 Provides interfaces to AWS services: Bedrock, Textract, SageMaker, S3, SNS, CloudWatch
 """
 
-import boto3
+import asyncio
+import functools
 import json
 import logging
-from typing import Dict, Any, Optional
+import mimetypes
+import re
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+from aws_clients import aws_clients
 from config import settings
+from executors import blocking_pools
+from fake_textract import FakeTextractClient
+from micro_batcher import BatcherOverloaded, MicroBatcher
+from statement_parser import StatementStreamParser
+from textract_pipeline import TextractPipeline, line_confidence
 
 logger = logging.getLogger(__name__)
 
 
+def shared_client(service: str) -> Any:
+    """Shared client from aws_clients, or None if it cannot be created."""
+    try:
+        return aws_clients.get(service)
+    except Exception as e:
+        logger.error(f"Failed to initialize {service} client: {e}")
+        return None
+
+
 class BedrockService:
     """
     AWS Bedrock Integration for Conversational AI
     Used for chat and voice conversation logic
     """
     def __init__(self):
-        self.client = None
         self.model_id = settings.BEDROCK_MODEL_ID
-        if not settings.USE_MOCK_BEDROCK:
-            try:
-                self.client = boto3.client(
-                    'bedrock-runtime',
-                    region_name=settings.BEDROCK_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-                )
-                logger.info(f"Bedrock client initialized with model: {self.model_id}")
-            except Exception as e:
-                logger.error(f"Failed to initialize Bedrock client: {e}")
-                self.client = None
+
+    @property
+    def client(self) -> Any:
+        if settings.USE_MOCK_BEDROCK:
+            return None
+        return shared_client("bedrock-runtime")
 
     async def get_response(self, prompt: str, conversation_history: Optional[list] = None) -> str:
         """
@@ -61,18 +73,21 @@ class BedrockService:
                 Be polite and professional. Validate all inputs and ask for clarification if needed."""
             })
             
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=body
-            )
-            
-            response_body = json.loads(response['body'].read())
+            response_body = await blocking_pools.run("bedrock", self._invoke_model, body)
             return response_body['content'][0]['text']
         
         except Exception as e:
             logger.error(f"Bedrock API error: {e}")
             return self._mock_bedrock_response(prompt)
 
+    def _invoke_model(self, body: str) -> Dict[str, Any]:
+        """Blocking invoke_model call, including reading the streamed response body"""
+        response = self.client.invoke_model(
+            modelId=self.model_id,
+            body=body
+        )
+        return json.loads(response['body'].read())
+
     def _mock_bedrock_response(self, prompt: str) -> str:
         """Mock response for development/testing"""
         return f"Mock Bedrock Response: Understood. {prompt[:30]}... Processing..."
@@ -84,23 +99,31 @@ class TextractService:
     Used for Aadhaar and bank statement extraction
     """
     def __init__(self):
-        self.client = None
-        if not settings.USE_MOCK_TEXTRACT:
-            try:
-                self.client = boto3.client(
-                    'textract',
-                    region_name=settings.TEXTRACT_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-                )
-                logger.info("Textract client initialized")
-            except Exception as e:
-                logger.error(f"Failed to initialize Textract client: {e}")
-                self.client = None
+        self.fake_client = None
+        if settings.USE_MOCK_TEXTRACT and settings.TEXTRACT_FAKE_RECORDING:
+            self.fake_client = FakeTextractClient.from_file(settings.TEXTRACT_FAKE_RECORDING)
+            logger.info(f"Textract replaying {settings.TEXTRACT_FAKE_RECORDING}")
+
+    @property
+    def client(self) -> Any:
+        if settings.USE_MOCK_TEXTRACT:
+            return self.fake_client
+        return shared_client("textract")
+
+    @functools.cached_property
+    def pipeline(self) -> TextractPipeline:
+        return TextractPipeline(
+            self.client,
+            poll_interval=settings.TEXTRACT_POLL_INTERVAL_SECONDS,
+            max_poll_interval=settings.TEXTRACT_MAX_POLL_INTERVAL_SECONDS,
+            job_timeout=settings.TEXTRACT_JOB_TIMEOUT_SECONDS,
+            max_concurrent_jobs=settings.TEXTRACT_MAX_CONCURRENT_JOBS,
+            page_buffer=settings.TEXTRACT_PAGE_BUFFER
+        )
 
     async def extract_text_from_s3(self, bucket: str, key: str) -> Dict[str, Any]:
         """
-        Extract text from document in S3 using Textract
+        Extract text from a single-page document in S3 using Textract
         
         Args:
             bucket: S3 bucket name
@@ -109,11 +132,13 @@ class TextractService:
         Returns:
             Dictionary with extracted text and metadata
         """
-        if settings.USE_MOCK_TEXTRACT or self.client is None:
+        if self.client is None:
             return self._mock_textract_extraction()
         
         try:
-            response = self.client.detect_document_text(
+            response = await blocking_pools.run(
+                "textract",
+                self.client.detect_document_text,
                 Document={
                     'S3Object': {
                         'Bucket': bucket,
@@ -127,16 +152,49 @@ class TextractService:
                 if item['BlockType'] == 'LINE':
                     extracted_text.append(item['Text'])
             
+            stats = line_confidence(response['Blocks'])
             return {
                 "success": True,
                 "extracted_text": "\n".join(extracted_text),
-                "confidence": response['Blocks'][0].get('Confidence', 0.95)
+                "confidence": stats["confidence"],
+                "min_confidence": stats["min_confidence"]
             }
         
         except Exception as e:
             logger.error(f"Textract API error: {e}")
             return self._mock_textract_extraction()
 
+    async def extract_document_from_s3(self, bucket: str, key: str) -> Dict[str, Any]:
+        """
+        Extract text from a multi-page document (e.g. a PDF) with an asynchronous Textract job
+
+        Returns:
+            Dictionary with extracted text, page count and line confidence (mean and min)
+        """
+        if self.client is None:
+            return self._mock_textract_extraction()
+
+        try:
+            return {"success": True, **await self.pipeline.extract_text(bucket, key)}
+        except Exception as e:
+            logger.error(f"Textract job error: {e}")
+            return {"success": False, "extracted_text": "", "confidence": 0.0, "error": str(e)}
+
+    async def parse_bank_statement_from_s3(self, bucket: str, key: str) -> Dict[str, Any]:
+        """
+        OCR a bank statement and parse it page by page as Textract results arrive
+
+        Returns:
+            Dictionary with parsed (statement_parser output), pages and ocr confidence
+        """
+        if self.client is None:
+            mock = self._mock_textract_extraction()
+            parser = StatementStreamParser()
+            parser.feed(mock["extracted_text"])
+            return {"parsed": parser.close(), "pages": 1, "ocr": {"confidence": mock["confidence"]}}
+
+        return await self.pipeline.parse_bank_statement(bucket, key)
+
     def _mock_textract_extraction(self) -> Dict[str, Any]:
         """Mock extraction for development"""
         return {
@@ -152,61 +210,91 @@ class SageMakerService:
     Used for loan eligibility prediction
     """
     def __init__(self):
-        self.client = None
         self.endpoint_name = settings.SAGEMAKER_ENDPOINT_NAME
         self.use_local_model = settings.USE_LOCAL_ML_MODEL
-        
-        if not settings.USE_MOCK_SAGEMAKER and not self.use_local_model:
-            try:
-                self.client = boto3.client(
-                    'sagemaker-runtime',
-                    region_name=settings.SAGEMAKER_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-                )
-                logger.info(f"SageMaker client initialized with endpoint: {self.endpoint_name}")
-            except Exception as e:
-                logger.error(f"Failed to initialize SageMaker client: {e}")
-                self.client = None
+        self.batcher = MicroBatcher(
+            self._invoke_batch,
+            max_batch_size=settings.SAGEMAKER_MAX_BATCH_SIZE,
+            window_ms=settings.SAGEMAKER_BATCH_WINDOW_MS,
+            max_queue_size=settings.SAGEMAKER_MAX_QUEUE_SIZE,
+            max_concurrent_batches=settings.SAGEMAKER_MAX_CONCURRENT_BATCHES,
+            timeout_seconds=settings.SAGEMAKER_REQUEST_TIMEOUT_SECONDS,
+            runner=functools.partial(blocking_pools.run, "sagemaker")
+        )
+
+    @property
+    def remote(self) -> bool:
+        """True when scoring should go to the SageMaker endpoint instead of the local model."""
+        return not (settings.USE_MOCK_SAGEMAKER or self.use_local_model)
+
+    @property
+    def client(self) -> Any:
+        if not self.remote:
+            return None
+        return shared_client("sagemaker-runtime")
 
     async def predict_eligibility(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """
         Get eligibility prediction from SageMaker
+
+        Concurrent calls are micro-batched into a single invoke_endpoint request
+        with many instances, sent from a worker thread off the event loop.
         
         Args:
             features: Dictionary with credit_score, income, loan_amount, emi, employment_type
             
         Returns:
             Dictionary with eligibility_score, eligible flag, and explanation
+
+        Raises:
+            BatcherOverloaded: the batch queue stayed full (callers can answer 503)
+            TimeoutError: no result within SAGEMAKER_REQUEST_TIMEOUT_SECONDS
         """
+        # Mock scores only stand in when no endpoint is configured; a real endpoint's
+        # backpressure, timeouts and errors must not come back as made-up scores
         if settings.USE_MOCK_SAGEMAKER or self.client is None:
             return self._mock_prediction(features)
-        
+
+        # Prepare features in format expected by model
+        feature_vector = [
+            features.get('credit_score', 0),
+            features.get('income_extracted', 0),
+            features.get('loan_amount', 0),
+            features.get('emi_detected', 0)
+        ]
+
         try:
-            # Prepare features in format expected by model
-            feature_vector = [
-                features.get('credit_score', 0),
-                features.get('income_extracted', 0),
-                features.get('loan_amount', 0),
-                features.get('emi_detected', 0)
-            ]
-            
-            response = self.client.invoke_endpoint(
-                EndpointName=self.endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps({'instances': [feature_vector]})
-            )
-            
-            result = json.loads(response['Body'].read().decode())
-            
-            return {
-                "eligibility_score": result.get('predictions', [[0.5]])[0][0],
-                "eligible": result.get('predictions', [[0.5]])[0][0] >= 0.65
-            }
-        
+            return await self.batcher.submit(feature_vector)
+        except (BatcherOverloaded, TimeoutError, asyncio.TimeoutError):
+            raise
         except Exception as e:
             logger.error(f"SageMaker API error: {e}")
-            return self._mock_prediction(features)
+            raise
+
+    def _invoke_batch(self, feature_vectors: List[List[Any]]) -> List[Dict[str, Any]]:
+        """Blocking call scoring many feature vectors with one invoke_endpoint request"""
+        response = self.client.invoke_endpoint(
+            EndpointName=self.endpoint_name,
+            ContentType='application/json',
+            Body=json.dumps({'instances': feature_vectors})
+        )
+        
+        result = json.loads(response['Body'].read().decode())
+        predictions = result.get('predictions') if isinstance(result, dict) else None
+        if not isinstance(predictions, list) or len(predictions) != len(feature_vectors):
+            raise ValueError(f"SageMaker returned no predictions list for {len(feature_vectors)} instances")
+
+        scores = [p[0] if isinstance(p, list) and p else p for p in predictions]
+        if not all(isinstance(score, (int, float)) and not isinstance(score, bool) for score in scores):
+            raise ValueError("SageMaker returned a non-numeric prediction")
+
+        return [
+            {
+                "eligibility_score": score,
+                "eligible": score >= 0.65
+            }
+            for score in scores
+        ]
 
     def _mock_prediction(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """Mock prediction for development"""
@@ -217,70 +305,281 @@ class SageMakerService:
         }
 
 
+# Document kinds that can be uploaded; each gets its own prefix under the session
+UPLOAD_DOCUMENT_TYPES = ("aadhaar", "bank_statement")
+
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class UploadRequestError(ValueError):
+    pass
+
+
+class S3UnavailableError(Exception):
+    pass
+
+
+def upload_content_type(extension: str) -> Tuple[str, str]:
+    """Normalise an extension from ALLOWED_UPLOAD_EXTENSIONS and return it with its content type."""
+    extension = extension.lower().lstrip(".")
+    if extension not in settings.ALLOWED_UPLOAD_EXTENSIONS:
+        allowed = ", ".join(settings.ALLOWED_UPLOAD_EXTENSIONS)
+        raise UploadRequestError(f"Unsupported file extension '{extension}'. Allowed: {allowed}")
+    content_type, _ = mimetypes.guess_type(f"document.{extension}")
+    return extension, content_type or "application/octet-stream"
+
+
+def upload_prefix(session_id: str) -> str:
+    if not SESSION_ID_PATTERN.match(session_id):
+        raise UploadRequestError("Invalid session_id")
+    return f"applications/{session_id}/"
+
+
+def document_key(session_id: str, file_type: str, extension: str, document_id: str) -> str:
+    if file_type not in UPLOAD_DOCUMENT_TYPES:
+        raise UploadRequestError(f"Unsupported file_type '{file_type}'. Allowed: {', '.join(UPLOAD_DOCUMENT_TYPES)}")
+    return f"{upload_prefix(session_id)}{file_type}/{document_id}.{extension}"
+
+
+def check_session_key(session_id: str, key: str) -> None:
+    """Reject keys outside the session's own prefix."""
+    if not key.startswith(upload_prefix(session_id)) or ".." in key:
+        raise UploadRequestError("Key does not belong to this session")
+
+
 class S3Service:
     """
     AWS S3 Integration for Document Storage
-    Used for uploading and managing Aadhaar and bank statements
+    Used for uploading and managing Aadhaar and bank statements.
+    Clients upload straight to the bucket with presigned requests; document bytes
+    never pass through the API.
     """
     def __init__(self):
-        self.client = None
         self.bucket_name = settings.S3_BUCKET_NAME
-        if not settings.USE_MOCK_S3:
-            try:
-                self.client = boto3.client(
-                    's3',
-                    region_name=settings.S3_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-                )
-                logger.info(f"S3 client initialized with bucket: {self.bucket_name}")
-            except Exception as e:
-                logger.error(f"Failed to initialize S3 client: {e}")
-                self.client = None
 
-    async def generate_presigned_upload_url(self, session_id: str, file_type: str) -> Dict[str, Any]:
+    @property
+    def client(self) -> Any:
+        if settings.USE_MOCK_S3:
+            return None
+        return shared_client("s3")
+
+    def _require_client(self) -> None:
+        if self.client is None:
+            raise S3UnavailableError("S3 is not configured")
+
+    async def generate_presigned_upload_url(self, session_id: str, file_type: str, extension: str = "pdf") -> Dict[str, Any]:
         """
-        Generate presigned URL for direct upload to S3
+        Generate a presigned POST for direct upload to S3
         
         Args:
             session_id: Application session ID
             file_type: Type of file (aadhaar, bank_statement)
+            extension: File extension, one of ALLOWED_UPLOAD_EXTENSIONS
             
         Returns:
-            Dictionary with upload URL and metadata
+            Dictionary with upload URL, form fields to post with the file, and metadata.
+            The policy pins the content type and caps the size at MAX_FILE_SIZE.
+
+        Raises:
+            S3UnavailableError: the client could not be created or signing failed;
+                a mock URL is only returned with USE_MOCK_S3
         """
-        if settings.USE_MOCK_S3 or self.client is None:
-            return self._mock_presigned_url(session_id, file_type)
-        
+        extension, content_type = upload_content_type(extension)
+        document_id = str(uuid.uuid4())
+        key = document_key(session_id, file_type, extension, document_id)
+
+        if settings.USE_MOCK_S3:
+            return self._mock_presigned_url(key, document_id, content_type)
+        self._require_client()
+
         try:
-            key = f"applications/{session_id}/{file_type}/document.pdf"
-            
-            url = self.client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': key
-                },
+            # Signing is local, but the first call may resolve credentials over the network
+            post = await blocking_pools.run(
+                "s3",
+                self.client.generate_presigned_post,
+                Bucket=self.bucket_name,
+                Key=key,
+                Fields={"Content-Type": content_type},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    ["content-length-range", 1, settings.MAX_FILE_SIZE]
+                ],
                 ExpiresIn=settings.S3_UPLOAD_EXPIRATION
             )
             
             return {
-                "upload_url": url,
+                "upload_url": post["url"],
+                "fields": post["fields"],
                 "bucket": self.bucket_name,
                 "key": key,
+                "document_id": document_id,
+                "content_type": content_type,
+                "max_size": settings.MAX_FILE_SIZE,
                 "expires_in": settings.S3_UPLOAD_EXPIRATION
             }
         
         except Exception as e:
             logger.error(f"S3 presigned URL generation error: {e}")
-            return self._mock_presigned_url(session_id, file_type)
+            raise S3UnavailableError(f"Could not sign the upload: {e}") from e
+
+    def _presign_parts(self, key: str, upload_id: str, part_numbers: List[int]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "part_number": part_number,
+                "upload_url": self.client.generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': self.bucket_name,
+                        'Key': key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number
+                    },
+                    ExpiresIn=settings.S3_UPLOAD_EXPIRATION
+                )
+            }
+            for part_number in part_numbers
+        ]
+
+    async def create_multipart_upload(
+        self,
+        session_id: str,
+        file_type: str,
+        extension: str,
+        size: int
+    ) -> Dict[str, Any]:
+        """
+        Start a multipart upload for a large scan
 
-    def _mock_presigned_url(self, session_id: str, file_type: str) -> Dict[str, Any]:
+        Returns:
+            Dictionary with upload_id, key, part_size, part_count and presigned URLs
+            for the first S3_MULTIPART_URL_BATCH parts; fetch the rest with
+            presign_upload_parts
+        """
+        self._require_client()
+        extension, content_type = upload_content_type(extension)
+        if size > settings.MAX_FILE_SIZE:
+            raise UploadRequestError(f"File exceeds {settings.MAX_FILE_SIZE} bytes")
+
+        part_size = max(settings.S3_MULTIPART_PART_SIZE, S3_MIN_PART_SIZE, -(-size // S3_MAX_PARTS))
+        part_count = max(1, -(-size // part_size))
+        document_id = str(uuid.uuid4())
+        key = document_key(session_id, file_type, extension, document_id)
+
+        response = await blocking_pools.run(
+            "s3",
+            self.client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+            ContentType=content_type
+        )
+        upload_id = response["UploadId"]
+        first_batch = list(range(1, min(part_count, settings.S3_MULTIPART_URL_BATCH) + 1))
+        parts = await blocking_pools.run("s3", self._presign_parts, key, upload_id, first_batch)
+
+        return {
+            "upload_id": upload_id,
+            "bucket": self.bucket_name,
+            "key": key,
+            "document_id": document_id,
+            "content_type": content_type,
+            "part_size": part_size,
+            "part_count": part_count,
+            "parts": parts,
+            "expires_in": settings.S3_UPLOAD_EXPIRATION
+        }
+
+    async def presign_upload_parts(self, session_id: str, key: str, upload_id: str, part_numbers: List[int]) -> List[Dict[str, Any]]:
+        """Presign a batch of up to S3_MULTIPART_URL_BATCH part uploads"""
+        self._require_client()
+        check_session_key(session_id, key)
+        if len(part_numbers) > settings.S3_MULTIPART_URL_BATCH:
+            raise UploadRequestError(f"At most {settings.S3_MULTIPART_URL_BATCH} parts per request")
+        if any(not 1 <= part_number <= S3_MAX_PARTS for part_number in part_numbers):
+            raise UploadRequestError(f"Part numbers must be between 1 and {S3_MAX_PARTS}")
+        return await blocking_pools.run("s3", self._presign_parts, key, upload_id, part_numbers)
+
+    async def complete_multipart_upload(
+        self,
+        session_id: str,
+        key: str,
+        upload_id: str,
+        parts: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Assemble the uploaded parts. Parts are uploaded straight to S3, so the
+        assembled size is checked here and oversized objects are deleted.
+        """
+        self._require_client()
+        from botocore.exceptions import ClientError  # boto3 is loaded by now
+        check_session_key(session_id, key)
+        try:
+            response = await blocking_pools.run(
+                "s3",
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [
+                    {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                    for part in sorted(parts, key=lambda part: part["part_number"])
+                ]}
+            )
+            head = await blocking_pools.run("s3", self.client.head_object, Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            raise UploadRequestError(f"Could not complete upload: {e.response['Error'].get('Message', e)}")
+
+        if head["ContentLength"] > settings.MAX_FILE_SIZE:
+            await blocking_pools.run("s3", self.client.delete_object, Bucket=self.bucket_name, Key=key)
+            raise UploadRequestError(f"File exceeds {settings.MAX_FILE_SIZE} bytes")
+
+        return {
+            "bucket": self.bucket_name,
+            "key": key,
+            "size": head["ContentLength"],
+            "etag": response.get("ETag")
+        }
+
+    async def object_etag(self, key: str) -> Optional[str]:
+        """ETag of an uploaded object, or None when S3 is not configured or the object is missing"""
+        if self.client is None:
+            return None
+        from botocore.exceptions import ClientError  # boto3 is loaded by now
+        try:
+            head = await blocking_pools.run("s3", self.client.head_object, Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            logger.warning(f"Could not read ETag of {key}: {e}")
+            return None
+        return head.get("ETag")
+
+    async def abort_multipart_upload(self, session_id: str, key: str, upload_id: str) -> None:
+        """Abort an upload and let S3 discard its parts"""
+        self._require_client()
+        from botocore.exceptions import ClientError  # boto3 is loaded by now
+        check_session_key(session_id, key)
+        try:
+            await blocking_pools.run(
+                "s3",
+                self.client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id
+            )
+        except ClientError as e:
+            raise UploadRequestError(f"Could not abort upload: {e.response['Error'].get('Message', e)}")
+
+    def _mock_presigned_url(self, key: str, document_id: str, content_type: str) -> Dict[str, Any]:
         """Mock presigned URL for development"""
         return {
-            "upload_url": f"https://mock-s3-{settings.S3_BUCKET_NAME}.s3.amazonaws.com/{session_id}/{file_type}",
+            "upload_url": f"https://mock-s3-{settings.S3_BUCKET_NAME}.s3.amazonaws.com/",
+            "fields": {"key": key, "Content-Type": content_type},
             "bucket": settings.S3_BUCKET_NAME,
-            "key": f"applications/{session_id}/{file_type}/document.pdf",
+            "key": key,
+            "document_id": document_id,
+            "content_type": content_type,
+            "max_size": settings.MAX_FILE_SIZE,
             "expires_in": settings.S3_UPLOAD_EXPIRATION
         }
 
@@ -290,20 +589,11 @@ class SNSService:
     AWS SNS Integration for Notifications
     Sends SMS and email notifications
     """
-    def __init__(self):
-        self.client = None
-        if not settings.USE_MOCK_SNS and (settings.ENABLE_SMS_NOTIFICATIONS or settings.ENABLE_EMAIL_NOTIFICATIONS):
-            try:
-                self.client = boto3.client(
-                    'sns',
-                    region_name=settings.SNS_REGION,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-                )
-                logger.info("SNS client initialized")
-            except Exception as e:
-                logger.error(f"Failed to initialize SNS client: {e}")
-                self.client = None
+    @property
+    def client(self) -> Any:
+        if settings.USE_MOCK_SNS or not (settings.ENABLE_SMS_NOTIFICATIONS or settings.ENABLE_EMAIL_NOTIFICATIONS):
+            return None
+        return shared_client("sns")
 
     async def send_sms(self, phone_number: str, message: str) -> bool:
         """Send SMS notification"""
@@ -316,7 +606,9 @@ class SNSService:
             return True
         
         try:
-            self.client.publish(
+            await blocking_pools.run(
+                "sns",
+                self.client.publish,
                 TopicArn=settings.SNS_TOPIC_ARN_SMS,
                 Message=message,
                 PhoneNumber=phone_number
@@ -338,7 +630,9 @@ class SNSService:
             return True
         
         try:
-            self.client.publish(
+            await blocking_pools.run(
+                "sns",
+                self.client.publish,
                 TopicArn=settings.SNS_TOPIC_ARN_EMAIL,
                 Subject=subject,
                 Message=message
@@ -0,0 +1,168 @@
+"""
+Write-behind persistence for chat_history
+Chat messages are queued in process and flushed to Supabase in bulk inserts,
+so users get their reply without waiting on audit logging.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from config import settings
+from database import get_supabase, run_query
+
+logger = logging.getLogger(__name__)
+
+
+class ChatHistoryWriter:
+    """
+    Bounded queue of chat_history rows with a single flusher task.
+
+    A batch is flushed when batch_size rows are waiting or flush_interval_ms has
+    passed since its first row. One flusher writes batches strictly in queue order
+    and every row carries a client-side timestamp that only moves forward, so
+    per-session message order survives the bulk insert. Failed flushes are retried
+    with exponential backoff before the batch is dropped and logged.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_ms: float = 200.0,
+        max_retries: int = 5,
+        retry_backoff_seconds: float = 0.5,
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+        self.rows_flushed = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+        self._last_timestamp = datetime.min
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = loop.create_task(self._run())
+
+    def _next_timestamp(self) -> str:
+        now = datetime.utcnow()
+        if now <= self._last_timestamp:
+            now = self._last_timestamp + timedelta(microseconds=1)
+        self._last_timestamp = now
+        return now.isoformat()
+
+    async def enqueue(self, session_id: str, role: str, message: str) -> None:
+        """Queue one chat_history row; waits only when the queue is full."""
+        self.start()
+        await self._queue.put({
+            "session_id": session_id,
+            "role": role,
+            "message": message,
+            "timestamp": self._next_timestamp()
+        })
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        supabase = get_supabase()
+
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                await run_query(supabase.table("chat_history").insert(rows))
+            except Exception as e:
+                self.flush_failures += 1
+                if attempt == self.max_retries:
+                    self.rows_dropped += len(rows)
+                    logger.error(f"Dropping {len(rows)} chat_history rows after {attempt + 1} attempts: {e}")
+                    return
+                delay = self.retry_backoff_seconds * (2 ** attempt)
+                logger.warning(f"chat_history flush failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            return
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Drain queued rows (up to timeout seconds) and stop the flusher."""
+        if self._worker is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"chat_history drain timed out with {self._queue.qsize()} rows queued")
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth(),
+            "queue_capacity": self.max_queue_size,
+            "rows_flushed": self.rows_flushed,
+            "rows_dropped": self.rows_dropped,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2)
+        }
+
+
+chat_history_writer = ChatHistoryWriter(
+    max_queue_size=settings.CHAT_HISTORY_QUEUE_SIZE,
+    batch_size=settings.CHAT_HISTORY_BATCH_SIZE,
+    flush_interval_ms=settings.CHAT_HISTORY_FLUSH_INTERVAL_MS,
+    max_retries=settings.CHAT_HISTORY_MAX_RETRIES
+)
@@ -1,5 +1,19 @@
-from typing import Dict, Any, Optional
-from database import get_supabase
+from typing import Dict, Any, Optional, Tuple
+from chat_history_writer import chat_history_writer
+from config import settings
+from database import get_supabase, run_query
+from session_cache import session_state_cache
+
+# Only the fields the conversation state machine reads, plus the row version
+STATE_COLUMNS = "name,income_claimed,loan_amount,employment_type,credit_score,updated_at"
+
+# Reloads allowed when the row keeps changing under a turn
+MAX_TURN_ATTEMPTS = 3
+
+
+class StaleSessionState(Exception):
+    """Raised when the application changed under every attempt at a chat turn."""
+
 
 class ChatService:
     """
@@ -8,7 +22,7 @@ class ChatService:
     """
 
     def __init__(self):
-        self.conversation_state = {}
+        self.conversation_state = session_state_cache
 
     async def process_message(self, session_id: str, user_message: str) -> Dict[str, Any]:
         """
@@ -21,50 +35,75 @@ class ChatService:
         4. Ask for employment type
         5. Ask for credit score
         6. Complete → redirect to document upload
+
+        Session state is served from the session cache when present, so a turn
+        costs at most one write on the request path; on a cache miss the
+        projected select adds a second round trip. The write only applies if the
+        row's updated_at still matches the state's, so state cached before another
+        worker (or writer) changed the row is reloaded and the turn recomputed.
         """
-        supabase = get_supabase()
+        application = await self.conversation_state.get(session_id)
+
+        for _ in range(MAX_TURN_ATTEMPTS):
+            if application is None:
+                application = await self.load_state(session_id)
+                if application is None:
+                    return {"response": "Session not found. Please start a new session.", "next_step": None}
 
-        result = supabase.table("loan_applications").select("*").eq("session_id", session_id).maybe_single().execute()
+            response_text, next_step, updates = self.reply(application, user_message)
+            applied, updated_at = await self.commit_turn(session_id, user_message, response_text, updates,
+                                                         application.get("updated_at"))
+            if applied:
+                break
+
+            await self.conversation_state.invalidate(session_id)
+            application = None
+        else:
+            raise StaleSessionState(f"Application for session {session_id} kept changing during the chat turn")
 
-        if not result.data:
-            return {"response": "Session not found. Please start a new session.", "next_step": None}
+        application.update(updates)
+        application["updated_at"] = updated_at
+        await self.conversation_state.set(session_id, application)
 
-        application = result.data
+        return {"response": response_text, "next_step": next_step}
 
-        supabase.table("chat_history").insert({
-            "session_id": session_id,
-            "role": "user",
-            "message": user_message
-        }).execute()
+    async def load_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        supabase = get_supabase()
+        result = await run_query(supabase.table("loan_applications").select(STATE_COLUMNS).eq("session_id", session_id).maybe_single())
+        return result.data if result and result.data else None
 
+    @staticmethod
+    def reply(application: Dict[str, Any], user_message: str) -> Tuple[str, Optional[str], Dict[str, Any]]:
+        """Response text, next step and the field (if any) collected from this message."""
         response_text = ""
         next_step = None
+        updates: Dict[str, Any] = {}
 
         if not application.get("name"):
-            supabase.table("loan_applications").update({"name": user_message}).eq("session_id", session_id).execute()
+            updates["name"] = user_message
             response_text = f"Nice to meet you, {user_message}! What is your monthly income?"
         elif application.get("income_claimed") is None:
             try:
                 income = float(user_message.replace(",", "").replace("₹", "").replace("$", "").strip())
-                supabase.table("loan_applications").update({"income_claimed": income}).eq("session_id", session_id).execute()
+                updates["income_claimed"] = income
                 response_text = "Great! How much loan amount are you looking for?"
             except ValueError:
                 response_text = "Please enter a valid income amount (e.g., 50000)"
         elif application.get("loan_amount") is None:
             try:
                 loan_amount = float(user_message.replace(",", "").replace("₹", "").replace("$", "").strip())
-                supabase.table("loan_applications").update({"loan_amount": loan_amount}).eq("session_id", session_id).execute()
+                updates["loan_amount"] = loan_amount
                 response_text = "What is your employment type? (e.g., Salaried, Self-Employed, Business)"
             except ValueError:
                 response_text = "Please enter a valid loan amount (e.g., 500000)"
         elif not application.get("employment_type"):
-            supabase.table("loan_applications").update({"employment_type": user_message}).eq("session_id", session_id).execute()
+            updates["employment_type"] = user_message
             response_text = "What is your credit score? (If you don't know, you can estimate between 300-900)"
         elif application.get("credit_score") is None:
             try:
                 credit_score = int(user_message.strip())
                 if 300 <= credit_score <= 900:
-                    supabase.table("loan_applications").update({"credit_score": credit_score}).eq("session_id", session_id).execute()
+                    updates["credit_score"] = credit_score
                     response_text = "Thank you! I have collected all the information. Next, please upload your Aadhaar and bank statement for verification."
                     next_step = "upload_documents"
                 else:
@@ -75,12 +114,47 @@ class ChatService:
             response_text = "Your information is complete. Please proceed to document upload."
             next_step = "upload_documents"
 
-        supabase.table("chat_history").insert({
-            "session_id": session_id,
-            "role": "assistant",
-            "message": response_text
-        }).execute()
+        return response_text, next_step, updates
 
-        return {"response": response_text, "next_step": next_step}
+    async def commit_turn(self, session_id: str, user_message: str, response_text: str,
+                          updates: Dict[str, Any], expected_updated_at: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Persist one conversation turn if the application is still at expected_updated_at.
+
+        With CHAT_HISTORY_WRITE_BEHIND the collected field (if any) is written
+        directly with an updated_at filter and both messages go to the write-behind
+        queue; a turn that collects nothing only picks the prompt and is not checked.
+        Otherwise the commit_chat_turn function checks the version, inserts both
+        chat_history rows and applies the field in one transaction.
+
+        Returns:
+            (applied, updated_at after the turn); applied is False when the row
+            changed since the state was read or no longer exists
+        """
+        supabase = get_supabase()
+
+        if settings.CHAT_HISTORY_WRITE_BEHIND:
+            updated_at = expected_updated_at
+            if updates:
+                query = supabase.table("loan_applications").update(updates).eq("session_id", session_id)
+                if expected_updated_at is not None:
+                    query = query.eq("updated_at", expected_updated_at)
+                result = await run_query(query)
+                if not result.data:
+                    return False, None
+                updated_at = result.data[0].get("updated_at")
+            await chat_history_writer.enqueue(session_id, "user", user_message)
+            await chat_history_writer.enqueue(session_id, "assistant", response_text)
+            return True, updated_at
+
+        result = await run_query(supabase.rpc("commit_chat_turn", {
+            "p_session_id": session_id,
+            "p_user_message": user_message,
+            "p_assistant_message": response_text,
+            "p_updates": updates,
+            "p_expected_updated_at": expected_updated_at
+        }))
+        outcome = result.data or {}
+        return bool(outcome.get("applied")), outcome.get("updated_at")
 
 chat_service = ChatService()
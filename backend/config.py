@@ -6,6 +6,9 @@ import json
 # Load environment variables from .env file
 load_dotenv()
 
+# Relative file settings (e.g. JOB_SQLITE_PATH) resolve here rather than against the cwd
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
 class Settings:
     # ====================
     # Server Configuration
@@ -28,6 +31,11 @@ class Settings:
     JWT_SECRET: str = os.getenv("JWT_SECRET", "change-this-secret-key-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRATION_HOURS: int = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))  # verified tokens kept decoded
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # raising it rehashes on next login
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))  # 0 = one per CPU core
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))  # waiting checks before 503
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "30"))
 
     # Default manager (testing only - CHANGE IN PRODUCTION)
     DEFAULT_MANAGER_EMAIL: str = os.getenv("DEFAULT_MANAGER_EMAIL", "admin@loanbank.com")
@@ -40,17 +48,33 @@ class Settings:
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
+    # Client tuning; each client's connection pool matches its thread pool size below
+    AWS_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AWS_CONNECT_TIMEOUT_SECONDS", "3"))
+    AWS_READ_TIMEOUT_SECONDS: float = float(os.getenv("AWS_READ_TIMEOUT_SECONDS", "30"))
+    AWS_RETRY_MODE: str = os.getenv("AWS_RETRY_MODE", "adaptive")  # legacy, standard or adaptive
+    AWS_MAX_ATTEMPTS: int = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+    AWS_TCP_KEEPALIVE: bool = os.getenv("AWS_TCP_KEEPALIVE", "True").lower() == "true"
 
     # ====================
     # AWS Bedrock (Conversational AI)
     # ====================
     BEDROCK_REGION: str = os.getenv("BEDROCK_REGION", "us-east-1")
     BEDROCK_MODEL_ID: str = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-v2")
+    BEDROCK_READ_TIMEOUT_SECONDS: float = float(os.getenv("BEDROCK_READ_TIMEOUT_SECONDS", "120"))  # long generations
 
     # ====================
     # AWS Textract (Document OCR)
     # ====================
     TEXTRACT_REGION: str = os.getenv("TEXTRACT_REGION", "us-east-1")
+    TEXTRACT_POLL_INTERVAL_SECONDS: float = float(os.getenv("TEXTRACT_POLL_INTERVAL_SECONDS", "1.0"))
+    TEXTRACT_MAX_POLL_INTERVAL_SECONDS: float = float(os.getenv("TEXTRACT_MAX_POLL_INTERVAL_SECONDS", "5.0"))
+    TEXTRACT_JOB_TIMEOUT_SECONDS: float = float(os.getenv("TEXTRACT_JOB_TIMEOUT_SECONDS", "300"))
+    TEXTRACT_MAX_CONCURRENT_JOBS: int = int(os.getenv("TEXTRACT_MAX_CONCURRENT_JOBS", "4"))
+    TEXTRACT_PAGE_BUFFER: int = int(os.getenv("TEXTRACT_PAGE_BUFFER", "4"))
+    TEXTRACT_SNS_TOPIC_ARN: str = os.getenv("TEXTRACT_SNS_TOPIC_ARN", "")
+    TEXTRACT_SNS_ROLE_ARN: str = os.getenv("TEXTRACT_SNS_ROLE_ARN", "")
+    # Recorded block JSON replayed by fake_textract when USE_MOCK_TEXTRACT is on
+    TEXTRACT_FAKE_RECORDING: str = os.getenv("TEXTRACT_FAKE_RECORDING", "")
 
     # ====================
     # AWS SageMaker (ML Model)
@@ -59,6 +83,15 @@ class Settings:
     SAGEMAKER_ENDPOINT_NAME: str = os.getenv("SAGEMAKER_ENDPOINT_NAME", "loan-eligibility-endpoint")
     USE_LOCAL_ML_MODEL: bool = os.getenv("USE_LOCAL_ML_MODEL", "True").lower() == "true"
     ML_MODEL_PATH: str = os.getenv("ML_MODEL_PATH", "./loan_model.pkl")
+    # /manager/model/reload only loads artifacts from this directory (joblib unpickles them)
+    ML_MODEL_DIR: str = os.getenv("ML_MODEL_DIR", "") or os.path.dirname(ML_MODEL_PATH) or "."
+    SAGEMAKER_BATCH_WINDOW_MS: float = float(os.getenv("SAGEMAKER_BATCH_WINDOW_MS", "5"))
+    SAGEMAKER_MAX_BATCH_SIZE: int = int(os.getenv("SAGEMAKER_MAX_BATCH_SIZE", "32"))
+    SAGEMAKER_MAX_QUEUE_SIZE: int = int(os.getenv("SAGEMAKER_MAX_QUEUE_SIZE", "1000"))
+    SAGEMAKER_MAX_CONCURRENT_BATCHES: int = int(os.getenv("SAGEMAKER_MAX_CONCURRENT_BATCHES", "4"))
+    SAGEMAKER_REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("SAGEMAKER_REQUEST_TIMEOUT_SECONDS", "2"))
+    SAGEMAKER_READ_TIMEOUT_SECONDS: float = float(os.getenv("SAGEMAKER_READ_TIMEOUT_SECONDS", "5"))
+    EXPLANATION_CACHE_SIZE: int = int(os.getenv("EXPLANATION_CACHE_SIZE", "10000"))
 
     # ====================
     # AWS S3 (Document Storage)
@@ -66,6 +99,10 @@ class Settings:
     S3_REGION: str = os.getenv("S3_REGION", "us-east-1")
     S3_BUCKET_NAME: str = os.getenv("S3_BUCKET_NAME", "loan-documents-bucket")
     S3_UPLOAD_EXPIRATION: int = int(os.getenv("S3_UPLOAD_EXPIRATION", "3600"))
+    # Point at an S3-compatible stand-in (moto server, MinIO) for local runs
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
+    S3_MULTIPART_PART_SIZE: int = int(os.getenv("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024)))
+    S3_MULTIPART_URL_BATCH: int = int(os.getenv("S3_MULTIPART_URL_BATCH", "20"))
 
     # ====================
     # AWS Connect (Voice Integration)
@@ -105,6 +142,48 @@ class Settings:
     USE_MOCK_S3: bool = os.getenv("USE_MOCK_S3", "True").lower() == "true"
     USE_MOCK_SNS: bool = os.getenv("USE_MOCK_SNS", "True").lower() == "true"
 
+    # ====================
+    # Chat Session State Cache
+    # ====================
+    SESSION_CACHE_SIZE: int = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+    SESSION_CACHE_TTL_SECONDS: int = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "900"))
+
+    # ====================
+    # Document Result Cache
+    # ====================
+    DOCUMENT_CACHE_SIZE: int = int(os.getenv("DOCUMENT_CACHE_SIZE", "1000"))
+    DOCUMENT_CACHE_DIR: str = os.getenv("DOCUMENT_CACHE_DIR", "")  # empty disables the on-disk store
+
+    # ====================
+    # Chat History Write-Behind
+    # ====================
+    CHAT_HISTORY_WRITE_BEHIND: bool = os.getenv("CHAT_HISTORY_WRITE_BEHIND", "True").lower() == "true"
+    CHAT_HISTORY_QUEUE_SIZE: int = int(os.getenv("CHAT_HISTORY_QUEUE_SIZE", "10000"))
+    CHAT_HISTORY_BATCH_SIZE: int = int(os.getenv("CHAT_HISTORY_BATCH_SIZE", "200"))
+    CHAT_HISTORY_FLUSH_INTERVAL_MS: float = float(os.getenv("CHAT_HISTORY_FLUSH_INTERVAL_MS", "200"))
+    CHAT_HISTORY_MAX_RETRIES: int = int(os.getenv("CHAT_HISTORY_MAX_RETRIES", "5"))
+
+    # ====================
+    # Background Jobs
+    # ====================
+    JOB_STORE: str = os.getenv("JOB_STORE", "sqlite")  # sqlite or supabase
+    JOB_SQLITE_PATH: str = os.path.join(BACKEND_DIR, os.getenv("JOB_SQLITE_PATH", "jobs.db"))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))  # 0 = enqueue only, run worker.py separately
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5"))
+
+    # ====================
+    # Blocking I/O Thread Pools
+    # ====================
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "32"))
+    S3_POOL_SIZE: int = int(os.getenv("S3_POOL_SIZE", "16"))
+    TEXTRACT_POOL_SIZE: int = int(os.getenv("TEXTRACT_POOL_SIZE", "8"))
+    BEDROCK_POOL_SIZE: int = int(os.getenv("BEDROCK_POOL_SIZE", "16"))
+    SAGEMAKER_POOL_SIZE: int = int(os.getenv("SAGEMAKER_POOL_SIZE", "8"))
+    SNS_POOL_SIZE: int = int(os.getenv("SNS_POOL_SIZE", "4"))
+
     # ====================
     # CORS Configuration
     # ====================
@@ -121,7 +200,34 @@ class Settings:
     # ====================
     ALLOWED_UPLOAD_EXTENSIONS: List[str] = ["pdf", "jpg", "jpeg", "png"]
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB
+    BULK_DECISION_MAX_ITEMS: int = int(os.getenv("BULK_DECISION_MAX_ITEMS", "500"))  # per /manager/decisions call
     RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", "100"))
     RATE_LIMIT_WINDOW_SECONDS: int = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    # Per-route budgets charged on top of the default one: path=[ip|session|manager:]requests/seconds
+    RATE_LIMIT_ROUTES: str = os.getenv(
+        "RATE_LIMIT_ROUTES",
+        "/chat-input=session:30/60,/voice-webhook=session:60/60,/start-session=ip:20/60,/manager/login=ip:10/60"
+    )
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = [
+        path for path in os.getenv("RATE_LIMIT_EXEMPT_PATHS", "/,/docs,/redoc,/openapi.json").split(",") if path
+    ]
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "False").lower() == "true"  # behind a proxy/ALB
+
+    # ====================
+    # Metrics
+    # ====================
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")  # required when enabled; scrapers send it as a bearer token
+
+    # ====================
+    # Profiling (manager-only)
+    # ====================
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    PROFILER_MAX_SECONDS: float = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+    PROFILER_MIN_INTERVAL_MS: float = float(os.getenv("PROFILER_MIN_INTERVAL_MS", "1"))
+    PROFILE_HISTORY_SIZE: int = int(os.getenv("PROFILE_HISTORY_SIZE", "20"))  # per-request reports kept
+    PROFILE_TOP_FUNCTIONS: int = int(os.getenv("PROFILE_TOP_FUNCTIONS", "60"))  # rows per report
 
 settings = Settings()
@@ -1,14 +1,27 @@
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Any
 from config import settings
+from executors import blocking_pools
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Global supabase client instance
-supabase: Client = None
+supabase: "Client" = None
+_init_lock = threading.Lock()
 
 def initialize_supabase():
     """Initialize Supabase client - called only when needed"""
     global supabase
-    if supabase is None:
+    if supabase is not None:
+        return supabase
+    with _init_lock:
+        if supabase is not None:
+            return supabase
         try:
+            # Imported here: supabase pulls in httpx, gotrue and postgrest, which adds
+            # a quarter second to startup for processes that never query
+            from supabase import create_client
             supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
             print("✅ Supabase initialized successfully")
         except Exception as e:
@@ -18,6 +31,22 @@ def initialize_supabase():
             raise
     return supabase
 
-def get_supabase() -> Client:
+def get_supabase() -> "Client":
     """Get Supabase client instance - initializes if needed"""
     return initialize_supabase()
+
+def query_operation(query: Any) -> str:
+    """Metrics label for a query builder, e.g. "GET loan_applications" or "POST rpc/claim_jobs" """
+    # postgrest keeps path and method on the builder, or on builder.request in newer releases
+    request = getattr(query, "request", query)
+    path = str(getattr(request, "path", "")).rstrip("/")
+    method = getattr(request, "http_method", "")
+    method = getattr(method, "value", method)
+    parent, _, table = path.rpartition("/")
+    if parent.endswith("/rpc"):
+        table = f"rpc/{table}"
+    return f"{method} {table or 'unknown'}".strip()
+
+async def run_query(query: Any) -> Any:
+    """Execute a supabase-py query builder in the DB thread pool"""
+    return await blocking_pools.run_operation("db", query_operation(query), query.execute)
@@ -0,0 +1,76 @@
+"""
+Manager decisions on loan applications
+Applies approve/reject decisions through the decide_applications database function:
+one round trip and one set-based UPDATE for the whole batch, with optimistic
+concurrency on updated_at and an application_decisions audit row per change.
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import get_supabase, run_query
+from session_cache import session_state_cache
+
+DECISION_STATUSES = ("approved", "rejected")
+
+# (application_id, status, expected_updated_at or None to skip the check)
+Decision = Tuple[str, str, Optional[str]]
+
+
+def _canonical_id(value: str) -> Optional[str]:
+    """The id as Postgres prints a uuid, or None if it is not one."""
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        return None
+
+
+class DecisionService:
+
+    async def apply(self, manager_id: str, decisions: List[Decision]) -> List[Dict[str, Any]]:
+        """
+        Apply decisions and return one result per distinct application id, in request
+        order, with outcome "applied", "conflict" (updated_at no longer matched) or
+        "not_found". When an id appears twice the last decision wins.
+        """
+        # Keyed by canonical id so differently formatted duplicates collapse too
+        latest: Dict[str, Decision] = {}
+        for decision in decisions:
+            if decision[1] not in DECISION_STATUSES:
+                raise ValueError(f"Unknown decision {decision[1]!r}; expected one of {DECISION_STATUSES}")
+            latest[_canonical_id(decision[0]) or decision[0]] = decision
+
+        # Malformed ids cannot match a row and would fail the uuid cast in the function
+        payload = [
+            {"id": key, "status": status, "expected_updated_at": expected}
+            for key, (_, status, expected) in latest.items()
+            if _canonical_id(key)
+        ]
+        rows: Dict[str, Dict[str, Any]] = {}
+        if payload:
+            supabase = get_supabase()
+            result = await run_query(supabase.rpc("decide_applications", {
+                "p_manager_id": manager_id,
+                "p_decisions": payload
+            }))
+            rows = {str(row["application_id"]): row for row in result.data or []}
+
+        results = []
+        for key, (application_id, _, _) in latest.items():
+            row = rows.get(key)
+            if row is None:
+                results.append({"application_id": application_id, "outcome": "not_found",
+                                "final_status": None, "updated_at": None})
+                continue
+            if row["outcome"] == "applied":
+                await session_state_cache.invalidate(row.get("session_id"))
+            results.append({
+                "application_id": application_id,
+                "outcome": row["outcome"],
+                "final_status": row.get("final_status"),
+                "updated_at": row.get("updated_at")
+            })
+        return results
+
+
+decision_service = DecisionService()
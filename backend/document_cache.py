@@ -0,0 +1,137 @@
+"""
+Document Result Cache
+Keeps extraction results keyed by a hash of the document content, so repeated
+uploads and client retries skip re-parsing (and, once documents are OCR'd,
+re-OCR). Shared by Aadhaar verification and bank statement processing.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Union
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction logic changes so stale on-disk results are not reused
+EXTRACTION_VERSION = "1"
+
+
+def content_key(kind: str, content: Union[str, bytes]) -> str:
+    """Cache key for a document of the given kind ('aadhaar', 'bank_statement', ...)."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{kind}-v{EXTRACTION_VERSION}-{digest}"
+
+
+def object_key(kind: str, bucket: str, key: str, etag: str) -> str:
+    """Cache key for an S3 object's extraction; the ETag changes whenever the object does."""
+    digest = hashlib.sha256(f"{bucket}/{key}:{etag}".encode("utf-8")).hexdigest()
+    return f"{kind}-v{EXTRACTION_VERSION}-s3-{digest}"
+
+
+class DocumentResultCache:
+    """
+    Bounded, thread-safe LRU of extraction results with an optional on-disk
+    store under cache_dir. Results must be JSON-serializable; callers get a
+    copy, so mutating a returned result never changes the cached one.
+    """
+
+    def __init__(self, max_size: int, cache_dir: Optional[str] = None):
+        self.max_size = max_size
+        self.cache_dir = cache_dir or None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable document cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist document cache entry {key}: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+
+        if result is None:
+            result = self._read_disk(key)
+            if result is not None:
+                self._remember(key, result)
+
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(result)
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        result = copy.deepcopy(result)
+        self._remember(key, result)
+        self._write_disk(key, result)
+
+    def get_or_compute(
+        self,
+        kind: str,
+        content: Union[str, bytes],
+        compute: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Return the cached result for this document, computing and storing it on a miss."""
+        key = content_key(kind, content)
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.set(key, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+document_result_cache = DocumentResultCache(
+    settings.DOCUMENT_CACHE_SIZE,
+    settings.DOCUMENT_CACHE_DIR
+)
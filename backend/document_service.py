@@ -1,20 +1,34 @@
 import re
-import random
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
+
+from document_cache import document_result_cache
+from statement_parser import StatementStreamParser, parse_statement
+
+
+class DocumentTooLargeError(Exception):
+    pass
+
 
 class DocumentService:
     """
     Service for document processing and verification.
+    Results are cached by document content, so re-uploads skip extraction.
     TODO: Integrate AWS Textract for OCR
     TODO: Integrate AWS Voice ID for voice verification
     """
 
+    def __init__(self):
+        self.cache = document_result_cache
+
     def verify_aadhaar(self, document_text: str) -> Dict[str, Any]:
         """
         Verify Aadhaar document.
         Currently uses simple text matching.
         TODO: Replace with AWS Textract OCR
         """
+        return self.cache.get_or_compute("aadhaar", document_text, lambda: self._verify_aadhaar(document_text))
+
+    def _verify_aadhaar(self, document_text: str) -> Dict[str, Any]:
         aadhaar_keywords = ["aadhaar", "aadhar", "government of india", "unique identification"]
 
         document_lower = document_text.lower()
@@ -44,50 +58,62 @@ class DocumentService:
     def process_bank_statement(self, document_text: str) -> Dict[str, Any]:
         """
         Process bank statement to extract income and EMI.
-        Currently uses simple pattern matching and dummy data.
+        Transactions are classified in one pass by statement_parser.
         TODO: Replace with AWS Textract + intelligent parsing
-        """
-        income_patterns = [
-            r'salary\s*credit\s*[:\-]?\s*₹?\s*([\d,]+)',
-            r'credit\s*[:\-]?\s*₹?\s*([\d,]+)',
-            r'income\s*[:\-]?\s*₹?\s*([\d,]+)'
-        ]
-
-        emi_patterns = [
-            r'emi\s*[:\-]?\s*₹?\s*([\d,]+)',
-            r'loan\s*debit\s*[:\-]?\s*₹?\s*([\d,]+)',
-            r'debit\s*[:\-]?\s*₹?\s*([\d,]+)'
-        ]
-
-        income_extracted = 0.0
-        emi_detected = 0.0
 
-        document_lower = document_text.lower()
-
-        for pattern in income_patterns:
-            matches = re.findall(pattern, document_lower, re.IGNORECASE)
-            if matches:
-                amounts = [float(m.replace(",", "")) for m in matches]
-                income_extracted = max(amounts)
-                break
-
-        for pattern in emi_patterns:
-            matches = re.findall(pattern, document_lower, re.IGNORECASE)
-            if matches:
-                amounts = [float(m.replace(",", "")) for m in matches]
-                emi_detected = sum(amounts) / len(amounts)
-                break
-
-        if income_extracted == 0:
-            income_extracted = random.uniform(30000, 80000)
+        Returns:
+            Dictionary with income_extracted and emi_detected (None when not found),
+            status ('complete', 'partial' or 'not_found'), confidence (0-1),
+            transactions and message
+        """
+        return self.cache.get_or_compute(
+            "bank_statement", document_text, lambda: self._process_bank_statement(document_text)
+        )
+
+    def _process_bank_statement(self, document_text: str) -> Dict[str, Any]:
+        return self.statement_result(parse_statement(document_text))
+
+    async def process_bank_statement_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        max_size: int
+    ) -> Dict[str, Any]:
+        """
+        Process a bank statement uploaded as a stream of UTF-8 chunks.
 
-        if emi_detected == 0:
-            emi_detected = random.uniform(5000, 20000)
+        Chunks are parsed as they arrive, keeping only running totals, so memory
+        stays bounded whatever the statement size. Transactions are not returned.
+        Raises DocumentTooLargeError as soon as more than max_size bytes arrive.
+        """
+        parser = StatementStreamParser()
+        async for chunk in chunks:
+            if parser.bytes_read + len(chunk) > max_size:
+                raise DocumentTooLargeError(f"Document exceeds {max_size} bytes")
+            parser.feed(chunk)
+        return self.statement_result(parser.close())
+
+    def statement_result(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        income = parsed["income"]
+        emi = parsed["emi"]
+
+        if income is not None and emi is not None:
+            status = "complete"
+            message = "Bank statement processed successfully"
+        elif income is not None or emi is not None:
+            status = "partial"
+            missing = "EMI" if emi is None else "income"
+            message = f"Bank statement processed, but no {missing} entries were found"
+        else:
+            status = "not_found"
+            message = "Could not find income or EMI entries in the bank statement"
 
         return {
-            "income_extracted": round(income_extracted, 2),
-            "emi_detected": round(emi_detected, 2),
-            "message": "Bank statement processed successfully"
+            "income_extracted": round(income, 2) if income is not None else None,
+            "emi_detected": round(emi, 2) if emi is not None else None,
+            "status": status,
+            "confidence": round((parsed["income_confidence"] + parsed["emi_confidence"]) / 2, 2),
+            "transactions": parsed["transactions"],
+            "message": message
         }
 
 
@@ -0,0 +1,89 @@
+"""
+Bounded thread pools for blocking clients
+The supabase-py and boto3 clients are synchronous. Every call to them goes through
+a per-dependency pool here so handlers await the I/O instead of blocking the event
+loop, and a slow dependency can only exhaust its own pool. Each call is timed here,
+split into the wait for a free thread and the call itself (see metrics.py).
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from config import settings
+from metrics import dependency_call_duration, dependency_errors, dependency_queue_wait
+
+
+def _timed_call(timing: List[float], fn: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+    """Runs in the pool thread; records when the call started and finished."""
+    timing[1] = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        timing[2] = time.perf_counter()
+
+
+class BlockingPools:
+    """Lazily created, named ThreadPoolExecutors with fixed sizes."""
+
+    def __init__(self, sizes: Dict[str, int]):
+        self.sizes = sizes
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(name)
+        if pool is not None:
+            return pool
+
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = ThreadPoolExecutor(
+                    max_workers=self.sizes[name],
+                    thread_name_prefix=f"{name}-io"
+                )
+            return self._pools[name]
+
+    async def run(self, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable in the named pool and await its result."""
+        return await self.run_operation(name, getattr(fn, "__name__", "call"), fn, *args, **kwargs)
+
+    async def run_operation(self, name: str, operation: str, fn: Callable[..., Any],
+                            *args: Any, **kwargs: Any) -> Any:
+        """Like run(), recording the call's timings under the given operation label."""
+        loop = asyncio.get_running_loop()
+        # [submitted, started, finished]; the histograms are only touched from the loop
+        timing = [time.perf_counter(), 0.0, 0.0]
+        failed = False
+        try:
+            return await loop.run_in_executor(
+                self.get(name), functools.partial(_timed_call, timing, fn, args, kwargs)
+            )
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if timing[2]:
+                dependency_queue_wait.observe((name,), timing[1] - timing[0])
+                dependency_call_duration.observe((name, operation), timing[2] - timing[1])
+            if failed:
+                dependency_errors.inc((name, operation))
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait)
+
+
+blocking_pools = BlockingPools({
+    "db": settings.DB_POOL_SIZE,
+    "s3": settings.S3_POOL_SIZE,
+    "textract": settings.TEXTRACT_POOL_SIZE,
+    "bedrock": settings.BEDROCK_POOL_SIZE,
+    "sagemaker": settings.SAGEMAKER_POOL_SIZE,
+    "sns": settings.SNS_POOL_SIZE,
+})
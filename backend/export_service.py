@@ -0,0 +1,108 @@
+"""
+Streaming export of loan applications for managers.
+Pages through loan_applications with the dashboard's keyset query and yields
+NDJSON lines or CSV rows, so memory stays flat regardless of table size.
+"""
+
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from application_queries import application_page_query, encode_cursor
+from database import get_supabase, run_query
+from ml_service import FACTOR_NAMES, FEATURE_LABELS
+from model_runtime import model_runtime
+
+EXPORT_FIELDS = [
+    "id", "session_id", "name", "income_claimed", "income_extracted", "loan_amount",
+    "credit_score", "employment_type", "emi_detected", "aadhaar_verified",
+    "documents_verified", "eligibility_score", "final_status", "created_at", "updated_at",
+]
+
+EXPORT_PAGE_SIZE = 1000
+
+
+def _shap_column(feature: str) -> str:
+    return "shap_" + re.sub(r"[^a-z0-9]+", "_", feature.lower()).strip("_")
+
+
+# One impact column per factor either scoring path can produce with the default features
+SHAP_COLUMNS = list(dict.fromkeys(_shap_column(name) for name in FACTOR_NAMES + list(FEATURE_LABELS.values())))
+
+
+def shap_columns() -> List[str]:
+    """SHAP_COLUMNS plus one column per feature of the active model, which may bring its own."""
+    feature_names = getattr(model_runtime.model, "feature_names", None) or []
+    return list(dict.fromkeys(
+        SHAP_COLUMNS + [_shap_column(FEATURE_LABELS.get(name, name)) for name in feature_names]
+    ))
+
+
+def flatten_row(row: Dict[str, Any], include_shap: bool) -> Dict[str, Any]:
+    """Project a row onto the export fields, spreading shap_explanation impacts into columns."""
+    flat = {field: row.get(field) for field in EXPORT_FIELDS}
+    if include_shap:
+        flat.update({column: None for column in SHAP_COLUMNS})
+        for factor in row.get("shap_explanation") or []:
+            flat[_shap_column(factor["feature"])] = factor.get("impact")
+    return flat
+
+
+class ApplicationExporter:
+    """Async generators producing an export one page per chunk."""
+
+    def __init__(self, page_size: int = EXPORT_PAGE_SIZE):
+        self.page_size = page_size
+
+    async def pages(
+        self,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        include_shap: bool = False,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield flattened rows one page at a time; only one page is held in memory."""
+        supabase = get_supabase()
+        columns = ",".join(EXPORT_FIELDS + (["shap_explanation"] if include_shap else []))
+        cursor = None
+
+        while True:
+            query = application_page_query(
+                supabase, columns, self.page_size,
+                cursor=cursor, status=status, created_from=created_from, created_to=created_to
+            )
+            result = await run_query(query)
+            page: List[Dict[str, Any]] = result.data or []
+
+            if page:
+                yield [flatten_row(row, include_shap) for row in page]
+
+            if len(page) < self.page_size:
+                return
+            cursor = encode_cursor(page[-1])
+
+    async def to_ndjson(self, **filters: Any) -> AsyncIterator[str]:
+        async for page in self.pages(**filters):
+            yield "".join(json.dumps(row, default=str) + "\n" for row in page)
+
+    async def to_csv(self, include_shap: bool = False, **filters: Any) -> AsyncIterator[str]:
+        fieldnames = EXPORT_FIELDS + (shap_columns() if include_shap else [])
+        buffer = io.StringIO()
+        # Rows scored by an earlier model can carry factors no longer in the header;
+        # they are dropped rather than raising halfway through the stream
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+
+        writer.writeheader()
+        yield buffer.getvalue()
+
+        async for page in self.pages(include_shap=include_shap, **filters):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(page)
+            yield buffer.getvalue()
+
+
+application_exporter = ApplicationExporter()
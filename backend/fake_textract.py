@@ -0,0 +1,83 @@
+"""
+Local stand-in for the boto3 Textract client
+Replays recorded block JSON through the same methods and response shapes as the
+real client, so the OCR pipeline can be run and benchmarked without AWS.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+class FakeTextractClient:
+    """
+    Serves one recording for every document.
+
+    A recording is a Textract response ({"Blocks": [...]}) or a list of
+    get_document_text_detection responses whose Blocks are concatenated. Jobs
+    report IN_PROGRESS for in_progress_polls polls, and every call sleeps for
+    latency_seconds to mimic a network round trip.
+    """
+
+    def __init__(self, recording: Any, in_progress_polls: int = 1, latency_seconds: float = 0.0):
+        responses = recording if isinstance(recording, list) else [recording]
+        self.blocks: List[Dict[str, Any]] = [block for response in responses for block in response.get("Blocks", [])]
+        self.page_count = max((block.get("Page", 1) for block in self.blocks), default=0)
+        self.in_progress_polls = in_progress_polls
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self._polls_left: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "FakeTextractClient":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def _round_trip(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def _metadata(self) -> Dict[str, Any]:
+        return {"Pages": self.page_count}
+
+    def detect_document_text(self, Document: Dict[str, Any]) -> Dict[str, Any]:
+        self._round_trip()
+        first_page = [block for block in self.blocks if block.get("Page", 1) == 1]
+        return {"DocumentMetadata": {"Pages": 1}, "Blocks": first_page}
+
+    def start_document_text_detection(self, DocumentLocation: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self._round_trip()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._polls_left[job_id] = self.in_progress_polls
+        return {"JobId": job_id}
+
+    def get_document_text_detection(
+        self,
+        JobId: str,
+        MaxResults: int = 1000,
+        NextToken: Optional[str] = None
+    ) -> Dict[str, Any]:
+        self._round_trip()
+        with self._lock:
+            if JobId not in self._polls_left:
+                raise ValueError(f"Unknown JobId {JobId}")
+            if self._polls_left[JobId] > 0:
+                self._polls_left[JobId] -= 1
+                return {"JobStatus": "IN_PROGRESS"}
+
+        start = int(NextToken) if NextToken else 0
+        end = start + MaxResults
+        response = {
+            "JobStatus": "SUCCEEDED",
+            "DocumentMetadata": self._metadata(),
+            "Blocks": self.blocks[start:end]
+        }
+        if end < len(self.blocks):
+            response["NextToken"] = str(end)
+        return response
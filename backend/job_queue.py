@@ -0,0 +1,426 @@
+"""
+Background job queue
+Persistent jobs claimed by a pool of in-process async workers. The store is
+pluggable: SQLite for local development, the document_jobs Postgres table
+(through Supabase) when API pods and worker processes run separately.
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+from database import get_supabase, run_query
+from executors import blocking_pools
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+class JobStore(abc.ABC):
+    """
+    Storage interface for jobs.
+    claim() must be atomic across processes: a job is handed to at most one
+    worker until that worker's lease expires.
+    """
+
+    @abc.abstractmethod
+    async def create(self, job: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def retry(self, job_id: str, worker_id: str, error: str, delay_seconds: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        ...
+
+
+class SQLiteJobStore(JobStore):
+    """Single-host store; every call opens its own connection in the db pool."""
+
+    COLUMNS = [
+        "id", "type", "session_id", "payload", "status", "result", "error", "attempts",
+        "max_attempts", "claimed_by", "lease_expires_at", "run_after", "created_at",
+        "updated_at", "finished_at",
+    ]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute("""
+                        CREATE TABLE IF NOT EXISTS document_jobs (
+                            id TEXT PRIMARY KEY,
+                            type TEXT NOT NULL,
+                            session_id TEXT NOT NULL,
+                            payload TEXT NOT NULL,
+                            status TEXT NOT NULL,
+                            result TEXT,
+                            error TEXT,
+                            attempts INTEGER NOT NULL DEFAULT 0,
+                            max_attempts INTEGER NOT NULL,
+                            claimed_by TEXT,
+                            lease_expires_at TEXT,
+                            run_after TEXT NOT NULL,
+                            created_at TEXT NOT NULL,
+                            updated_at TEXT NOT NULL,
+                            finished_at TEXT
+                        )
+                    """)
+                    connection.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_document_jobs_runnable "
+                        "ON document_jobs(status, run_after, created_at)"
+                    )
+                    self._schema_ready = True
+        return connection
+
+    def _decode(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _create(self, job: Dict[str, Any]) -> None:
+        row = dict(job, payload=json.dumps(job["payload"]), result=None)
+        with closing(self._connect()) as connection:
+            connection.execute(
+                f"INSERT INTO document_jobs ({','.join(self.COLUMNS)}) VALUES ({','.join('?' * len(self.COLUMNS))})",
+                [row.get(column) for column in self.COLUMNS]
+            )
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as connection:
+            return self._decode(connection.execute("SELECT * FROM document_jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def _claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        connection = self._connect()
+        try:
+            now = _now().isoformat()
+            # IMMEDIATE takes the write lock up front, so select-then-update is atomic
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT id FROM document_jobs "
+                "WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_expires_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            connection.execute(
+                "UPDATE document_jobs SET status = 'running', attempts = attempts + 1, claimed_by = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                (worker_id, (_now() + timedelta(seconds=lease_seconds)).isoformat(), now, row["id"])
+            )
+            job = self._decode(connection.execute("SELECT * FROM document_jobs WHERE id = ?", (row["id"],)).fetchone())
+            connection.execute("COMMIT")
+            return job
+        except Exception:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def _update(self, job_id: str, worker_id: str, fields: Dict[str, Any]) -> None:
+        fields = dict(fields, updated_at=_now().isoformat())
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with closing(self._connect()) as connection:
+            connection.execute(
+                f"UPDATE document_jobs SET {assignments} WHERE id = ? AND claimed_by = ?",
+                [*fields.values(), job_id, worker_id]
+            )
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        await blocking_pools.run("db", self._create, job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await blocking_pools.run("db", self._get, job_id)
+
+    async def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        return await blocking_pools.run("db", self._claim, worker_id, lease_seconds)
+
+    async def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> None:
+        await blocking_pools.run("db", self._update, job_id, worker_id, {
+            "status": "succeeded", "result": json.dumps(result, default=str), "error": None,
+            "finished_at": _now().isoformat()
+        })
+
+    async def retry(self, job_id: str, worker_id: str, error: str, delay_seconds: float) -> None:
+        await blocking_pools.run("db", self._update, job_id, worker_id, {
+            "status": "queued", "error": error, "claimed_by": None, "lease_expires_at": None,
+            "run_after": (_now() + timedelta(seconds=delay_seconds)).isoformat()
+        })
+
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        await blocking_pools.run("db", self._update, job_id, worker_id, {
+            "status": "failed", "error": error, "finished_at": _now().isoformat()
+        })
+
+
+class SupabaseJobStore(JobStore):
+    """Shared store on the document_jobs table; claims go through the claim_document_job RPC."""
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        supabase = get_supabase()
+        await run_query(supabase.table("document_jobs").insert(job))
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        supabase = get_supabase()
+        result = await run_query(supabase.table("document_jobs").select("*").eq("id", job_id).maybe_single())
+        return result.data if result else None
+
+    async def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        supabase = get_supabase()
+        result = await run_query(supabase.rpc("claim_document_job", {
+            "p_worker_id": worker_id,
+            "p_lease_seconds": int(lease_seconds)
+        }))
+        return result.data[0] if result.data else None
+
+    async def _update(self, job_id: str, worker_id: str, fields: Dict[str, Any]) -> None:
+        supabase = get_supabase()
+        await run_query(
+            supabase.table("document_jobs")
+            .update(dict(fields, updated_at=_now().isoformat()))
+            .eq("id", job_id)
+            .eq("claimed_by", worker_id)
+        )
+
+    async def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> None:
+        await self._update(job_id, worker_id, {
+            "status": "succeeded", "result": json.loads(json.dumps(result, default=str)), "error": None,
+            "finished_at": _now().isoformat()
+        })
+
+    async def retry(self, job_id: str, worker_id: str, error: str, delay_seconds: float) -> None:
+        await self._update(job_id, worker_id, {
+            "status": "queued", "error": error, "claimed_by": None, "lease_expires_at": None,
+            "run_after": (_now() + timedelta(seconds=delay_seconds)).isoformat()
+        })
+
+    async def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        await self._update(job_id, worker_id, {
+            "status": "failed", "error": error, "finished_at": _now().isoformat()
+        })
+
+
+class JobQueue:
+    """
+    Enqueues jobs into the store and runs them on a pool of async workers.
+
+    Workers claim jobs from the store, so API pods can run with workers=0 and
+    leave the work to separate worker processes (python worker.py) sharing the
+    same store. A job runs for at most lease_seconds; failures are retried with
+    exponential backoff until max_attempts, and a job whose worker died is
+    reclaimed once its lease expires.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 5.0,
+    ):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.handlers: Dict[str, JobHandler] = {}
+
+        self.jobs_succeeded = 0
+        self.jobs_failed = 0
+        self.jobs_retried = 0
+
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self._new_work = asyncio.Event()
+        self._finished = asyncio.Event()
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        self.handlers[job_type] = handler
+
+    def set_store(self, store: JobStore) -> None:
+        self.store = store
+
+    async def enqueue(self, job_type: str, session_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        now = _now().isoformat()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "session_id": session_id,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "run_after": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.store.create(job)
+        self._signal("_new_work")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll: return the job once finished, or as it stands after timeout seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:
+            job = await self.store.get(job_id)
+            remaining = deadline - loop.time()
+            if job is None or job["status"] in FINISHED_STATUSES or remaining <= 0:
+                return job
+            # Jobs finished by this process wake waiters at once; others are seen on the next poll
+            finished = self._finished
+            try:
+                await asyncio.wait_for(finished.wait(), min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    def _signal(self, name: str) -> None:
+        event = getattr(self, name)
+        setattr(self, name, asyncio.Event())
+        event.set()
+
+    def start(self, workers: Optional[int] = None) -> None:
+        if self._tasks:
+            return
+        count = self.workers if workers is None else workers
+        self._stopping = False
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [asyncio.create_task(self._work(f"{prefix}-{n}")) for n in range(count)]
+        if count:
+            logger.info(f"Started {count} job workers")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop claiming, give running jobs up to timeout seconds, then cancel."""
+        self._stopping = True
+        self._signal("_new_work")
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker_id: str) -> None:
+        while not self._stopping:
+            try:
+                job = await self.store.claim(worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                job = None
+
+            if job is None:
+                new_work = self._new_work
+                try:
+                    await asyncio.wait_for(new_work.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(worker_id, job)
+
+    async def _run_job(self, worker_id: str, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        handler = self.handlers.get(job["type"])
+
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job type {job['type']}")
+            if job["attempts"] > job["max_attempts"]:
+                raise RuntimeError("Lease expired on the final attempt")
+            result = await asyncio.wait_for(handler(job), self.lease_seconds)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if handler is not None and job["attempts"] < job["max_attempts"]:
+                delay = self.retry_backoff_seconds * (2 ** (job["attempts"] - 1))
+                logger.warning(f"Job {job_id} attempt {job['attempts']} failed ({error}), retrying in {delay:.0f}s")
+                await self.store.retry(job_id, worker_id, error, delay)
+                self.jobs_retried += 1
+            else:
+                logger.error(f"Job {job_id} failed after {job['attempts']} attempts: {error}")
+                await self.store.fail(job_id, worker_id, error)
+                self.jobs_failed += 1
+                self._signal("_finished")
+            return
+
+        await self.store.complete(job_id, worker_id, result)
+        self.jobs_succeeded += 1
+        self._signal("_finished")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "jobs_succeeded": self.jobs_succeeded,
+            "jobs_failed": self.jobs_failed,
+            "jobs_retried": self.jobs_retried
+        }
+
+
+def create_job_store() -> JobStore:
+    if settings.JOB_STORE == "supabase":
+        return SupabaseJobStore()
+    return SQLiteJobStore(settings.JOB_SQLITE_PATH)
+
+
+job_queue = JobQueue(
+    create_job_store(),
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS
+)
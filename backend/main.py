@@ -4,9 +4,14 @@ import os
 # Load environment variables FIRST before any other imports
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
 from typing import Optional
+import hmac
+import sys
 import uuid
 from datetime import datetime
 
@@ -15,17 +20,57 @@ from models import (
     VoiceWebhook, AadhaarVerifyRequest, AadhaarVerifyResponse,
     BankStatementRequest, BankStatementResponse, PredictRequest,
     PredictResponse, ManagerLogin, ManagerLoginResponse,
-    ApplicationSummary, ApplicationDetail, ApprovalRequest,
-    UploadUrlRequest
+    ApplicationSummary, ApplicationDetail, ApprovalRequest, BulkDecisionRequest, BulkDecisionResponse,
+    UploadUrlRequest, MultipartUploadRequest, UploadPartsRequest, CompleteUploadRequest,
+    AbortUploadRequest, RescoreRequest, RescoreResponse, ModelReloadRequest,
+    VerificationJobRequest, JobResponse
 )
-from database import get_supabase
-from auth import authenticate_manager, create_access_token, verify_token
-from chat_service import chat_service
-from document_service import document_service
-from ml_service import ml_service
-
-app = FastAPI(title="Loan Eligibility AI System API", version="1.0.0")
-
+from config import settings
+from database import get_supabase, run_query
+from application_queries import SUMMARY_COLUMNS, application_page_query, encode_cursor
+from export_service import application_exporter
+from executors import blocking_pools
+from aws_clients import aws_clients
+from aws_services import S3UnavailableError, UploadRequestError, s3_service, sagemaker_service
+from auth import ManagerIdentity, authenticate_manager, create_access_token, token_verifier
+from chat_service import StaleSessionState, chat_service
+from chat_history_writer import chat_history_writer
+from decision_service import decision_service
+from document_cache import document_result_cache
+from document_service import DocumentTooLargeError, document_service
+from job_queue import job_queue
+from metrics import RequestMetricsMiddleware, registry
+from micro_batcher import BatcherOverloaded
+from model_runtime import model_runtime, resolve_model_path
+from password_hasher import PasswordHasherBusy, password_hasher
+from profiler import ProfileRequestMiddleware, ProfilerBusy, request_profiles, sampling_profiler
+from rate_limiter import RateLimitMiddleware
+from session_cache import session_state_cache
+from rescore_service import RescoreService
+from verification_service import VERIFICATION_JOB, verification_service
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm the local model before serving so the first /predict is fast
+    model_runtime.start()
+    chat_history_writer.start()
+    job_queue.start()
+    yield
+    # Let running jobs finish and drain queued chat history before the DB pool goes away
+    await job_queue.stop()
+    await chat_history_writer.stop()
+    await sagemaker_service.batcher.close()
+    blocking_pools.shutdown(wait=False)
+    password_hasher.shutdown(wait=False)
+
+app = FastAPI(title="Loan Eligibility AI System API", version="1.0.0", lifespan=lifespan)
+
+# Added before CORS so CORS stays outermost and 429 responses carry CORS headers.
+# Metrics sits outside the rate limiter so rejected requests are counted too, and
+# per-request profiling outside both so the profile covers the whole stack.
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(ProfileRequestMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -34,18 +79,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def verify_manager_token(authorization: Optional[str] = Header(None)) -> dict:
-    """Verify JWT token for manager authentication"""
+def _explanation_cache_entries() -> float:
+    # Read only if already imported; importing it here would pull in numpy
+    module = sys.modules.get("explanation_service")
+    return len(module.explanation_service.cache) if module else 0
+
+def _per_service(values: dict, field: str) -> list:
+    return [({"service": service}, usage[field]) for service, usage in values.items()]
+
+# Gauges read from the services at scrape time
+registry.gauge_callback("chat_history_queue_depth", "Chat messages waiting to be written",
+                        chat_history_writer.queue_depth)
+registry.gauge_callback("chat_history_rows_dropped_total", "Chat messages dropped because the queue was full",
+                        lambda: chat_history_writer.rows_dropped, kind="counter")
+registry.gauge_callback("job_queue_workers", "Background job workers running",
+                        lambda: job_queue.metrics()["workers"])
+registry.gauge_callback("job_queue_jobs_total", "Background jobs finished, by outcome", lambda: [
+    ({"outcome": outcome}, job_queue.metrics()[f"jobs_{outcome}"]) for outcome in ("succeeded", "failed", "retried")
+], kind="counter")
+registry.gauge_callback("sagemaker_batch_queue_depth", "Predictions waiting for a SageMaker batch",
+                        sagemaker_service.batcher.queue_depth)
+registry.gauge_callback("session_cache_lookups_total", "Session state cache lookups, by result", lambda: [
+    ({"result": "hit"}, session_state_cache.hits), ({"result": "miss"}, session_state_cache.misses)
+], kind="counter")
+registry.gauge_callback("document_cache_entries", "Document extraction results cached in memory",
+                        lambda: len(document_result_cache))
+registry.gauge_callback("document_cache_lookups_total", "Document extraction cache lookups, by result", lambda: [
+    ({"result": "hit"}, document_result_cache.hits), ({"result": "miss"}, document_result_cache.misses)
+], kind="counter")
+registry.gauge_callback("explanation_cache_entries", "SHAP vectors cached", _explanation_cache_entries)
+registry.gauge_callback("token_cache_entries", "Verified manager tokens cached",
+                        lambda: len(token_verifier.cache))
+registry.gauge_callback("password_hash_pending", "bcrypt checks running or queued",
+                        lambda: password_hasher.pending)
+registry.gauge_callback("password_hash_rejected_total", "Logins refused because the bcrypt pool was full",
+                        lambda: password_hasher.rejected, kind="counter")
+registry.gauge_callback("aws_client_in_flight", "AWS API calls in flight per client",
+                        lambda: _per_service(aws_clients.metrics(), "in_flight"))
+registry.gauge_callback("aws_client_saturated_calls_total", "AWS calls started with every pooled connection busy",
+                        lambda: _per_service(aws_clients.metrics(), "saturated_calls"), kind="counter")
+
+def bearer_token(authorization: Optional[str] = Header(None)) -> str:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
+    return authorization[len("Bearer "):]
 
-    token = authorization.replace("Bearer ", "")
-    payload = verify_token(token)
+async def get_current_manager(token: str = Depends(bearer_token)) -> ManagerIdentity:
+    """Verify the manager's JWT (cached until it expires) and check it is not revoked"""
+    await token_verifier.revocations.refresh_if_stale()
+    identity = token_verifier.verify(token)
 
-    if not payload:
+    if identity is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    return payload
+    return identity
 
 @app.get("/")
 async def root():
@@ -61,21 +148,27 @@ async def start_session(session_data: SessionCreate):
 
     session_id = str(uuid.uuid4())
 
-    supabase.table("loan_applications").insert({
+    result = await run_query(supabase.table("loan_applications").insert({
         "session_id": session_id,
         "final_status": "pending"
-    }).execute()
+    }))
+
+    created = result.data[0] if result is not None and result.data else {}
+    await session_state_cache.set(session_id, {"updated_at": created.get("updated_at")})
 
     if session_data.channel == "chat":
         initial_message = "Hello! Welcome to our loan application system. What is your name?"
     else:
         initial_message = "Voice session started. Please provide your information."
 
-    supabase.table("chat_history").insert({
-        "session_id": session_id,
-        "role": "assistant",
-        "message": initial_message
-    }).execute()
+    if settings.CHAT_HISTORY_WRITE_BEHIND:
+        await chat_history_writer.enqueue(session_id, "assistant", initial_message)
+    else:
+        await run_query(supabase.table("chat_history").insert({
+            "session_id": session_id,
+            "role": "assistant",
+            "message": initial_message
+        }))
 
     return SessionResponse(
         session_id=session_id,
@@ -88,7 +181,10 @@ async def chat_input(chat_data: ChatInput):
     Process chat input from user.
     Manages conversation flow and collects loan application data.
     """
-    result = await chat_service.process_message(chat_data.session_id, chat_data.message)
+    try:
+        result = await chat_service.process_message(chat_data.session_id, chat_data.message)
+    except StaleSessionState as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     return ChatResponse(
         response=result["response"],
@@ -102,7 +198,10 @@ async def voice_webhook(voice_data: VoiceWebhook):
     Receives transcript and returns text response.
     TODO: Integrate with Amazon Connect, Lex, and Voice ID
     """
-    result = await chat_service.process_message(voice_data.session_id, voice_data.transcript)
+    try:
+        result = await chat_service.process_message(voice_data.session_id, voice_data.transcript)
+    except StaleSessionState as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     return ChatResponse(
         response=result["response"],
@@ -112,15 +211,71 @@ async def voice_webhook(voice_data: VoiceWebhook):
 @app.post("/upload-url")
 async def get_upload_url(request: UploadUrlRequest):
     """
-    Generate presigned URL for document upload.
-    TODO: Integrate with AWS S3 for secure document storage
-    Currently returns mock URL
+    Generate a presigned POST for uploading a document straight to S3.
+    Post the returned fields plus the file to upload_url; the policy limits the
+    content type to the requested extension's and the size to MAX_FILE_SIZE.
     """
-    return {
-        "upload_url": f"https://mock-s3-bucket.s3.amazonaws.com/{request.session_id}/{request.file_type}",
-        "document_id": str(uuid.uuid4()),
-        "message": "Mock upload URL generated. Implement S3 presigned URL in production."
-    }
+    try:
+        return await s3_service.generate_presigned_upload_url(request.session_id, request.file_type, request.extension)
+    except UploadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except S3UnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.post("/upload-url/multipart")
+async def create_multipart_upload(request: MultipartUploadRequest):
+    """
+    Start a multipart upload for a large scan.
+    Returns the part size, part count and presigned URLs for the first batch of parts.
+    PUT each part to its URL, then call /upload-url/multipart/complete with the ETags.
+    """
+    try:
+        return await s3_service.create_multipart_upload(
+            request.session_id, request.file_type, request.extension, request.size
+        )
+    except UploadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except S3UnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.post("/upload-url/multipart/parts")
+async def presign_upload_parts(request: UploadPartsRequest):
+    """Presign the next batch of part URLs for a multipart upload"""
+    try:
+        parts = await s3_service.presign_upload_parts(
+            request.session_id, request.key, request.upload_id, request.part_numbers
+        )
+    except UploadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except S3UnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"parts": parts}
+
+@app.post("/upload-url/multipart/complete")
+async def complete_multipart_upload(request: CompleteUploadRequest):
+    """Assemble the uploaded parts into the final object"""
+    try:
+        return await s3_service.complete_multipart_upload(
+            request.session_id, request.key, request.upload_id,
+            [part.model_dump() for part in request.parts]
+        )
+    except UploadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except S3UnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.post("/upload-url/multipart/abort")
+async def abort_multipart_upload(request: AbortUploadRequest):
+    """Abort a multipart upload and discard its parts"""
+    try:
+        await s3_service.abort_multipart_upload(request.session_id, request.key, request.upload_id)
+    except UploadRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except S3UnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"message": "Upload aborted"}
 
 @app.post("/verify-aadhaar", response_model=AadhaarVerifyResponse)
 async def verify_aadhaar(request: AadhaarVerifyRequest):
@@ -128,13 +283,8 @@ async def verify_aadhaar(request: AadhaarVerifyRequest):
     Verify Aadhaar document using OCR.
     TODO: Replace with AWS Textract integration
     """
-    supabase = get_supabase()
-
     result = document_service.verify_aadhaar(request.document_text)
-
-    supabase.table("loan_applications").update({
-        "aadhaar_verified": result["verified"]
-    }).eq("session_id", request.session_id).execute()
+    await verification_service.save_aadhaar_result(request.session_id, result)
 
     return AadhaarVerifyResponse(
         verified=result["verified"],
@@ -142,83 +292,116 @@ async def verify_aadhaar(request: AadhaarVerifyRequest):
         extracted_data=result["extracted_data"]
     )
 
+async def save_bank_statement_result(session_id: str, result: dict) -> BankStatementResponse:
+    await verification_service.save_bank_statement_result(session_id, result)
+
+    return BankStatementResponse(
+        income_extracted=result["income_extracted"],
+        emi_detected=result["emi_detected"],
+        status=result["status"],
+        confidence=result["confidence"],
+        transactions=result["transactions"],
+        message=result["message"]
+    )
+
 @app.post("/process-bank-statement", response_model=BankStatementResponse)
 async def process_bank_statement(request: BankStatementRequest):
     """
     Process bank statement to extract income and EMI.
     TODO: Replace with AWS Textract + intelligent parsing
     """
-    supabase = get_supabase()
-
     result = document_service.process_bank_statement(request.document_text)
+    return await save_bank_statement_result(request.session_id, result)
 
-    supabase.table("loan_applications").update({
-        "income_extracted": result["income_extracted"],
-        "emi_detected": result["emi_detected"],
-        "documents_verified": True
-    }).eq("session_id", request.session_id).execute()
+@app.post("/process-bank-statement/stream", response_model=BankStatementResponse)
+async def process_bank_statement_stream(request: Request, session_id: str = Query(...)):
+    """
+    Process a large bank statement sent as the raw UTF-8 request body
+    (plain or chunked transfer encoding).
+    The body is parsed as it arrives instead of being buffered, and rejected
+    with 413 as soon as it exceeds MAX_FILE_SIZE.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail=f"Document exceeds {settings.MAX_FILE_SIZE} bytes")
 
-    return BankStatementResponse(
-        income_extracted=result["income_extracted"],
-        emi_detected=result["emi_detected"],
-        message=result["message"]
-    )
+    try:
+        result = await document_service.process_bank_statement_stream(request.stream(), settings.MAX_FILE_SIZE)
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Bank statement must be UTF-8 text")
+
+    return await save_bank_statement_result(session_id, result)
 
 @app.post("/predict", response_model=PredictResponse)
 async def predict_eligibility(request: PredictRequest):
     """
     Run ML model to predict loan eligibility.
-    TODO: Replace with SageMaker endpoint or load loan_model.pkl
+    Uses the SageMaker endpoint when USE_LOCAL_ML_MODEL and USE_MOCK_SAGEMAKER are off,
+    otherwise the local model loaded from ML_MODEL_PATH (or the rule-based scorer).
     """
-    supabase = get_supabase()
-
-    result = supabase.table("loan_applications").select("*").eq("session_id", request.session_id).maybe_single().execute()
+    try:
+        prediction = await verification_service.score_application(request.session_id)
+    except (BatcherOverloaded, TimeoutError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    if not result.data:
+    if prediction is None:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    application = result.data
+    return PredictResponse(**prediction)
+
+def job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        job_id=str(job["id"]),
+        type=job["type"],
+        session_id=job["session_id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        result=job.get("result"),
+        error=job.get("error"),
+        created_at=str(job["created_at"]),
+        updated_at=str(job["updated_at"]),
+        finished_at=str(job["finished_at"]) if job.get("finished_at") else None
+    )
 
-    features = {
-        "credit_score": application.get("credit_score", 0),
-        "income_extracted": application.get("income_extracted", 0),
-        "loan_amount": application.get("loan_amount", 0),
-        "emi_detected": application.get("emi_detected", 0),
-        "employment_type": application.get("employment_type", "")
-    }
+@app.post("/jobs/verification", response_model=JobResponse, status_code=202)
+async def create_verification_job(request: VerificationJobRequest):
+    """
+    Queue document verification and scoring for a session.
+    The job runs OCR (for documents given as S3 keys), bank statement parsing,
+    the Aadhaar check and scoring in the background; poll GET /jobs/{job_id}.
+    """
+    payload = request.model_dump(exclude={"session_id"})
+    job = await job_queue.enqueue(VERIFICATION_JOB, request.session_id, payload)
+    return job_response(job)
 
-    prediction = ml_service.predict_eligibility(features)
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=30)):
+    """
+    Job status. With wait > 0 the request is held until the job finishes or
+    wait seconds pass, so clients can long-poll instead of polling rapidly.
+    """
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    supabase.table("loan_applications").update({
-        "eligibility_score": prediction["eligibility_score"],
-        "shap_explanation": prediction["shap_explanation"],
-        "final_status": "eligible" if prediction["eligible"] else "needs_review"
-    }).eq("session_id", request.session_id).execute()
+    job = await job_queue.wait(job_id, wait) if wait else await job_queue.get(job_id)
 
-    message = "Congratulations! You are eligible for the loan." if prediction["eligible"] else \
-              "Your application needs further review. Consider improving your credit score or reducing existing EMIs."
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    return PredictResponse(
-        eligibility_score=prediction["eligibility_score"],
-        eligible=prediction["eligible"],
-        message=message,
-        shap_explanation=prediction["shap_explanation"]
-    )
+    return job_response(job)
 
 @app.post("/save-report")
 async def save_report(request: dict):
     """
     Save final application report.
-    This endpoint is called after all processing is complete.
+    This endpoint is called after all processing is complete. Every step has
+    already written its results, so there is nothing left to store; touching the
+    row here would change updated_at and make managers' pending decisions conflict.
     """
-    supabase = get_supabase()
-
-    session_id = request.get("session_id")
-
-    supabase.table("loan_applications").update({
-        "updated_at": datetime.utcnow().isoformat()
-    }).eq("session_id", session_id).execute()
-
     return {"message": "Report saved successfully"}
 
 @app.post("/manager/login", response_model=ManagerLoginResponse)
@@ -226,7 +409,11 @@ async def manager_login(credentials: ManagerLogin):
     """
     Authenticate manager and return JWT token.
     """
-    manager = await authenticate_manager(credentials.email, credentials.password)
+    try:
+        manager = await authenticate_manager(credentials.email, credentials.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Too many logins in progress, try again shortly",
+                            headers={"Retry-After": "1"})
 
     if not manager:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -239,14 +426,42 @@ async def manager_login(credentials: ManagerLogin):
         email=manager["email"]
     )
 
+@app.post("/manager/logout")
+async def manager_logout(token: str = Depends(bearer_token), manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Revoke the caller's token until it expires.
+    """
+    await token_verifier.revoke(token, manager)
+    return {"message": "Logged out"}
+
 @app.get("/manager/applications")
-async def get_applications(manager: dict = Depends(verify_manager_token)):
+async def get_applications(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    manager: ManagerIdentity = Depends(get_current_manager)
+):
     """
-    Get all loan applications for manager review.
+    Get one page of loan applications for manager review, newest first.
+    Pass the returned next_cursor as cursor to fetch the following page.
+    Only the summary columns are read from the database.
     """
     supabase = get_supabase()
 
-    result = supabase.table("loan_applications").select("*").order("created_at", desc=True).execute()
+    try:
+        query = application_page_query(
+            supabase, SUMMARY_COLUMNS, limit + 1,
+            cursor=cursor, status=status, created_from=created_from, created_to=created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await run_query(query)
+    rows = result.data or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     applications = [
         ApplicationSummary(
@@ -257,21 +472,61 @@ async def get_applications(manager: dict = Depends(verify_manager_token)):
             loan_amount=app.get("loan_amount"),
             credit_score=app.get("credit_score"),
             final_status=app["final_status"],
-            created_at=app["created_at"]
+            created_at=app["created_at"],
+            updated_at=app.get("updated_at")
         )
-        for app in result.data
+        for app in rows
     ]
 
-    return {"applications": applications}
+    return {
+        "applications": applications,
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None
+    }
+
+@app.get("/manager/applications/export")
+async def export_applications(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_shap: bool = False,
+    manager: ManagerIdentity = Depends(get_current_manager)
+):
+    """
+    Stream all matching applications as NDJSON or CSV.
+    Rows are read page by page and written as they arrive, so memory use does
+    not grow with the size of the export. With include_shap, each factor's
+    impact becomes a shap_* column.
+    """
+    filters = {
+        "status": status,
+        "created_from": created_from,
+        "created_to": created_to,
+        "include_shap": include_shap
+    }
+    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+
+    if format == "csv":
+        body = application_exporter.to_csv(**filters)
+        media_type = "text/csv"
+    else:
+        body = application_exporter.to_ndjson(**filters)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="applications-{timestamp}.{format}"'}
+    )
 
 @app.get("/manager/application/{application_id}")
-async def get_application_detail(application_id: str, manager: dict = Depends(verify_manager_token)):
+async def get_application_detail(application_id: str, manager: ManagerIdentity = Depends(get_current_manager)):
     """
     Get detailed information for a specific application.
     """
     supabase = get_supabase()
 
-    result = supabase.table("loan_applications").select("*").eq("id", application_id).maybe_single().execute()
+    result = await run_query(supabase.table("loan_applications").select("*").eq("id", application_id).maybe_single())
 
     if not result.data:
         raise HTTPException(status_code=404, detail="Application not found")
@@ -299,34 +554,155 @@ async def get_application_detail(application_id: str, manager: dict = Depends(ve
         updated_at=app["updated_at"]
     )
 
+async def apply_single_decision(manager_id: str, application_id: str, status: str) -> None:
+    """Apply one decision, raising 404 / 409 unless decide_applications applied it."""
+    result = (await decision_service.apply(manager_id, [(application_id, status, None)]))[0]
+    if result["outcome"] == "not_found":
+        raise HTTPException(status_code=404, detail="Application not found")
+    if result["outcome"] == "conflict":
+        raise HTTPException(status_code=409, detail="Application changed while the decision was applied")
+
 @app.post("/manager/approve")
-async def approve_application(request: ApprovalRequest, manager: dict = Depends(verify_manager_token)):
+async def approve_application(request: ApprovalRequest, manager: ManagerIdentity = Depends(get_current_manager)):
     """
     Approve a loan application.
     """
-    supabase = get_supabase()
-
-    supabase.table("loan_applications").update({
-        "final_status": "approved",
-        "updated_at": datetime.utcnow().isoformat()
-    }).eq("id", request.application_id).execute()
+    await apply_single_decision(manager.id, request.application_id, "approved")
 
     return {"message": "Application approved successfully"}
 
 @app.post("/manager/reject")
-async def reject_application(request: ApprovalRequest, manager: dict = Depends(verify_manager_token)):
+async def reject_application(request: ApprovalRequest, manager: ManagerIdentity = Depends(get_current_manager)):
     """
     Reject a loan application.
     """
-    supabase = get_supabase()
-
-    supabase.table("loan_applications").update({
-        "final_status": "rejected",
-        "updated_at": datetime.utcnow().isoformat()
-    }).eq("id", request.application_id).execute()
+    await apply_single_decision(manager.id, request.application_id, "rejected")
 
     return {"message": "Application rejected successfully"}
 
+@app.post("/manager/decisions", response_model=BulkDecisionResponse)
+async def decide_applications(request: BulkDecisionRequest, manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Approve and reject many applications in one call.
+    Decisions carrying expected_updated_at are only applied if the application has
+    not changed since; others come back with outcome "conflict". Every applied
+    decision is recorded in application_decisions with the deciding manager.
+    """
+    if len(request.decisions) > settings.BULK_DECISION_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_DECISION_MAX_ITEMS} decisions per request"
+        )
+
+    results = await decision_service.apply(manager.id, [
+        (item.application_id, item.decision, item.expected_updated_at) for item in request.decisions
+    ])
+
+    outcomes = [result["outcome"] for result in results]
+    return BulkDecisionResponse(
+        results=results,
+        applied=outcomes.count("applied"),
+        conflicts=outcomes.count("conflict"),
+        not_found=outcomes.count("not_found")
+    )
+
+@app.post("/manager/rescore", response_model=RescoreResponse)
+async def rescore_applications(request: RescoreRequest, manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Re-score undecided applications in keyset-ordered, batch-scored pages.
+    Processes up to max_pages pages per call; pass the returned last_id back
+    as after_id to resume until done is true.
+    """
+    job = RescoreService(page_size=request.page_size)
+    after_id = str(request.after_id) if request.after_id else None
+    progress = await blocking_pools.run("db", job.run, after_id=after_id, max_pages=request.max_pages)
+
+    return RescoreResponse(**progress)
+
+@app.get("/manager/model")
+async def get_model_info(manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Get the currently active scoring model.
+    """
+    return model_runtime.info()
+
+@app.post("/manager/model/reload")
+async def reload_model(request: ModelReloadRequest, manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Load and warm a new model artifact, then swap it in atomically.
+    In-flight predictions finish on the previous model. model_path is resolved
+    against ML_MODEL_DIR and must stay inside it.
+    """
+    try:
+        path = resolve_model_path(request.model_path) if request.model_path else settings.ML_MODEL_PATH
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return await run_in_threadpool(model_runtime.load, path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to load model: {e}")
+
+@app.get("/manager/chat-history/metrics")
+async def get_chat_history_metrics(manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Queue depth and flush latency of the chat_history write-behind queue.
+    """
+    return chat_history_writer.metrics()
+
+@app.get("/manager/aws-clients/metrics")
+async def get_aws_client_metrics(manager: ManagerIdentity = Depends(get_current_manager)):
+    """
+    Connection pool usage of each AWS client created so far. saturated_calls counts
+    calls that started with every pooled connection already in use.
+    """
+    return aws_clients.metrics()
+
+@app.post("/manager/profiler/sample", response_class=PlainTextResponse)
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, gt=0),
+    manager: ManagerIdentity = Depends(get_current_manager)
+):
+    """
+    Sample every thread's stack on this worker for `seconds` (capped at
+    PROFILER_MAX_SECONDS) and return collapsed stacks for flamegraph.pl or speedscope.
+    The event loop thread shows up as MainThread.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+    try:
+        # The sampler sleeps between samples, so it gets its own thread rather than a pool slot
+        return await run_in_threadpool(sampling_profiler.sample, seconds, interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/manager/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, manager: ManagerIdentity = Depends(get_current_manager)):
+    """cProfile report for a request sent with X-Profile-Token (see the X-Profile-Id response header)"""
+    report = request_profiles.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape endpoint; off unless METRICS_ENABLED, and always needs METRICS_TOKEN"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if not settings.METRICS_TOKEN:
+        # Route names, queue depths and cache sizes are not for anonymous callers
+        raise HTTPException(status_code=503, detail="METRICS_TOKEN must be set to serve metrics")
+
+    if not hmac.compare_digest(
+        (authorization or "").encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
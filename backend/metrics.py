@@ -0,0 +1,206 @@
+"""
+Metrics
+In-process counters, latency histograms and gauges, rendered in the Prometheus text
+format by GET /metrics. Request latency is recorded per route by
+RequestMetricsMiddleware; every Supabase and boto3 call is timed in
+executors.BlockingPools, since all of them go through it.
+
+Everything is recorded from the event loop thread, so updates take no locks.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Half-octave buckets from 0.25 ms to ~65 s: any latency lands in a bucket whose
+# bounds are within a factor of 1.41, HDR-style, at a fixed 37 counters per series
+LATENCY_BUCKETS = tuple(0.00025 * 2 ** (i / 2) for i in range(37))
+
+LabelValues = Tuple[str, ...]
+GaugeValue = Union[float, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set; observe() is one bisect and three adds."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+1 for overflow), sum, count]
+        self.series: Dict[LabelValues, list] = {}
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, labels: LabelValues, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if no samples)."""
+        series = self.series.get(labels)
+        if not series or not series[2]:
+            return None
+        rank = q * series[2]
+        seen = 0
+        for index, count in enumerate(series[0]):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound) if bound == float("inf") else f"{bound:.6g}"}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {total!r}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class CallbackMetric:
+    """A gauge or counter whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], GaugeValue], kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        value = self.fn()
+        samples = value if isinstance(value, list) else [({}, value)]
+        for labels, sample in samples:
+            names = tuple(labels)
+            lines.append(f"{self.name}{_format_labels(names, tuple(str(labels[n]) for n in names))} {_format_value(sample)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def _add(self, metric: Any) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Histogram:
+        return self._add(Histogram(name, help_text, label_names))
+
+    def gauge_callback(self, name: str, help_text: str, fn: Callable[[], GaugeValue], kind: str = "gauge") -> None:
+        self._add(CallbackMetric(name, help_text, fn, kind))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # A broken gauge callback must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+dependency_call_duration = registry.histogram(
+    "dependency_call_duration_seconds", "Time spent in a Supabase or AWS call, excluding pool wait", ("pool", "operation")
+)
+dependency_queue_wait = registry.histogram(
+    "dependency_queue_wait_seconds", "Time a blocking call waited for a free thread in its pool", ("pool",)
+)
+dependency_errors = registry.counter(
+    "dependency_call_errors_total", "Supabase or AWS calls that raised", ("pool", "operation")
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording latency and status per route template (e.g.
+    /manager/application/{application_id}), so ids never become label values.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self.in_flight = 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight -= 1
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_request_duration.observe((method, template), elapsed)
+            http_requests.inc((method, template, str(status[0])))
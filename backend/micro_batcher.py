@@ -0,0 +1,165 @@
+"""
+Micro-batching for blocking inference calls
+Collects concurrent requests for a short window, runs them as one batch off the
+event loop, and fans results back out to the awaiting callers.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatcherOverloaded(Exception):
+    """Raised when the batcher queue stays full for the whole request timeout."""
+
+
+class BatcherClosed(Exception):
+    """Raised for requests still queued when the batcher is closed."""
+
+
+class MicroBatcher:
+    """
+    Asyncio micro-batcher in front of a blocking batch handler.
+
+    Args:
+        handler: Blocking function taking a list of items and returning one result per item
+        max_batch_size: Flush as soon as this many items are waiting
+        window_ms: Flush after this long even if the batch is not full
+        max_queue_size: Bound on waiting items; submitters wait for space (backpressure)
+        max_concurrent_batches: Batches allowed in flight at once in the thread pool
+        timeout_seconds: Default per-request deadline covering queueing and inference
+        runner: Coroutine function running a blocking callable off the loop,
+            e.g. functools.partial(blocking_pools.run, "sagemaker"); defaults to
+            the loop's default executor
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        window_ms: float = 5.0,
+        max_queue_size: int = 1000,
+        max_concurrent_batches: int = 4,
+        timeout_seconds: float = 2.0,
+        runner: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000.0
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max_concurrent_batches
+        self.timeout_seconds = timeout_seconds
+        self.runner = runner
+
+        self.batches_sent = 0
+        self.items_sent = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Queue one item and wait for its result, raising on timeout or overload."""
+        self._ensure_started()
+        timeout = self.timeout_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        future = self._loop.create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((item, future)), timeout)
+        except asyncio.TimeoutError:
+            raise BatcherOverloaded(f"Batch queue full ({self.max_queue_size} waiting)")
+
+        remaining = max(deadline - time.monotonic(), 0.0)
+        try:
+            # wait_for cancels the future on timeout, so the worker skips it
+            return await asyncio.wait_for(future, remaining)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No batch result within {timeout}s")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Drop callers that already timed out before paying for their inference
+                batch = [(item, future) for item, future in batch if not future.done()]
+                if not batch:
+                    continue
+
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                self._fail(batch, BatcherClosed("Batcher closed before the batch was sent"))
+                raise
+
+            self._loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            items = [item for item, _ in batch]
+            if self.runner is not None:
+                results = await self.runner(self.handler, items)
+            else:
+                results = await self._loop.run_in_executor(None, self.handler, items)
+            self.batches_sent += 1
+            self.items_sent += len(items)
+
+            if len(results) != len(batch):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(batch)} failed: {e}")
+            self._fail(batch, e)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self) -> None:
+        """Stop the worker; requests not yet sent fail with BatcherClosed."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        queued = []
+        while self._queue is not None and not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        self._fail(queued, BatcherClosed("Batcher closed before the batch was sent"))
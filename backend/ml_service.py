@@ -1,5 +1,42 @@
 import random
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Mapping, Sequence, Union
+
+if TYPE_CHECKING:
+    # numpy/pandas are imported on first batch call; single predictions are pure Python
+    import numpy as np
+    import pandas as pd
+
+FEATURE_COLUMNS = ["credit_score", "income_extracted", "loan_amount", "emi_detected", "employment_type"]
+
+FACTOR_NAMES = [
+    "Credit Score",
+    "Debt-to-Income Ratio",
+    "EMI-to-Income Ratio",
+    "Employment Type",
+    "Monthly Income",
+]
+
+# Display names for the model's input features, used by the SHAP explanations
+FEATURE_LABELS = {
+    "credit_score": "Credit Score",
+    "income_extracted": "Monthly Income",
+    "loan_amount": "Loan Amount",
+    "emi_detected": "Existing EMI",
+    "employment_code": "Employment Type",
+    "debt_to_income": "Debt-to-Income Ratio",
+    "emi_ratio": "EMI-to-Income Ratio",
+}
+
+# Smallest impact per factor that the scalar path labels "positive"
+POSITIVE_IMPACT = {
+    "Credit Score": 0.25,
+    "Debt-to-Income Ratio": 0.25,
+    "EMI-to-Income Ratio": 0.20,
+    "Employment Type": 0.15,
+    "Monthly Income": 0.10,
+}
+
+BatchFeatures = Union["pd.DataFrame", Mapping[str, Sequence[Any]]]
 
 class LoanMLService:
     """
@@ -96,5 +133,154 @@ class LoanMLService:
             "shap_explanation": factors
         }
 
+    def predict_eligibility_batch(self, features: BatchFeatures, explain: bool = True) -> Dict[str, Any]:
+        """
+        Vectorized version of predict_eligibility for scoring many applicants at once.
+
+        Every band is evaluated over whole columns and the score is accumulated in the
+        same order as the scalar path, so results are identical row for row.
+
+        Args:
+            features: pandas DataFrame or mapping of column name -> array-like with the
+                same keys predict_eligibility reads (missing columns default like .get()).
+            explain: When True, also build the per-row shap_explanation lists.
+
+        Returns:
+            Dictionary containing:
+                - eligibility_score: float ndarray, rounded to 2 decimals
+                - eligible: bool ndarray
+                - contributions: dict of factor name -> impact ndarray (NaN where the
+                  factor does not apply to the row)
+                - shap_explanation: list of factor lists (only when explain=True)
+        """
+        import numpy as np
+        import pandas as pd
+
+        frame = features if isinstance(features, pd.DataFrame) else pd.DataFrame(dict(features))
+        n = len(frame)
+
+        def numeric(column: str) -> "np.ndarray":
+            if column not in frame:
+                return np.zeros(n, dtype=np.float64)
+            return pd.to_numeric(frame[column], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+
+        credit_score = numeric("credit_score")
+        income = numeric("income_extracted")
+        loan_amount = numeric("loan_amount")
+        emi = numeric("emi_detected")
+        if "employment_type" in frame:
+            employment_raw = frame["employment_type"].fillna("").astype(str)
+        else:
+            employment_raw = pd.Series([""] * n, dtype=object)
+        employment = employment_raw.str.lower().to_numpy()
+
+        nan = np.full(n, np.nan)
+
+        # Credit score band
+        credit_points = np.select(
+            [credit_score >= 750, credit_score >= 700, credit_score >= 650],
+            [0.35, 0.25, 0.15],
+            0.05,
+        )
+        credit_impact = np.where(credit_score >= 650, credit_points, -0.25)
+
+        # Debt-to-income band (only when income and loan amount are known)
+        has_dti = (income > 0) & (loan_amount > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            debt_to_income = np.where(has_dti, loan_amount / (income * 12), np.nan)
+        dti_points = np.select(
+            [has_dti & (debt_to_income < 3), has_dti & (debt_to_income < 4)],
+            [0.25, 0.15],
+            0.0,
+        )
+        dti_impact = np.where(has_dti, np.where(dti_points > 0, dti_points, -0.15), nan)
+
+        # EMI-to-income band (only when income and EMI are known)
+        has_emi = (income > 0) & (emi > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            emi_ratio = np.where(has_emi, emi / income, np.nan)
+        emi_points = np.select(
+            [has_emi & (emi_ratio < 0.3), has_emi & (emi_ratio < 0.4)],
+            [0.20, 0.10],
+            0.0,
+        )
+        emi_impact = np.where(has_emi, np.where(emi_points > 0, emi_points, -0.20), nan)
+
+        # Employment type band
+        employment_points = np.select(
+            [np.isin(employment, ["salaried", "permanent"]), np.isin(employment, ["self-employed", "business"])],
+            [0.15, 0.10],
+            0.05,
+        )
+
+        # Monthly income band
+        income_points = np.select([income >= 50000, income >= 30000], [0.10, 0.05], 0.0)
+        income_impact = np.where(income_points > 0, income_points, np.nan)
+
+        # Accumulate in the scalar order so float sums match predict_eligibility exactly
+        eligibility_score = np.zeros(n, dtype=np.float64)
+        for points in (credit_points, dti_points, emi_points, employment_points, income_points):
+            eligibility_score += points
+        eligibility_score = np.minimum(eligibility_score, 1.0)
+
+        eligible = (eligibility_score >= 0.65) & (credit_score >= 650)
+
+        result = {
+            "eligibility_score": np.round(eligibility_score, 2),
+            "eligible": eligible,
+            "contributions": dict(zip(FACTOR_NAMES, [credit_impact, dti_impact, emi_impact, employment_points, income_impact])),
+        }
+
+        if explain:
+            result["shap_explanation"] = self._batch_explanations(
+                frame, credit_impact, dti_impact, emi_impact, employment_points, income_impact,
+                debt_to_income, emi_ratio, employment_raw.tolist(),
+            )
+
+        return result
+
+    @staticmethod
+    def _direction(feature: str, impact: float) -> str:
+        if impact < 0:
+            return "negative"
+        return "positive" if impact >= POSITIVE_IMPACT[feature] else "neutral"
+
+    def _batch_explanations(self, frame: "pd.DataFrame", credit_impact: "np.ndarray", dti_impact: "np.ndarray",
+                            emi_impact: "np.ndarray", employment_impact: "np.ndarray", income_impact: "np.ndarray",
+                            debt_to_income: "np.ndarray", emi_ratio: "np.ndarray",
+                            employment_values: List[Any]) -> List[List[Dict[str, Any]]]:
+        """Materialize per-row factor dicts in the same shape as predict_eligibility."""
+        n = len(frame)
+        raw_credit = frame["credit_score"].tolist() if "credit_score" in frame else [0] * n
+        raw_income = frame["income_extracted"].tolist() if "income_extracted" in frame else [0] * n
+        if "employment_type" not in frame:
+            employment_values = [""] * n
+
+        columns = zip(
+            credit_impact.tolist(), dti_impact.tolist(), emi_impact.tolist(),
+            employment_impact.tolist(), income_impact.tolist(),
+            debt_to_income.tolist(), emi_ratio.tolist(),
+            raw_credit, raw_income, employment_values,
+        )
+
+        explanations = []
+        for credit, dti, emi, employment, income, dti_value, emi_value, credit_value, income_value, employment_value in columns:
+            factors = [{"feature": "Credit Score", "impact": credit, "value": credit_value,
+                        "direction": self._direction("Credit Score", credit)}]
+            if dti == dti:
+                factors.append({"feature": "Debt-to-Income Ratio", "impact": dti, "value": round(dti_value, 2),
+                                "direction": self._direction("Debt-to-Income Ratio", dti)})
+            if emi == emi:
+                factors.append({"feature": "EMI-to-Income Ratio", "impact": emi, "value": round(emi_value, 2),
+                                "direction": self._direction("EMI-to-Income Ratio", emi)})
+            factors.append({"feature": "Employment Type", "impact": employment, "value": employment_value,
+                            "direction": self._direction("Employment Type", employment)})
+            if income == income:
+                factors.append({"feature": "Monthly Income", "impact": income, "value": income_value,
+                                "direction": self._direction("Monthly Income", income)})
+            explanations.append(factors)
+
+        return explanations
+
 
 ml_service = LoanMLService()
@@ -0,0 +1,114 @@
+"""
+Local Model Runtime
+Loads a trained joblib/scikit-learn artifact once, warms it up, and serves predictions
+behind the same interface as the rule-based LoanMLService, which stays as the fallback.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from config import settings
+from ml_service import LoanMLService, BatchFeatures, ml_service
+
+logger = logging.getLogger(__name__)
+
+# One typical applicant used to warm a freshly loaded model before it takes traffic
+WARMUP_FEATURES = {
+    "credit_score": 700,
+    "income_extracted": 50000.0,
+    "loan_amount": 500000.0,
+    "emi_detected": 5000.0,
+    "employment_type": "Salaried",
+}
+
+
+def resolve_model_path(path: str) -> str:
+    """
+    Resolve a model path given to /manager/model/reload against ML_MODEL_DIR.
+
+    Loading an artifact unpickles it, which can run arbitrary code, so only files
+    inside ML_MODEL_DIR (after resolving symlinks and "..") are accepted.
+    Raises ValueError for anything else.
+    """
+    model_dir = os.path.realpath(settings.ML_MODEL_DIR)
+    resolved = os.path.realpath(os.path.join(model_dir, path))
+    if os.path.commonpath([model_dir, resolved]) != model_dir:
+        raise ValueError(f"Model artifacts must be inside ML_MODEL_DIR ({settings.ML_MODEL_DIR})")
+    return resolved
+
+
+class ModelRuntime:
+    """
+    Holds the active scoring model and swaps it atomically.
+
+    Callers read self.model once per prediction, so a reload only changes which
+    model new requests see; requests already scoring keep the model they started with.
+    """
+
+    def __init__(self, fallback: LoanMLService):
+        self.fallback = fallback
+        self.model: Any = fallback
+        self.model_path: Optional[str] = None
+        self.loaded_at: Optional[str] = None
+        self._reload_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Load the configured local model at startup, keeping the rule-based model on failure."""
+        if not settings.USE_LOCAL_ML_MODEL:
+            logger.info("Local ML model disabled, using rule-based scoring")
+            return
+
+        if not os.path.exists(settings.ML_MODEL_PATH):
+            logger.info(f"No model artifact at {settings.ML_MODEL_PATH}, using rule-based scoring")
+            return
+
+        try:
+            self.load(settings.ML_MODEL_PATH)
+        except Exception as e:
+            logger.error(f"Failed to load model from {settings.ML_MODEL_PATH}: {e}")
+
+    def load(self, path: str) -> Dict[str, Any]:
+        """
+        Load, warm and publish a new model artifact.
+
+        The new model is fully loaded and has served a dummy inference before it
+        replaces the current one. Raises if the artifact cannot be loaded or scored.
+        """
+        from explanation_service import explanation_service
+        from sklearn_model import SklearnModel
+
+        with self._reload_lock:
+            model = SklearnModel.load(path, self.fallback)
+            self._warm(model)
+
+            self.model = model
+            explanation_service.cache.clear()
+            self.model_path = path
+            self.loaded_at = datetime.utcnow().isoformat()
+            logger.info(f"Loaded {model.name} model from {path}")
+
+        return self.info()
+
+    def _warm(self, model: Any) -> None:
+        model.predict_eligibility(dict(WARMUP_FEATURES))
+        model.predict_eligibility_batch({name: [value] for name, value in WARMUP_FEATURES.items()}, explain=False)
+
+    def info(self) -> Dict[str, Any]:
+        model = self.model
+        return {
+            "model": "rule_based" if model is self.fallback else model.name,
+            "path": self.model_path,
+            "loaded_at": self.loaded_at,
+        }
+
+    def predict_eligibility(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        return self.model.predict_eligibility(features)
+
+    def predict_eligibility_batch(self, features: BatchFeatures, explain: bool = True) -> Dict[str, Any]:
+        return self.model.predict_eligibility_batch(features, explain=explain)
+
+
+model_runtime = ModelRuntime(fallback=ml_service)
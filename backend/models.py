@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
+from uuid import UUID
 
 class SessionCreate(BaseModel):
     channel: str = Field(..., description="chat or voice")
@@ -36,8 +37,11 @@ class BankStatementRequest(BaseModel):
     document_text: str
 
 class BankStatementResponse(BaseModel):
-    income_extracted: float
-    emi_detected: float
+    income_extracted: Optional[float]
+    emi_detected: Optional[float]
+    status: str
+    confidence: float
+    transactions: List[Dict[str, Any]] = []
     message: str
 
 class PredictRequest(BaseModel):
@@ -67,6 +71,7 @@ class ApplicationSummary(BaseModel):
     credit_score: Optional[int]
     final_status: str
     created_at: str
+    updated_at: Optional[str] = None
 
 class ApplicationDetail(BaseModel):
     id: str
@@ -82,7 +87,7 @@ class ApplicationDetail(BaseModel):
     documents_verified: bool
     eligibility_score: Optional[float]
     final_status: str
-    shap_explanation: Optional[Dict[str, Any]]
+    shap_explanation: Optional[List[Dict[str, Any]]]
     aadhaar_document_url: Optional[str]
     bank_statement_url: Optional[str]
     created_at: str
@@ -90,8 +95,95 @@ class ApplicationDetail(BaseModel):
 
 class ApprovalRequest(BaseModel):
     application_id: str
-    manager_email: str
+    manager_email: Optional[str] = None  # unused; the manager comes from the token
+
+class DecisionItem(BaseModel):
+    application_id: str
+    decision: Literal["approved", "rejected"]
+    # updated_at from the listing; the decision is skipped if the row changed since
+    expected_updated_at: Optional[str] = None
+
+class BulkDecisionRequest(BaseModel):
+    decisions: List[DecisionItem] = Field(..., min_length=1)
+
+class DecisionResult(BaseModel):
+    application_id: str
+    outcome: str  # applied, conflict or not_found
+    final_status: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class BulkDecisionResponse(BaseModel):
+    results: List[DecisionResult]
+    applied: int
+    conflicts: int
+    not_found: int
 
 class UploadUrlRequest(BaseModel):
     session_id: str
     file_type: str
+    extension: str = "pdf"
+
+class MultipartUploadRequest(BaseModel):
+    session_id: str
+    file_type: str
+    extension: str = "pdf"
+    size: int = Field(gt=0)
+
+class UploadPartsRequest(BaseModel):
+    session_id: str
+    key: str
+    upload_id: str
+    part_numbers: List[int] = Field(min_length=1)
+
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: str
+
+class CompleteUploadRequest(BaseModel):
+    session_id: str
+    key: str
+    upload_id: str
+    parts: List[CompletedPart] = Field(min_length=1)
+
+class AbortUploadRequest(BaseModel):
+    session_id: str
+    key: str
+    upload_id: str
+
+class RescoreRequest(BaseModel):
+    after_id: Optional[UUID] = None
+    # Bounded so one call stays short; run rescore_service.py for a full pass
+    max_pages: int = Field(default=10, ge=1, le=100)
+    page_size: int = Field(default=500, ge=1, le=5000)
+
+class RescoreResponse(BaseModel):
+    processed: int
+    eligible: int
+    needs_review: int
+    skipped: int
+    pages: int
+    last_id: Optional[str]
+    done: bool
+
+class ModelReloadRequest(BaseModel):
+    model_path: Optional[str] = None  # file name (or path) inside ML_MODEL_DIR
+
+class VerificationJobRequest(BaseModel):
+    session_id: str
+    aadhaar_text: Optional[str] = None
+    aadhaar_s3_key: Optional[str] = None
+    bank_statement_text: Optional[str] = None
+    bank_statement_s3_key: Optional[str] = None
+    score: bool = True
+
+class JobResponse(BaseModel):
+    job_id: str
+    type: str
+    session_id: str
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+    finished_at: Optional[str] = None
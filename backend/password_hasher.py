@@ -0,0 +1,109 @@
+"""
+Password Hashing Executor
+bcrypt is deliberately slow (~250 ms per check at cost 12). Checks run in a small
+process pool so a burst of manager logins cannot stall the event loop serving chat,
+and once the pool and its queue are full further logins are refused immediately
+instead of piling up.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def pwd_context() -> "CryptContext":
+    """Built on first use rather than at import; also built once in each pool process"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password and, when the hash uses outdated settings (e.g. fewer rounds
+    than BCRYPT_ROUNDS), return a fresh hash to store. Runs in a pool process.
+    """
+    try:
+        return pwd_context().verify_and_update(password, hashed_password)
+    except ValueError:
+        # Malformed or unknown hash format
+        return False, None
+
+
+def hash_password(password: str) -> str:
+    return pwd_context().hash(password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE checks are already pending."""
+
+
+class PasswordHasher:
+    """
+    Bounded ProcessPoolExecutor for bcrypt. Workers are spawned rather than forked
+    so they do not inherit the API process's threads and open connections.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def _run(self, fn, *args):
+        # Only touched from the event loop, so the counter needs no lock
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy(f"{self.pending} password checks already pending")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
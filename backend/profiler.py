@@ -0,0 +1,168 @@
+"""
+Live profiling
+Two opt-in tools for finding where time goes on a running worker without redeploying:
+
+- SamplingProfiler snapshots every thread's stack at a fixed interval for a few seconds
+  and returns collapsed stacks ("thread;frame;frame count" lines) that flamegraph.pl and
+  speedscope read directly. Nothing runs between profiles.
+- ProfileRequestMiddleware runs cProfile around a single request when it carries a
+  valid manager token in X-Profile-Token, and keeps the report for
+  GET /manager/profiles/{profile_id}. Other requests pay one header lookup.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+PROFILE_HEADER = b"x-profile-token"
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile of the same kind is already running on this worker."""
+
+
+def _frame_label(code: Any) -> str:
+    # Semicolons separate frames in the collapsed format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling sys._current_frames() from a background thread."""
+
+    def __init__(self, max_seconds: float, min_interval_ms: float):
+        self.max_seconds = max_seconds
+        self.min_interval_ms = min_interval_ms
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float, interval_ms: float) -> str:
+        """Sample for the given time (blocking) and return collapsed stacks, hottest first."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A sampling profile is already running")
+        try:
+            stacks = self._collect(
+                min(seconds, self.max_seconds),
+                max(interval_ms, self.min_interval_ms) / 1000
+            )
+        finally:
+            self._lock.release()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    @staticmethod
+    def _collect(seconds: float, interval: float) -> Counter:
+        stacks: Counter = Counter()
+        own_thread = threading.get_ident()
+        labels: Dict[Any, str] = {}
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    frames.append(label)
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(frames))] += 1
+            time.sleep(interval)
+
+        return stacks
+
+
+class RequestProfiles:
+    """The most recent per-request cProfile reports, oldest dropped first."""
+
+    def __init__(self, max_size: int, top_n: int):
+        self.max_size = max_size
+        self.top_n = top_n
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.active = False
+
+    def add(self, profile_id: str, method: str, path: str, elapsed: float, profile: cProfile.Profile) -> None:
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(self.top_n)
+        self._reports[profile_id] = {
+            "profile_id": profile_id,
+            "method": method,
+            "path": path,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "report": stream.getvalue()
+        }
+        while len(self._reports) > self.max_size:
+            self._reports.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self._reports.get(profile_id)
+
+
+class ProfileRequestMiddleware:
+    """
+    ASGI middleware profiling requests that carry a valid manager token in
+    X-Profile-Token; the response gets an X-Profile-Id header naming the report.
+
+    cProfile only sees the event loop thread, so time in the blocking_pools threads
+    shows up as the await on run_in_executor. Coroutines of other requests running
+    meanwhile are included, and only one request is profiled at a time.
+    """
+
+    def __init__(self, app: Any, profiles: Optional[RequestProfiles] = None):
+        self.app = app
+        self.profiles = profiles or request_profiles
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        token = dict(scope.get("headers") or []).get(PROFILE_HEADER)
+        if token is None or not self._authorized(token):
+            await self.app(scope, receive, send)
+            return
+
+        if self.profiles.active:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-status", b"busy"))
+            return
+
+        profile_id = uuid.uuid4().hex
+        profile = cProfile.Profile()
+        self.profiles.active = True
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-id", profile_id.encode()))
+        finally:
+            profile.disable()
+            self.profiles.active = False
+            self.profiles.add(profile_id, scope.get("method", ""), scope.get("path", ""),
+                              time.perf_counter() - start, profile)
+
+    @staticmethod
+    def _authorized(token: bytes) -> bool:
+        from auth import token_verifier
+        return token_verifier.verify(token.decode("latin-1")) is not None
+
+    @staticmethod
+    def _with_header(send: Callable, name: bytes, value: bytes) -> Callable:
+        async def send_with_header(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [(name, value)]}
+            await send(message)
+        return send_with_header
+
+
+sampling_profiler = SamplingProfiler(settings.PROFILER_MAX_SECONDS, settings.PROFILER_MIN_INTERVAL_MS)
+request_profiles = RequestProfiles(settings.PROFILE_HISTORY_SIZE, settings.PROFILE_TOP_FUNCTIONS)
@@ -0,0 +1,247 @@
+"""
+Rate Limiting
+Token-bucket limits per client, applied by an ASGI middleware before any handler runs.
+Every request is charged to a bucket holding RATE_LIMIT_REQUESTS tokens that refill
+over RATE_LIMIT_WINDOW_SECONDS. Routes listed in RATE_LIMIT_ROUTES are also charged to
+a budget and key of their own, e.g. /chat-input limited per session_id as well.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs
+
+from config import settings
+
+KEY_TYPES = ("ip", "session", "manager")
+
+# JSON bodies larger than this are not parsed for a session_id; the client IP is used
+MAX_PEEK_BODY_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A budget of requests per window_seconds, with requests keyed by key_type."""
+    requests: int
+    window_seconds: float
+    key_type: str = "ip"
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.requests / self.window_seconds
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def parse_route_limits(spec: str) -> Dict[str, RateLimit]:
+    """
+    Parse RATE_LIMIT_ROUTES, a comma-separated list of path=[key:]requests/seconds,
+    e.g. "/chat-input=session:30/60,/manager/login=ip:5/60".
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        path, _, budget = item.partition("=")
+        key_type, _, rate = budget.rpartition(":")
+        requests, _, window = rate.partition("/")
+        key_type = key_type or "ip"
+        if key_type not in KEY_TYPES:
+            raise ValueError(f"Unknown rate limit key {key_type!r} for {path}; expected one of {KEY_TYPES}")
+        limits[path.strip()] = RateLimit(int(requests), float(window), key_type)
+    return limits
+
+
+class RateLimitStore:
+    """
+    Storage interface for token buckets.
+    Deployments running several workers plug in a shared store (e.g. Redis, with
+    the refill-and-take done atomically in a Lua script) implementing take().
+    """
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> Decision:
+        raise NotImplementedError
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process buckets. take() never awaits, so on the event loop each call runs
+    start to finish without interleaving and needs no lock.
+    """
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> Decision:
+        return self.take_now(key, limit, cost)
+
+    def take_now(self, key: str, limit: RateLimit, cost: float = 1.0) -> Decision:
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now, limit)
+            bucket = self._buckets[key] = [float(limit.requests), now]
+
+        tokens = min(float(limit.requests), bucket[0] + (now - bucket[1]) * limit.refill_per_second)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return Decision(True, int(bucket[0]), 0.0)
+
+        bucket[0] = tokens
+        return Decision(False, 0, (cost - tokens) / limit.refill_per_second)
+
+    def _evict(self, now: float, limit: RateLimit) -> None:
+        """Drop buckets idle long enough to have refilled; failing that, the oldest tenth."""
+        idle = [key for key, (_, last) in self._buckets.items() if now - last >= limit.window_seconds]
+        if not idle:
+            idle = list(self._buckets)[:max(1, self.max_keys // 10)]
+        for key in idle:
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def _client_ip(scope: Dict[str, Any], headers: Dict[bytes, bytes]) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(b",", 1)[0].strip().decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _manager_id(headers: Dict[bytes, bytes]) -> Optional[str]:
+    authorization = headers.get(b"authorization", b"")
+    if not authorization.startswith(b"Bearer "):
+        return None
+    from auth import token_verifier
+    identity = token_verifier.verify(authorization[7:].decode("latin-1"))
+    return identity.id if identity else None
+
+
+def _query_session_id(scope: Dict[str, Any]) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("session_id")
+    return values[0] if values else None
+
+
+async def _peek_body(receive: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """Read the whole request body, keeping the messages so they can be replayed."""
+    messages = []
+    body = b""
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    return body, messages
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing token buckets, answering 429 with Retry-After when a
+    bucket is empty. Keys are "ip", "session" (session_id from the query string or
+    JSON body, else the IP) or "manager" (manager id from the bearer token, else the
+    IP). The default limit uses the manager id when a valid token is sent and is
+    charged for every request, so a client cannot escape it by rotating the
+    session_ids a route limit is keyed on.
+    """
+
+    def __init__(self, app: Any, store: Optional[RateLimitStore] = None,
+                 default_limit: Optional[RateLimit] = None,
+                 route_limits: Optional[Dict[str, RateLimit]] = None,
+                 exempt_paths: Optional[List[str]] = None):
+        self.app = app
+        self.store = store or InMemoryRateLimitStore(settings.RATE_LIMIT_MAX_KEYS)
+        self.default_limit = default_limit or RateLimit(settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_WINDOW_SECONDS)
+        self.route_limits = parse_route_limits(settings.RATE_LIMIT_ROUTES) if route_limits is None else route_limits
+        self.exempt_paths = set(settings.RATE_LIMIT_EXEMPT_PATHS if exempt_paths is None else exempt_paths)
+        self.rejected = 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or path in self.exempt_paths \
+                or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        manager_id = _manager_id(headers)
+        ip_key = f"ip:{_client_ip(scope, headers)}"
+        limit = self.default_limit
+        decision = await self.store.take(f"manager:{manager_id}" if manager_id else ip_key, limit)
+
+        route_limit = self.route_limits.get(path)
+        if decision.allowed and route_limit is not None:
+            if route_limit.key_type == "session":
+                session_id = _query_session_id(scope)
+                if session_id is None and self._json_body_fits(headers):
+                    body, messages = await _peek_body(receive)
+                    receive = self._replay(messages, receive)
+                    session_id = self._body_session_id(body)
+                key = f"session:{session_id}" if session_id else ip_key
+            elif route_limit.key_type == "manager":
+                key = f"manager:{manager_id}" if manager_id else ip_key
+            else:
+                key = ip_key
+            limit = route_limit
+            decision = await self.store.take(f"{path}|{key}", limit)
+
+        if not decision.allowed:
+            self.rejected += 1
+            await self._reject(send, limit, decision)
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _json_body_fits(headers: Dict[bytes, bytes]) -> bool:
+        if not headers.get(b"content-type", b"").startswith(b"application/json"):
+            return False
+        length = headers.get(b"content-length")
+        return length is not None and length.isdigit() and int(length) <= MAX_PEEK_BODY_BYTES
+
+    @staticmethod
+    def _body_session_id(body: bytes) -> Optional[str]:
+        try:
+            session_id = json.loads(body).get("session_id")
+        except (ValueError, AttributeError):
+            return None
+        return str(session_id) if session_id else None
+
+    @staticmethod
+    def _replay(messages: List[Dict[str, Any]], receive: Callable) -> Callable:
+        pending = list(messages)
+
+        async def replay() -> Dict[str, Any]:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+        return replay
+
+    @staticmethod
+    async def _reject(send: Callable, limit: RateLimit, decision: Decision) -> None:
+        retry_after = max(1, int(decision.retry_after + 0.999))
+        body = json.dumps({"detail": "Too many requests", "retry_after": retry_after}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+                (b"x-ratelimit-limit", str(limit.requests).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+from typing import Dict, Any, List, Optional, Callable, Set
+
+from database import get_supabase
+from model_runtime import model_runtime
+
+# Only the columns the model reads, plus the keys needed to write results back
+# (updated_at is the row version the write is conditional on)
+RESCORE_COLUMNS = "id,session_id,updated_at,credit_score,income_extracted,loan_amount,emi_detected,employment_type"
+
+# Applications still waiting on a manager decision (apply_rescores checks the same list)
+RESCORABLE_STATUSES = ["pending", "eligible", "needs_review"]
+
+DEFAULT_PAGE_SIZE = 500
+
+
+class RescoreService:
+    """
+    Re-scores every undecided application after a policy or threshold change.
+
+    Pages through loan_applications in keyset order on id, scores each page with
+    model_runtime.predict_eligibility_batch and writes the page back with one
+    apply_rescores call, so a full pass costs two round trips per page instead of
+    two per application. Rows decided or changed after the page was read are skipped,
+    never overwritten.
+    """
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE):
+        self.page_size = page_size
+
+    def fetch_page(self, after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Fetch the next page of scored, undecided applications after after_id."""
+        supabase = get_supabase()
+
+        query = (
+            supabase.table("loan_applications")
+            .select(RESCORE_COLUMNS)
+            .in_("final_status", RESCORABLE_STATUSES)
+            .not_.is_("eligibility_score", "null")
+        )
+        if after_id:
+            query = query.gt("id", after_id)
+
+        result = query.order("id").limit(limit).execute()
+        return result.data or []
+
+    def score_page(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score a page of rows and build the apply_rescores payload."""
+        import pandas as pd
+
+        prediction = model_runtime.predict_eligibility_batch(pd.DataFrame(rows))
+
+        return [
+            {
+                "id": row["id"],
+                "eligibility_score": float(score),
+                "shap_explanation": explanation,
+                "final_status": "eligible" if eligible else "needs_review",
+                "expected_updated_at": row.get("updated_at"),
+            }
+            for row, score, eligible, explanation in zip(
+                rows,
+                prediction["eligibility_score"].tolist(),
+                prediction["eligible"].tolist(),
+                prediction["shap_explanation"],
+            )
+        ]
+
+    def write_page(self, updates: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Write a scored page back in one apply_rescores call and return the ids that
+        were updated. Rows whose final_status left RESCORABLE_STATUSES or whose
+        updated_at changed since fetch_page are left alone.
+        """
+        if not updates:
+            return set()
+
+        supabase = get_supabase()
+        result = supabase.rpc("apply_rescores", {"p_updates": updates}).execute()
+        return {str(row["application_id"]) for row in result.data or []}
+
+    def run(
+        self,
+        after_id: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Re-score applications page by page.
+
+        Args:
+            after_id: Resume after this application id (exclusive)
+            max_pages: Stop after this many pages; None runs to completion
+            checkpoint_path: JSON file to resume from and to update after every page
+            on_progress: Called with the progress dict after every page
+
+        Returns:
+            Progress dictionary with processed/eligible/needs_review counts,
+            skipped (rows changed since they were read), pages, last_id and a done flag
+        """
+        progress = {
+            "processed": 0,
+            "eligible": 0,
+            "needs_review": 0,
+            "skipped": 0,
+            "pages": 0,
+            "last_id": after_id,
+            "done": False,
+        }
+
+        if checkpoint_path and after_id is None:
+            checkpoint = load_checkpoint(checkpoint_path)
+            if checkpoint and not checkpoint.get("done"):
+                progress.update(checkpoint)
+
+        pages_this_run = 0
+        while max_pages is None or pages_this_run < max_pages:
+            rows = self.fetch_page(progress["last_id"], self.page_size)
+            if not rows:
+                progress["done"] = True
+                break
+
+            updates = self.score_page(rows)
+            written = self.write_page(updates)
+
+            applied = [update for update in updates if str(update["id"]) in written]
+            eligible = sum(1 for update in applied if update["final_status"] == "eligible")
+            progress["processed"] += len(applied)
+            progress["eligible"] += eligible
+            progress["needs_review"] += len(applied) - eligible
+            progress["skipped"] += len(updates) - len(applied)
+            progress["pages"] += 1
+            progress["last_id"] = rows[-1]["id"]
+            pages_this_run += 1
+
+            if len(rows) < self.page_size:
+                progress["done"] = True
+
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, progress)
+            if on_progress:
+                on_progress(progress)
+
+            if progress["done"]:
+                break
+
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, progress)
+
+        return progress
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Load a rescore checkpoint, or None if there is none yet."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, progress: Dict[str, Any]) -> None:
+    """Atomically write the rescore checkpoint."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score all undecided loan applications")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--checkpoint", default="rescore_checkpoint.json",
+                        help="Checkpoint file used to resume an interrupted run")
+    parser.add_argument("--after-id", default=None, help="Start after this application id")
+    parser.add_argument("--max-pages", type=int, default=None)
+    args = parser.parse_args()
+
+    def print_progress(progress: Dict[str, Any]) -> None:
+        print(f"page {progress['pages']}: {progress['processed']} re-scored "
+              f"({progress['eligible']} eligible, {progress['needs_review']} needs review, "
+              f"{progress['skipped']} skipped as changed since read), "
+              f"last id {progress['last_id']}")
+
+    model_runtime.start()
+
+    job = RescoreService(page_size=args.page_size)
+    final = job.run(
+        after_id=args.after_id,
+        max_pages=args.max_pages,
+        checkpoint_path=args.checkpoint,
+        on_progress=print_progress,
+    )
+    print("✅ Re-score complete" if final["done"] else "⏸️ Re-score paused; rerun to resume from checkpoint")
@@ -0,0 +1,124 @@
+"""
+Session State Cache
+Keeps the chat state machine's collected fields and current step per session_id
+so a chat turn does not have to re-read loan_applications. Every entry carries the
+row's updated_at; writes are conditional on it, so a stale entry (another worker
+or writer changed the row) is detected and reloaded instead of being trusted.
+"""
+
+import abc
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from config import settings
+
+# Order in which the chat collects application fields
+CHAT_STEPS = ["name", "income_claimed", "loan_amount", "employment_type", "credit_score"]
+
+
+def current_step(fields: Dict[str, Any]) -> str:
+    """Name of the next field the chat asks for, or 'complete'."""
+    for field in CHAT_STEPS:
+        value = fields.get(field)
+        if value is None or (field in ("name", "employment_type") and not value):
+            return field
+    return "complete"
+
+
+class SessionStateBackend(abc.ABC):
+    """
+    Storage interface for session state.
+    A shared store (e.g. Redis) implementing these three methods saves the reload
+    after another worker's turn; the per-process one stays correct because every
+    write is checked against the row version.
+    """
+
+    @abc.abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    async def set(self, session_id: str, state: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+
+class InMemorySessionBackend(SessionStateBackend):
+    """Bounded, thread-safe LRU with a per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            expires_at, state = entry
+            if expires_at < time.monotonic():
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return dict(state)
+
+    async def set(self, session_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[session_id] = (time.monotonic() + self.ttl_seconds, dict(state))
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SessionStateCache:
+    """
+    Write-through cache of chat session state.
+    Callers write to Supabase first and then call set(), so a failed write
+    never leaves the cache ahead of the database.
+    """
+
+    def __init__(self, backend: SessionStateBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def set_backend(self, backend: SessionStateBackend) -> None:
+        self.backend = backend
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        state = await self.backend.get(session_id)
+        if state is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return state
+
+    async def set(self, session_id: str, fields: Dict[str, Any]) -> None:
+        """Store the collected fields with the loan_applications.updated_at they were read or written at."""
+        state = {field: fields.get(field) for field in CHAT_STEPS}
+        state["step"] = current_step(state)
+        state["updated_at"] = fields.get("updated_at")
+        await self.backend.set(session_id, state)
+
+    async def invalidate(self, session_id: Optional[str]) -> None:
+        if session_id:
+            await self.backend.delete(session_id)
+
+
+session_state_cache = SessionStateCache(
+    InMemorySessionBackend(settings.SESSION_CACHE_SIZE, settings.SESSION_CACHE_TTL_SECONDS)
+)
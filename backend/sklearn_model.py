@@ -0,0 +1,136 @@
+"""
+scikit-learn model wrapper
+Feature encoding and prediction for a trained joblib artifact, explained with TreeSHAP.
+Imported by model_runtime only when an artifact is loaded, so numpy, pandas and the
+explainer stay out of startup when scoring is rule-based.
+"""
+
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from explanation_service import TreeExplainer, explanation_service
+from ml_service import LoanMLService, BatchFeatures
+
+DEFAULT_FEATURE_NAMES = ["credit_score", "income_extracted", "loan_amount", "emi_detected", "employment_code"]
+
+EMPLOYMENT_CODES = {
+    "salaried": 2,
+    "permanent": 2,
+    "self-employed": 1,
+    "business": 1,
+}
+
+
+def encode_features(frame: pd.DataFrame, feature_names: List[str]) -> np.ndarray:
+    """
+    Build the model input matrix from application columns.
+
+    Besides raw numeric columns, supports the derived features employment_code,
+    debt_to_income and emi_ratio.
+    """
+    def numeric(column: str) -> np.ndarray:
+        if column not in frame:
+            return np.zeros(len(frame), dtype=np.float64)
+        return pd.to_numeric(frame[column], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+
+    columns = []
+    for name in feature_names:
+        if name == "employment_code":
+            employment = frame["employment_type"] if "employment_type" in frame else pd.Series([""] * len(frame))
+            codes = employment.fillna("").astype(str).str.lower().map(EMPLOYMENT_CODES).fillna(0)
+            columns.append(codes.to_numpy(dtype=np.float64))
+        elif name == "debt_to_income":
+            income = numeric("income_extracted")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                columns.append(np.where(income > 0, numeric("loan_amount") / (income * 12), 0.0))
+        elif name == "emi_ratio":
+            income = numeric("income_extracted")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                columns.append(np.where(income > 0, numeric("emi_detected") / income, 0.0))
+        else:
+            columns.append(numeric(name))
+
+    return np.column_stack(columns) if columns else np.empty((len(frame), 0))
+
+
+class SklearnModel:
+    """
+    Wraps a scikit-learn compatible estimator loaded from a joblib artifact.
+
+    The artifact is either a bare estimator or a dict bundle:
+        {"model": estimator, "feature_names": [...], "threshold": 0.65}
+    Tree ensembles are explained with exact TreeSHAP; other estimators fall back
+    to the rule-based factors of the fallback service.
+    """
+
+    def __init__(self, estimator: Any, path: str, fallback: LoanMLService,
+                 feature_names: Optional[List[str]] = None, threshold: float = 0.65):
+        self.estimator = estimator
+        self.path = path
+        self.fallback = fallback
+        self.feature_names = feature_names or DEFAULT_FEATURE_NAMES
+        self.threshold = threshold
+        self.name = type(estimator).__name__
+        self.explainer = TreeExplainer(estimator, len(self.feature_names)) if TreeExplainer.supports(estimator) else None
+
+    @classmethod
+    def load(cls, path: str, fallback: LoanMLService) -> "SklearnModel":
+        """Load an artifact, memory-mapping numpy arrays when it was saved uncompressed."""
+        import joblib
+
+        artifact = joblib.load(path, mmap_mode="r")
+        if isinstance(artifact, dict):
+            return cls(
+                artifact["model"], path, fallback,
+                feature_names=artifact.get("feature_names"),
+                threshold=artifact.get("threshold", 0.65),
+            )
+        return cls(artifact, path, fallback)
+
+    def _scores(self, X: np.ndarray) -> np.ndarray:
+        if hasattr(self.estimator, "predict_proba"):
+            return self.estimator.predict_proba(X)[:, 1]
+        return np.clip(np.asarray(self.estimator.predict(X), dtype=np.float64), 0.0, 1.0)
+
+    def predict_eligibility(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        frame = pd.DataFrame([features])
+        X = encode_features(frame, self.feature_names)
+        score = float(self._scores(X)[0])
+
+        if self.explainer is not None:
+            explanation = explanation_service.explain(self.explainer, X, frame, self.feature_names)
+        else:
+            explanation = self.fallback.predict_eligibility(features)["shap_explanation"]
+
+        return {
+            "eligibility_score": round(score, 2),
+            "eligible": score >= self.threshold,
+            "shap_explanation": explanation
+        }
+
+    def predict_eligibility_batch(self, features: BatchFeatures, explain: bool = True) -> Dict[str, Any]:
+        frame = features if isinstance(features, pd.DataFrame) else pd.DataFrame(dict(features))
+        X = encode_features(frame, self.feature_names)
+        scores = self._scores(X)
+
+        result = {
+            "eligibility_score": np.round(scores, 2),
+            "eligible": scores >= self.threshold,
+        }
+
+        if self.explainer is not None:
+            shap_values = explanation_service.shap_values(self.explainer, X)
+            result["contributions"] = {
+                name: shap_values[:, index] for index, name in enumerate(self.feature_names)
+            }
+            if explain:
+                result["shap_explanation"] = explanation_service.explain_batch(shap_values, X, frame, self.feature_names)
+        else:
+            rules = self.fallback.predict_eligibility_batch(frame, explain=explain)
+            result["contributions"] = rules["contributions"]
+            if explain:
+                result["shap_explanation"] = rules["shap_explanation"]
+
+        return result
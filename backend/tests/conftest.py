@@ -0,0 +1,23 @@
+"""
+Shared test setup
+The backend modules import each other by bare name (from config import settings),
+so the backend directory goes on sys.path before anything is collected.
+
+Benchmarks are marked with @pytest.mark.benchmark and assert loose ratios rather
+than absolute timings; deselect them with -m "not benchmark".
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Keep every external dependency mocked unless a test opts out explicitly
+for name in ("USE_MOCK_BEDROCK", "USE_MOCK_TEXTRACT", "USE_MOCK_SAGEMAKER", "USE_MOCK_S3", "USE_MOCK_SNS"):
+    os.environ.setdefault(name, "True")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: timing comparison with a loose bound")
@@ -0,0 +1,189 @@
+"""Verified-token cache, revocation list and the get_current_manager dependency."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+import auth
+import database
+from auth import ManagerIdentity, RevocationList, TokenVerifier, VerifiedTokenCache, create_access_token
+from config import settings
+
+
+class FakeRevokedTokens:
+    """Just enough of the supabase-py builder for the revoked_tokens table."""
+
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.upserts = []
+        self._pending = None
+
+    def table(self, name):
+        assert name == "revoked_tokens"
+        return self
+
+    def select(self, columns):
+        self._pending = ("select", None)
+        return self
+
+    def gt(self, column, value):
+        return self
+
+    def upsert(self, row):
+        self._pending = ("upsert", row)
+        return self
+
+    def execute(self):
+        kind, row = self._pending
+        if kind == "upsert":
+            self.upserts.append(row)
+            self.rows.append(row)
+            return type("Result", (), {"data": [row]})()
+        return type("Result", (), {"data": list(self.rows)})()
+
+
+@pytest.fixture
+def revoked_tokens(monkeypatch):
+    fake = FakeRevokedTokens()
+    monkeypatch.setattr(database, "supabase", fake)
+    return fake
+
+
+def _verifier(size=16, refresh_seconds=30.0):
+    return TokenVerifier(VerifiedTokenCache(size), RevocationList(refresh_seconds))
+
+
+def _token(manager_id="m-1", **kwargs):
+    return create_access_token({"id": manager_id, "email": f"{manager_id}@loanbank.com"}, **kwargs)
+
+
+def test_token_is_decoded_once_then_served_from_cache(monkeypatch):
+    decodes = []
+    real_verify_token = auth.verify_token
+    monkeypatch.setattr(auth, "verify_token", lambda token: decodes.append(token) or real_verify_token(token))
+    verifier = _verifier()
+    token = _token()
+
+    first = verifier.verify(token)
+    second = verifier.verify(token)
+
+    assert isinstance(first, ManagerIdentity) and first == second
+    assert first.id == "m-1" and first.email == "m-1@loanbank.com" and first.token_id
+    assert decodes == [token]
+
+
+def test_invalid_and_expired_tokens_are_rejected():
+    verifier = _verifier()
+
+    assert verifier.verify(_token(expires_delta=timedelta(seconds=-1))) is None
+    assert verifier.verify(_token()[:-2] + "xx") is None
+    assert verifier.verify("not-a-jwt") is None
+    assert len(verifier.cache) == 0
+
+
+def test_cache_entries_expire_with_the_token():
+    cache = VerifiedTokenCache(4)
+    cache.put("k", ManagerIdentity("m-1", "a@b", "jti", expires_at=100.0))
+
+    assert cache.get("k", now=99.0) is not None
+    assert cache.get("k", now=100.0) is None
+    assert len(cache) == 0
+
+
+def test_cache_is_a_bounded_lru():
+    cache = VerifiedTokenCache(2)
+    for key in "abc":
+        cache.put(key, ManagerIdentity(key, "", key, expires_at=time.time() + 60))
+        if key == "b":
+            cache.get("a", time.time())  # a is now more recent than b
+
+    assert len(cache) == 2
+    assert cache.get("b", time.time()) is None
+    assert cache.get("a", time.time()) and cache.get("c", time.time())
+
+
+def test_logout_revokes_the_token_everywhere(revoked_tokens):
+    verifier = _verifier()
+    token = _token()
+    identity = verifier.verify(token)
+
+    asyncio.run(verifier.revoke(token, identity))
+
+    assert verifier.verify(token) is None
+    assert verifier.verify(_token()) is not None  # other tokens of the same manager still work
+    assert revoked_tokens.upserts[0]["token_id"] == identity.token_id
+    assert revoked_tokens.upserts[0]["manager_id"] == "m-1"
+
+    # Another worker picks the revocation up on its next refresh
+    other_worker = _verifier()
+    assert other_worker.verify(token) is not None
+    asyncio.run(other_worker.revocations.refresh_if_stale())
+    assert other_worker.verify(token) is None
+
+
+def test_refresh_is_rate_limited_and_skips_bad_rows(revoked_tokens):
+    verifier = _verifier(refresh_seconds=60)
+    expires = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    revoked_tokens.rows = [
+        {"token_id": "good", "expires_at": expires},
+        {"token_id": "unparseable", "expires_at": "yesterday"},
+        {"expires_at": expires},
+    ]
+
+    asyncio.run(verifier.revocations.refresh_if_stale())
+
+    assert verifier.revocations.is_revoked("good")
+    assert verifier.revocations.is_revoked("unparseable")
+    revoked_tokens.rows.append({"token_id": "late", "expires_at": expires})
+    asyncio.run(verifier.revocations.refresh_if_stale())
+    assert not verifier.revocations.is_revoked("late")  # within refresh_seconds
+
+
+def test_manager_endpoints_use_the_verified_identity(revoked_tokens, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(auth.token_verifier, "cache", VerifiedTokenCache(16))
+    monkeypatch.setattr(auth.token_verifier, "revocations", RevocationList(0))
+    token = _token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                await client.get("/manager/model"),
+                await client.get("/manager/model", headers={"Authorization": "Bearer nope"}),
+                await client.get("/manager/model", headers=headers),
+                await client.post("/manager/logout", headers=headers),
+                await client.get("/manager/model", headers=headers),
+            ]
+
+    statuses = [response.status_code for response in asyncio.run(main())]
+
+    assert statuses == [401, 401, 200, 200, 401]
+
+
+@pytest.mark.benchmark
+def test_cached_verification_is_faster_than_decoding():
+    tokens = [_token(f"m-{i}") for i in range(50)]
+    verifier = _verifier(size=100)
+    rounds = 100
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            auth.verify_token(token)
+    uncached = (time.perf_counter() - start) / (rounds * len(tokens))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            verifier.verify(token)
+    cached = (time.perf_counter() - start) / (rounds * len(tokens))
+
+    print(f"\nmanager auth: uncached {uncached * 1e6:.1f} µs, cached {cached * 1e6:.1f} µs per request")
+    assert cached * 3 < uncached
@@ -0,0 +1,113 @@
+"""
+Shared boto3 clients: one client per service no matter how many threads ask for
+it first, and the throughput that saves over building a client per call. Calls
+never leave the process; a before-send handler answers them after a fixed delay.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+from botocore.awsrequest import AWSResponse
+
+from aws_clients import AWSClientFactory, ClientSpec
+
+NETWORK_LATENCY = 0.005
+BUCKET = "test-loan-documents"
+
+
+class StubSession:
+    """Session whose client() is slow, so racing first calls would each build one."""
+
+    def __init__(self):
+        self.created = 0
+        self._lock = threading.Lock()
+
+    def client(self, service, **kwargs):
+        time.sleep(0.05)
+        with self._lock:
+            self.created += 1
+        return SimpleNamespace(service=service, meta=SimpleNamespace(events=SimpleNamespace(register=lambda *a: None)))
+
+
+class EmptyBody:
+    def stream(self, **kwargs):
+        yield b""
+
+
+def stub_send(request, **kwargs):
+    """Answer a head_object as S3 would, without a socket."""
+    time.sleep(NETWORK_LATENCY)
+    return AWSResponse(request.url, 200, {"ETag": '"abc123"', "Content-Length": "3"}, EmptyBody())
+
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def test_one_client_is_created_and_shared_across_threads():
+    factory = AWSClientFactory({"s3": ClientSpec("us-east-1", 8, 5.0)})
+    session = StubSession()
+    factory._session = session
+    start = threading.Barrier(16)
+
+    def first_use():
+        start.wait()
+        return factory.get("s3")
+
+    with ThreadPoolExecutor(16) as pool:
+        clients = list(pool.map(lambda _: first_use(), range(16)))
+
+    assert session.created == 1
+    assert all(client is clients[0] for client in clients)
+    assert factory.get("s3") is clients[0]
+
+
+def test_pool_usage_counts_calls_on_the_shared_client(credentials):
+    factory = AWSClientFactory({"s3": ClientSpec("us-east-1", 4, 5.0)})
+    client = factory.get("s3")
+    client.meta.events.register("before-send.s3", stub_send)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: factory.get("s3").head_object(Bucket=BUCKET, Key="a.pdf"), range(40)))
+
+    usage = factory.metrics()["s3"]
+    assert usage["calls"] == 40
+    assert usage["in_flight"] == 0
+    assert usage["peak_in_flight"] <= 8
+    assert usage["saturated_calls"] > 0  # 8 threads on a 4-connection pool
+
+
+@pytest.mark.benchmark
+def test_shared_client_beats_a_client_per_call(credentials):
+    factory = AWSClientFactory({"s3": ClientSpec("us-east-1", 8, 5.0)})
+    factory.get("s3").meta.events.register("before-send.s3", stub_send)
+
+    def shared_call(_):
+        return factory.get("s3").head_object(Bucket=BUCKET, Key="a.pdf")
+
+    def fresh_client_call(_):
+        client = boto3.session.Session().client("s3", region_name="us-east-1")
+        client.meta.events.register("before-send.s3", stub_send)
+        return client.head_object(Bucket=BUCKET, Key="a.pdf")
+
+    def throughput(call, calls):
+        with ThreadPoolExecutor(8) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(call, range(calls)))
+            elapsed = time.perf_counter() - started
+        assert all(result["ETag"] == '"abc123"' for result in results)
+        return calls / elapsed
+
+    shared = throughput(shared_call, 200)
+    fresh = throughput(fresh_client_call, 16)  # building a client costs far more than the call
+
+    print(f"\nstub S3 head_object: {shared:.0f} calls/s shared client, {fresh:.0f} calls/s client per call")
+    assert shared >= 3 * fresh
@@ -0,0 +1,54 @@
+"""
+Import-time regression budget for main (see "Cold Start" in the README).
+Each check runs in a fresh interpreter so earlier tests' imports do not count.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The README's budget: ~550 ms is typical, and the headroom absorbs shared-CPU noise
+# but not an eager import of the deferred libraries (~1.1 s); slower CI can raise it
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "750"))
+
+# Loaded on first use only; importing main must not pull them in
+DEFERRED_MODULES = ["boto3", "botocore", "numpy", "pandas", "sklearn", "joblib", "supabase", "postgrest", "passlib"]
+
+
+def _python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True, timeout=60
+    )
+
+
+def test_heavy_libraries_are_not_imported_by_main():
+    result = _python("-c", f"import json, sys, main; print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))")
+
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_importing_main_creates_no_clients():
+    result = _python("-c", "import json, main, database, aws_clients; "
+                           "print(json.dumps([database.supabase is None, aws_clients.aws_clients._clients == {}]))")
+
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == [True, True]
+
+
+@pytest.mark.benchmark
+def test_main_import_time_budget():
+    timings = []
+    for _ in range(5):
+        stderr = _python("-X", "importtime", "-c", "import main").stderr
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| main$", stderr, re.MULTILINE)
+        assert match, stderr[-500:]
+        timings.append(int(match.group(1)) / 1000)
+
+    print(f"\nimport main: best {min(timings):.0f} ms of {', '.join(f'{t:.0f}' for t in timings)} ms "
+          f"(budget {IMPORT_BUDGET_MS:.0f} ms)")
+    assert min(timings) < IMPORT_BUDGET_MS
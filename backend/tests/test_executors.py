@@ -0,0 +1,145 @@
+"""
+BlockingPools keeps blocking clients off the event loop. The load test drives
+/start-session through the real app with a DB that sleeps on every call, on a
+single event loop (one uvicorn worker).
+"""
+
+import asyncio
+import gc
+import statistics
+import threading
+import time
+
+import httpx
+import pytest
+
+from executors import BlockingPools
+
+DB_LATENCY = 0.05
+
+
+class SlowQuery:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def execute(self):
+        time.sleep(DB_LATENCY)  # blocking network round trip
+        self.calls.append(threading.current_thread().name)
+        return type("Result", (), {"data": []})()
+
+
+class SlowSupabase:
+    """Stands in for the synchronous supabase-py client."""
+
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, row):
+        return SlowQuery(self.calls)
+
+
+def test_pool_size_bounds_concurrency():
+    pools = BlockingPools({"db": 4})
+    active = [0, 0]  # current, peak
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(pools.run("db", call) for _ in range(20)))
+
+    asyncio.run(main())
+    pools.shutdown()
+    assert active[1] == 4
+
+
+def test_slow_dependency_only_exhausts_its_own_pool():
+    pools = BlockingPools({"db": 2, "s3": 2})
+
+    async def main():
+        stuck = [asyncio.ensure_future(pools.run("s3", time.sleep, 0.5)) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await pools.run("db", time.sleep, 0.01)
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*stuck)
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    pools.shutdown()
+    assert elapsed < 0.25
+
+
+def test_errors_propagate_to_the_caller():
+    pools = BlockingPools({"db": 1})
+
+    def fail():
+        raise RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError, match="connection reset"):
+        asyncio.run(pools.run("db", fail))
+    pools.shutdown()
+
+
+@pytest.mark.benchmark
+def test_concurrent_requests_scale_on_one_worker(monkeypatch):
+    import database
+    from config import settings
+    from main import app
+
+    client = SlowSupabase()
+    monkeypatch.setattr(database, "supabase", client)
+    monkeypatch.setattr(settings, "CHAT_HISTORY_WRITE_BEHIND", False)  # both inserts hit the DB
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    requests = 40
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            loop_lag = []
+
+            async def probe():
+                # How late the loop runs a 10 ms timer while the requests are in flight
+                while True:
+                    start = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    loop_lag.append(time.perf_counter() - start - 0.01)
+
+            ticker = asyncio.ensure_future(probe())
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                http.post("/start-session", json={"channel": "chat"}) for _ in range(requests)
+            ))
+            elapsed = time.perf_counter() - start
+            ticker.cancel()
+            return responses, elapsed, loop_lag
+
+    # Modules imported by the other test files make full collections take ~100 ms;
+    # freeze them so the lag measured is the app's, not the test process's heap
+    gc.collect()
+    gc.freeze()
+    try:
+        responses, elapsed, loop_lag = asyncio.run(main())
+    finally:
+        gc.unfreeze()
+    p95_lag = statistics.quantiles(loop_lag, n=20, method="inclusive")[-1]
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len(client.calls) == 2 * requests
+    assert all(name.startswith("db-io") for name in client.calls)
+
+    serialized = 2 * requests * DB_LATENCY
+    print(f"\n{requests} concurrent /start-session: {elapsed * 1000:.0f} ms "
+          f"(serialized {serialized * 1000:.0f} ms), p95 loop lag {p95_lag * 1000:.1f} ms")
+    assert elapsed < serialized / 4
+    # A DB call on the loop thread would hold every timer up by at least DB_LATENCY
+    assert p95_lag < DB_LATENCY
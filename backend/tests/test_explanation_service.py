@@ -0,0 +1,117 @@
+"""TreeSHAP must be additive, match brute-force Shapley values and cache exact rows only."""
+
+import itertools
+import math
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, RandomForestRegressor
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from explanation_service import ExplanationCache, ExplanationService, TreeExplainer
+
+
+def _data(rows: int = 400, features: int = 4, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] - 0.25 * X[:, 3] > 0).astype(int)
+    return X, y
+
+
+def _model_output(estimator, X):
+    if type(estimator).__name__.startswith("GradientBoosting"):
+        return estimator.decision_function(X)
+    if hasattr(estimator, "classes_"):
+        return estimator.predict_proba(X)[:, 1]
+    return estimator.predict(X)
+
+
+def _conditional_expectation(tree, x, subset):
+    """E[f(x) | x_S] with the features outside S integrated out by cover (path-dependent)."""
+    t = tree.tree_
+
+    def visit(node):
+        left, right = t.children_left[node], t.children_right[node]
+        if left == -1:
+            value = t.value[node][0]
+            return float(value[1] / value.sum()) if len(value) > 1 else float(value[0])
+        feature = t.feature[node]
+        if feature in subset:
+            return visit(left if np.float32(x[feature]) <= t.threshold[node] else right)
+        cover = t.weighted_n_node_samples
+        return (cover[left] * visit(left) + cover[right] * visit(right)) / cover[node]
+
+    return visit(0)
+
+
+def _brute_force_shapley(tree, x, n_features):
+    phi = np.zeros(n_features)
+    for i in range(n_features):
+        others = [f for f in range(n_features) if f != i]
+        for size in range(len(others) + 1):
+            weight = math.factorial(size) * math.factorial(n_features - size - 1) / math.factorial(n_features)
+            for subset in itertools.combinations(others, size):
+                with_i = _conditional_expectation(tree, x, set(subset) | {i})
+                without_i = _conditional_expectation(tree, x, set(subset))
+                phi[i] += weight * (with_i - without_i)
+    return phi
+
+
+@pytest.mark.parametrize("estimator", [
+    DecisionTreeClassifier(max_depth=5, random_state=0),
+    DecisionTreeRegressor(max_depth=5, random_state=0),
+    RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0),
+    RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0),
+    GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0),
+], ids=lambda estimator: type(estimator).__name__)
+def test_shap_values_sum_to_prediction_minus_expected_value(estimator):
+    X, y = _data()
+    estimator.fit(X, y)
+    explainer = TreeExplainer(estimator, X.shape[1])
+
+    phi = explainer.shap_values(X[:100])
+
+    np.testing.assert_allclose(phi.sum(axis=1) + explainer.expected_value,
+                               _model_output(estimator, X[:100]), atol=1e-6)
+
+
+@pytest.mark.parametrize("estimator", [
+    DecisionTreeClassifier(max_depth=4, random_state=0),
+    DecisionTreeRegressor(max_depth=4, random_state=0),
+], ids=lambda estimator: type(estimator).__name__)
+def test_shap_values_match_brute_force_shapley(estimator):
+    X, y = _data(rows=200)
+    estimator.fit(X, y)
+    explainer = TreeExplainer(estimator, X.shape[1])
+
+    phi = explainer.shap_values(X[:20])
+
+    for row, x in zip(phi, X[:20]):
+        np.testing.assert_allclose(row, _brute_force_shapley(estimator, x, X.shape[1]), atol=1e-9)
+
+
+def test_cache_does_not_share_explanations_across_a_split():
+    X = np.array([[0.0], [1.0]] * 10)
+    y = np.array([0, 1] * 10)
+    tree = DecisionTreeClassifier(max_depth=1).fit(X, y)
+    threshold = float(tree.tree_.threshold[0])
+    explainer = TreeExplainer(tree, 1)
+    service = ExplanationService()
+
+    # Both rows round to the same two decimals but fall on opposite sides of the split
+    rows = np.array([[threshold - 0.001], [threshold + 0.001]])
+    cached = service.shap_values(explainer, rows)
+
+    np.testing.assert_allclose(cached, explainer.shap_values(rows))
+    assert cached[0, 0] < 0 < cached[1, 0]
+
+
+def test_cache_reuses_identical_rows():
+    cache = ExplanationCache(max_size=2)
+    row = np.array([1.5, 2.25])
+
+    cache.put(cache.key(1, row), np.array([0.1, 0.2]))
+
+    assert cache.get(cache.key(1, row.copy())) is not None
+    assert cache.get(cache.key(2, row)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
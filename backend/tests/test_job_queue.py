@@ -0,0 +1,200 @@
+"""
+Background jobs: SQLite store claiming and leases, JobQueue retries, and scoring
+applications whose numeric columns are still NULL.
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+import pytest
+
+import database
+import job_queue as job_queue_module
+from config import BACKEND_DIR, settings
+from job_queue import JobQueue, JobStore, SQLiteJobStore
+from verification_service import verification_service
+
+
+def _job(**fields):
+    now = job_queue_module._now().isoformat()
+    job = {
+        "id": str(uuid.uuid4()), "type": "test", "session_id": "session-1", "payload": {"n": 1},
+        "status": "queued", "attempts": 0, "max_attempts": 3,
+        "run_after": now, "created_at": now, "updated_at": now,
+    }
+    job.update(fields)
+    return job
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def test_job_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+
+def test_default_sqlite_path_is_under_the_backend_directory():
+    if "JOB_SQLITE_PATH" in os.environ:
+        pytest.skip("JOB_SQLITE_PATH is set explicitly")
+    assert settings.JOB_SQLITE_PATH == os.path.join(BACKEND_DIR, "jobs.db")
+
+
+def test_sqlite_store_round_trips_jobs(store):
+    job = _job(payload={"aadhaar_text": "1234 5678 9012"})
+    asyncio.run(store.create(job))
+
+    stored = asyncio.run(store.get(job["id"]))
+
+    assert stored["payload"] == {"aadhaar_text": "1234 5678 9012"}
+    assert stored["status"] == "queued"
+    assert stored["result"] is None
+    assert asyncio.run(store.get(str(uuid.uuid4()))) is None
+
+
+def test_each_job_is_claimed_by_one_worker(store):
+    jobs = [_job() for _ in range(20)]
+    for job in jobs:
+        store._create(job)
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        while True:
+            job = store._claim(worker_id, 60)
+            if job is None:
+                return
+            with lock:
+                claimed.append((job["id"], worker_id))
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(job_id for job_id, _ in claimed) == sorted(job["id"] for job in jobs)
+    for job_id, worker_id in claimed:
+        stored = store._get(job_id)
+        assert (stored["status"], stored["claimed_by"], stored["attempts"]) == ("running", worker_id, 1)
+
+
+def test_claim_skips_future_jobs_and_reclaims_expired_leases(store):
+    later = (job_queue_module._now() + timedelta(minutes=5)).isoformat()
+    store._create(_job(run_after=later))
+    job = _job()
+    store._create(job)
+
+    assert store._claim("worker-a", 0.05)["id"] == job["id"]
+    assert store._claim("worker-b", 60) is None
+
+    threading.Event().wait(0.1)
+    reclaimed = store._claim("worker-b", 60)
+
+    assert reclaimed["id"] == job["id"]
+    assert (reclaimed["claimed_by"], reclaimed["attempts"]) == ("worker-b", 2)
+
+
+def test_only_the_current_lease_holder_can_finish_a_job(store):
+    job = _job()
+    store._create(job)
+    store._claim("worker-a", 60)
+
+    asyncio.run(store.complete(job["id"], "worker-b", {"ok": True}))
+    assert store._get(job["id"])["status"] == "running"
+
+    asyncio.run(store.complete(job["id"], "worker-a", {"ok": True}))
+    stored = store._get(job["id"])
+    assert (stored["status"], stored["result"]) == ("succeeded", {"ok": True})
+
+
+def _run_queue(store, handler, max_attempts=3):
+    queue = JobQueue(store, workers=1, poll_interval=0.01, lease_seconds=5,
+                     max_attempts=max_attempts, retry_backoff_seconds=0)
+    queue.register("test", handler)
+
+    async def scenario():
+        queue.start()
+        try:
+            job = await queue.enqueue("test", "session-1", {})
+            return await queue.wait(job["id"], timeout=5)
+        finally:
+            await queue.stop()
+
+    return queue, asyncio.run(scenario())
+
+
+def test_failed_attempts_are_retried_until_success(store):
+    calls = []
+
+    async def flaky(job):
+        calls.append(job["attempts"])
+        if len(calls) < 3:
+            raise RuntimeError("textract throttled")
+        return {"attempt": job["attempts"]}
+
+    queue, job = _run_queue(store, flaky)
+
+    assert calls == [1, 2, 3]
+    assert (job["status"], job["result"], job["attempts"]) == ("succeeded", {"attempt": 3}, 3)
+    assert (queue.jobs_retried, queue.jobs_succeeded, queue.jobs_failed) == (2, 1, 0)
+
+
+def test_job_fails_after_max_attempts(store):
+    async def broken(job):
+        raise ValueError("bad payload")
+
+    queue, job = _run_queue(store, broken, max_attempts=2)
+
+    assert (job["status"], job["attempts"]) == ("failed", 2)
+    assert job["error"] == "ValueError: bad payload"
+    assert (queue.jobs_retried, queue.jobs_failed) == (1, 1)
+
+
+class FakeApplication:
+    def __init__(self, row):
+        self.row = row
+        self.updates = []
+        self._update = None
+
+    def table(self, name):
+        self._update = None
+        return self
+
+    def select(self, columns):
+        return self
+
+    def update(self, values):
+        self._update = values
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def execute(self):
+        if self._update is not None:
+            self.updates.append(self._update)
+            return type("Result", (), {"data": [self.row]})()
+        return type("Result", (), {"data": dict(self.row)})()
+
+
+def test_scoring_treats_null_columns_like_the_batch_path(monkeypatch):
+    fake = FakeApplication({
+        "session_id": "session-1", "credit_score": None, "income_extracted": None,
+        "loan_amount": None, "emi_detected": None, "employment_type": None,
+    })
+    monkeypatch.setattr(database, "supabase", fake)
+
+    prediction = asyncio.run(verification_service.score_application("session-1"))
+
+    assert prediction["eligible"] is False
+    assert fake.updates[0]["final_status"] == "needs_review"
+    assert fake.updates[0]["eligibility_score"] == prediction["eligibility_score"]
@@ -0,0 +1,72 @@
+"""Single approve/reject endpoints report the decide_applications outcome."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+import database
+from auth import ManagerIdentity
+from config import settings
+from main import app, get_current_manager
+
+MANAGER = ManagerIdentity(id=str(uuid.uuid4()), email="manager@example.com", token_id="token-1", expires_at=0.0)
+
+
+class FakeDecisions:
+    """decide_applications returning a fixed outcome for every id it is sent."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = []
+
+    def rpc(self, name, params):
+        assert name == "decide_applications"
+        self.calls.append(params)
+        return self
+
+    def execute(self):
+        rows = [] if self.outcome == "not_found" else [
+            {"application_id": decision["id"], "session_id": "session-1", "final_status": decision["status"],
+             "updated_at": "2025-11-24T09:00:00+00:00", "outcome": self.outcome}
+            for decision in self.calls[-1]["p_decisions"]
+        ]
+        return type("Result", (), {"data": rows})()
+
+
+@pytest.fixture
+def decide(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    app.dependency_overrides[get_current_manager] = lambda: MANAGER
+
+    def post(path, outcome):
+        fake = FakeDecisions(outcome)
+        monkeypatch.setattr(database, "supabase", fake)
+
+        async def request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await http.post(path, json={"application_id": str(uuid.uuid4())})
+
+        return asyncio.run(request()), fake
+
+    yield post
+    app.dependency_overrides.pop(get_current_manager, None)
+
+
+@pytest.mark.parametrize("path,status", [("/manager/approve", "approved"), ("/manager/reject", "rejected")])
+def test_applied_decision_succeeds(decide, path, status):
+    response, fake = decide(path, "applied")
+
+    assert response.status_code == 200
+    assert fake.calls[0]["p_manager_id"] == MANAGER.id
+    assert fake.calls[0]["p_decisions"][0]["status"] == status
+
+
+@pytest.mark.parametrize("path", ["/manager/approve", "/manager/reject"])
+@pytest.mark.parametrize("outcome,code", [("not_found", 404), ("conflict", 409)])
+def test_unapplied_decision_is_reported(decide, path, outcome, code):
+    response, _ = decide(path, outcome)
+
+    assert response.status_code == code
@@ -0,0 +1,157 @@
+"""
+SageMaker scoring goes through the micro-batcher. The endpoint is a stub
+sagemaker-runtime client that sleeps for a fixed round trip per invoke_endpoint.
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import aws_services
+from aws_services import SageMakerService
+from config import settings
+from micro_batcher import BatcherClosed, MicroBatcher
+from verification_service import verification_service
+
+ENDPOINT_LATENCY = 0.02
+
+
+class StubSageMakerRuntime:
+    """Scores each instance as credit_score / 1000 after one simulated round trip."""
+
+    def __init__(self, body=None):
+        self.body = body
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def invoke_endpoint(self, EndpointName, ContentType, Body):
+        instances = json.loads(Body)["instances"]
+        time.sleep(ENDPOINT_LATENCY)
+        with self._lock:
+            self.batch_sizes.append(len(instances))
+        body = self.body if self.body is not None else {"predictions": [[row[0] / 1000] for row in instances]}
+        return {"Body": io.BytesIO(json.dumps(body).encode())}
+
+
+@pytest.fixture
+def sagemaker(monkeypatch):
+    """Build a SageMakerService that talks to a stub endpoint."""
+    monkeypatch.setattr(settings, "USE_MOCK_SAGEMAKER", False)
+    monkeypatch.setattr(settings, "USE_LOCAL_ML_MODEL", False)
+
+    def build(stub, **batcher_options):
+        monkeypatch.setattr(aws_services, "shared_client", lambda service: stub)
+        service = SageMakerService()
+        for name, value in batcher_options.items():
+            setattr(service.batcher, name, value)
+        return service
+
+    return build
+
+
+async def _score(service, credit_scores):
+    try:
+        return await asyncio.gather(*(
+            service.predict_eligibility({"credit_score": score}) for score in credit_scores
+        ))
+    finally:
+        await service.batcher.close()
+
+
+def test_concurrent_predictions_share_endpoint_calls(sagemaker):
+    stub = StubSageMakerRuntime()
+    service = sagemaker(stub, max_batch_size=16)
+    credit_scores = list(range(600, 664))
+
+    results = asyncio.run(_score(service, credit_scores))
+
+    assert [result["eligibility_score"] for result in results] == [score / 1000 for score in credit_scores]
+    assert sum(stub.batch_sizes) == len(credit_scores)
+    assert len(stub.batch_sizes) < len(credit_scores)
+    assert max(stub.batch_sizes) <= 16
+
+
+def test_application_scoring_goes_through_the_endpoint(sagemaker, monkeypatch):
+    stub = StubSageMakerRuntime()
+    service = sagemaker(stub)
+    monkeypatch.setattr(aws_services.sagemaker_service, "use_local_model", False)
+    monkeypatch.setattr(aws_services.sagemaker_service, "batcher", service.batcher)
+
+    async def scenario():
+        try:
+            return await verification_service.predict({"credit_score": 720, "employment_type": "salaried"})
+        finally:
+            await service.batcher.close()
+
+    prediction = asyncio.run(scenario())
+
+    assert prediction == {"eligibility_score": 0.72, "eligible": True, "shap_explanation": []}
+    assert stub.batch_sizes == [1]
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"predictions": [[0.7]]},
+    {"predictions": "oops"},
+    {"predictions": [["high"], ["low"]]},
+])
+def test_malformed_endpoint_response_raises(sagemaker, body):
+    service = sagemaker(StubSageMakerRuntime(body=body))
+
+    with pytest.raises(ValueError):
+        asyncio.run(_score(service, [700, 710]))
+
+
+def test_close_fails_requests_that_were_not_sent():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=100, window_ms=10_000)
+
+    async def scenario():
+        pending = [asyncio.ensure_future(batcher.submit(i, timeout=30)) for i in range(5)]
+        await asyncio.sleep(0.05)  # queued and collected, but the window is still open
+        await batcher.close()
+        return await asyncio.gather(*pending, return_exceptions=True)
+
+    results = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert all(isinstance(result, BatcherClosed) for result in results)
+
+
+def test_close_fails_requests_still_in_the_queue():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=1, window_ms=0, max_concurrent_batches=1)
+    release = threading.Event()
+    batcher.handler = lambda items: (release.wait(5), items)[1]
+
+    async def scenario():
+        pending = [asyncio.ensure_future(batcher.submit(i, timeout=30)) for i in range(4)]
+        await asyncio.sleep(0.05)  # one batch in flight, one waiting for a slot, the rest queued
+        await batcher.close()
+        release.set()
+        return await asyncio.gather(*pending, return_exceptions=True)
+
+    results = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert results[0] == 0
+    assert all(isinstance(result, BatcherClosed) for result in results[1:])
+
+
+@pytest.mark.benchmark
+def test_batching_beats_one_call_per_request(sagemaker):
+    credit_scores = [600 + i % 300 for i in range(200)]
+
+    def throughput(max_batch_size):
+        stub = StubSageMakerRuntime()
+        service = sagemaker(stub, max_batch_size=max_batch_size, max_concurrent_batches=4,
+                            timeout_seconds=30)
+        started = time.perf_counter()
+        asyncio.run(_score(service, credit_scores))
+        return len(credit_scores) / (time.perf_counter() - started)
+
+    unbatched = throughput(1)
+    batched = throughput(32)
+
+    print(f"\nstub endpoint: {unbatched:.0f} req/s one per call, {batched:.0f} req/s batched")
+    assert batched >= 3 * unbatched
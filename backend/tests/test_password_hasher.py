@@ -0,0 +1,198 @@
+"""
+The bcrypt process pool: rehashing, fast rejection under overload, and a login storm
+that must not stall chat traffic on the same event loop.
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+import pytest
+
+import auth
+import database
+from config import settings
+from password_hasher import PasswordHasher, PasswordHasherBusy
+
+pytest.importorskip("passlib")
+from passlib.hash import bcrypt  # noqa: E402
+
+PASSWORD = "correct horse"
+
+
+class FakeManagers:
+    """Just enough of the supabase-py builder for the managers table."""
+
+    def __init__(self, password_hash):
+        self.row = {"id": "m-1", "email": "admin@loanbank.com", "name": "Admin", "password_hash": password_hash}
+        self.updates = []
+        self._update = None
+
+    def table(self, name):
+        assert name == "managers"
+        self._update = None
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def update(self, values):
+        self._update = values
+        return self
+
+    def execute(self):
+        if self._update is not None:
+            self.updates.append(self._update)
+            self.row.update(self._update)
+        return type("Result", (), {"data": dict(self.row)})()
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    # Pool processes read BCRYPT_ROUNDS when they import config
+    monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+    pool = PasswordHasher(workers=2, max_queue=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_outdated_hashes_are_rehashed(hasher, monkeypatch):
+    managers = FakeManagers(bcrypt.using(rounds=4).hash(PASSWORD))
+    monkeypatch.setattr(database, "supabase", managers)
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+
+    manager = asyncio.run(auth.authenticate_manager("admin@loanbank.com", PASSWORD))
+
+    assert manager == {"id": "m-1", "email": "admin@loanbank.com", "name": "Admin"}
+    assert len(managers.updates) == 1
+    new_hash = managers.updates[0]["password_hash"]
+    assert new_hash.startswith("$2b$05$") and bcrypt.verify(PASSWORD, new_hash)
+
+    # Current hashes are left alone
+    asyncio.run(auth.authenticate_manager("admin@loanbank.com", PASSWORD))
+    assert len(managers.updates) == 1
+
+
+def test_wrong_password_and_malformed_hash(hasher):
+    current = bcrypt.using(rounds=5).hash(PASSWORD)
+
+    assert asyncio.run(hasher.verify_and_update("wrong", current)) == (False, None)
+    assert asyncio.run(hasher.verify_and_update(PASSWORD, "not-a-hash")) == (False, None)
+
+
+def test_overload_is_rejected_immediately(hasher):
+    stored = bcrypt.using(rounds=5).hash(PASSWORD)
+
+    async def main():
+        checks = [asyncio.ensure_future(hasher.verify_and_update(PASSWORD, stored)) for _ in range(4)]
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.verify_and_update(PASSWORD, stored)
+        rejected_in = time.perf_counter() - start
+        results = await asyncio.gather(*checks)
+        return rejected_in, results
+
+    rejected_in, results = asyncio.run(main())
+
+    assert rejected_in < 0.01
+    assert all(verified for verified, _ in results)
+    assert hasher.metrics() == {"workers": 2, "pending": 0, "max_pending": 4, "rejected": 1}
+
+
+def test_login_answers_503_when_the_pool_is_full(monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(database, "supabase", FakeManagers(bcrypt.using(rounds=4).hash(PASSWORD)))
+    monkeypatch.setattr(auth, "password_hasher", PasswordHasher(workers=1, max_queue=-1))  # nothing fits
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/manager/login", json={"email": "admin@loanbank.com", "password": PASSWORD})
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+class InlineHasher:
+    """The old behaviour: bcrypt on the event loop thread."""
+
+    async def verify_and_update(self, password, hashed_password):
+        return bcrypt.verify(password, hashed_password), None
+
+
+def _login_storm(app, logins, chat_requests):
+    """Fire logins and, meanwhile, a chat-like request every 10 ms; return chat latencies."""
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def login():
+                response = await client.post("/manager/login",
+                                             json={"email": "admin@loanbank.com", "password": PASSWORD})
+                return response.status_code
+
+            async def chat():
+                # Latency counts from when each request was due, so time the loop
+                # spends blocked before it can even send the request is included
+                latencies = []
+                first_due = time.perf_counter()
+                for i in range(chat_requests):
+                    due = first_due + i * 0.01
+                    await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                    response = await client.get("/")
+                    latencies.append(time.perf_counter() - due)
+                    assert response.status_code == 200
+                return latencies
+
+            storm = [asyncio.ensure_future(login()) for _ in range(logins)]
+            latencies = await chat()
+            statuses = await asyncio.gather(*storm)
+            return latencies, statuses
+
+    return asyncio.run(main())
+
+
+@pytest.mark.benchmark
+def test_chat_latency_stays_flat_during_a_login_storm(monkeypatch):
+    from main import app
+
+    monkeypatch.setenv("BCRYPT_ROUNDS", "10")  # ~60 ms per check; 12 in production
+    stored = bcrypt.using(rounds=10).hash(PASSWORD)
+    monkeypatch.setattr(database, "supabase", FakeManagers(stored))
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    logins = 8
+
+    results = {}
+    for name, hasher in (("inline", InlineHasher()), ("pool", PasswordHasher(workers=2, max_queue=logins))):
+        monkeypatch.setattr(auth, "password_hasher", hasher)
+        if name == "pool":
+            asyncio.run(hasher.verify_and_update(PASSWORD, stored))  # spawn the workers outside the timing
+        latencies, statuses = _login_storm(app, logins, chat_requests=40)
+        assert statuses == [200] * logins
+        results[name] = latencies
+        if name == "pool":
+            hasher.shutdown()
+
+    quiet, _ = _login_storm(app, 0, chat_requests=40)
+
+    def p95(values):
+        return statistics.quantiles(values, n=20, method="inclusive")[-1]
+
+    print(f"\nchat p95 during {logins} logins: inline bcrypt {p95(results['inline']) * 1000:.1f} ms, "
+          f"process pool {p95(results['pool']) * 1000:.1f} ms, no logins {p95(quiet) * 1000:.1f} ms")
+    assert p95(results["inline"]) > 0.1  # the storm really blocks the loop without the pool
+    # Loose bounds: pool workers compete with the loop for CPU on small machines
+    assert p95(results["pool"]) < 0.05
+    assert p95(results["pool"]) * 10 < p95(results["inline"])
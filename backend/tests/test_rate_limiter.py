@@ -0,0 +1,183 @@
+"""Token buckets and the rate limiting middleware, plus its per-request overhead."""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from config import settings
+from rate_limiter import InMemoryRateLimitStore, RateLimit, RateLimitMiddleware, parse_route_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+async def echo_app(scope, receive, send):
+    """Returns the request body, so tests can see it survived the middleware."""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body or b"{}"})
+
+
+def _middleware(**kwargs):
+    kwargs.setdefault("store", InMemoryRateLimitStore(1000))
+    kwargs.setdefault("default_limit", RateLimit(3, 60))
+    kwargs.setdefault("route_limits", parse_route_limits("/chat-input=session:2/60,/manager/login=ip:1/60"))
+    kwargs.setdefault("exempt_paths", ["/"])
+    return RateLimitMiddleware(echo_app, **kwargs)
+
+
+def _send_all(middleware, requests):
+    async def main():
+        transport = httpx.ASGITransport(app=middleware, client=("203.0.113.7", 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.request(method, path, **kwargs) for method, path, kwargs in requests]
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED", False)
+
+
+def test_bucket_empties_and_refills():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(100, clock=clock)
+    limit = RateLimit(2, 10)
+
+    assert store.take_now("ip:a", limit) == (True, 1, 0.0)
+    assert store.take_now("ip:a", limit) == (True, 0, 0.0)
+    denied = store.take_now("ip:a", limit)
+    assert not denied.allowed and denied.retry_after == pytest.approx(5.0)
+
+    clock.now += 5
+    assert store.take_now("ip:a", limit).allowed
+    assert not store.take_now("ip:a", limit).allowed
+    # Other keys have their own bucket, and a full bucket never holds more than the limit
+    clock.now += 3600
+    assert store.take_now("ip:b", limit).remaining == 1
+    assert store.take_now("ip:a", limit).remaining == 1
+
+
+def test_store_stays_bounded():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(10, clock=clock)
+    limit = RateLimit(5, 1)
+
+    for i in range(1000):
+        clock.now += 0.001
+        store.take_now(f"ip:{i}", limit)
+        assert len(store) <= 10
+
+
+def test_parse_route_limits():
+    limits = parse_route_limits(" /chat-input=session:30/60, /manager/login=5/60 ,")
+
+    assert limits == {"/chat-input": RateLimit(30, 60.0, "session"), "/manager/login": RateLimit(5, 60.0, "ip")}
+    with pytest.raises(ValueError, match="Unknown rate limit key"):
+        parse_route_limits("/x=user:1/1")
+
+
+def test_default_limit_answers_429_with_retry_after():
+    responses = _send_all(_middleware(), [("GET", "/manager/applications", {})] * 4)
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 429]
+    rejected = responses[-1]
+    assert int(rejected.headers["retry-after"]) == 20
+    assert rejected.headers["x-ratelimit-limit"] == "3"
+    assert rejected.json() == {"detail": "Too many requests", "retry_after": 20}
+
+
+def test_route_limits_are_keyed_by_session_and_body_is_replayed():
+    chat = [("POST", "/chat-input", {"json": {"session_id": session, "message": "hi"}}) for session in "aaab"]
+
+    responses = _send_all(_middleware(default_limit=RateLimit(10, 60)), chat)
+
+    assert [r.status_code for r in responses] == [200, 200, 429, 200]
+    assert responses[0].json() == {"session_id": "a", "message": "hi"}
+
+
+def test_route_requests_are_also_charged_to_the_default_budget():
+    middleware = _middleware()
+    responses = _send_all(middleware, [("POST", "/manager/login", {"json": {}})] * 2
+                          + [("GET", "/manager/applications", {})] * 2)
+
+    # Both logins spend the IP's default budget, the second is refused by the route's own
+    assert [r.status_code for r in responses] == [200, 429, 200, 429]
+    assert middleware.rejected == 2
+
+
+def test_rotating_session_ids_does_not_escape_the_ip_budget():
+    chat = [("POST", "/chat-input", {"json": {"session_id": f"s-{i}", "message": "hi"}}) for i in range(5)]
+
+    responses = _send_all(_middleware(), chat)
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 429, 429]
+    assert responses[-1].headers["x-ratelimit-limit"] == "3"
+
+
+def test_exempt_paths_and_preflight_are_not_charged():
+    responses = _send_all(_middleware(default_limit=RateLimit(1, 60)),
+                          [("GET", "/", {})] * 3 + [("OPTIONS", "/start-session", {})] * 3)
+    assert all(r.status_code == 200 for r in responses)
+
+
+def test_disabled_limiter_passes_everything(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    responses = _send_all(_middleware(default_limit=RateLimit(1, 60)), [("GET", "/x", {})] * 5)
+
+    assert all(r.status_code == 200 for r in responses)
+
+
+@pytest.mark.benchmark
+def test_middleware_overhead_per_request():
+    """Time the ASGI call directly so the HTTP client is not part of the measurement."""
+    middleware = _middleware(default_limit=RateLimit(10 ** 9, 1), store=InMemoryRateLimitStore(10 ** 6),
+                             route_limits=parse_route_limits("/chat-input=session:1000000000/1"))
+    body = json.dumps({"session_id": "s-1", "message": "hello"}).encode()
+
+    async def inner(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware.app = inner
+
+    async def send(message):
+        pass
+
+    def scope(path, client):
+        return {"type": "http", "method": "POST", "path": path, "query_string": b"", "client": (client, 1),
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]}
+
+    async def run(app, path, n):
+        start = time.perf_counter()
+        for i in range(n):
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+            await app(scope(path, f"10.0.{i % 250}.{i % 200}"), receive, send)
+        return (time.perf_counter() - start) / n
+
+    n = 20000
+    baseline = asyncio.run(run(inner, "/manager/applications", n))
+    by_ip = asyncio.run(run(middleware, "/manager/applications", n)) - baseline
+    by_session = asyncio.run(run(middleware, "/chat-input", n)) - baseline
+
+    print(f"\nrate limiter overhead: {by_ip * 1e6:.1f} µs per request by IP, "
+          f"{by_session * 1e6:.1f} µs with a JSON session_id")
+    assert by_ip < 50e-6
+    assert by_session < 100e-6
@@ -0,0 +1,136 @@
+"""Bulk re-scoring only writes rows that are still undecided and unchanged since read."""
+
+import uuid
+
+import pydantic
+import pytest
+
+import database
+from models import RescoreRequest
+from rescore_service import RESCORABLE_STATUSES, RescoreService
+
+
+def _row(status="pending", credit_score=780):
+    return {
+        "id": str(uuid.uuid4()), "session_id": uuid.uuid4().hex, "updated_at": "2025-11-20T10:00:00+00:00",
+        "final_status": status, "eligibility_score": 0.5, "credit_score": credit_score,
+        "income_extracted": 60000, "loan_amount": 500000, "emi_detected": 5000, "employment_type": "salaried",
+    }
+
+
+class FakeApplications:
+    """
+    loan_applications with the filters fetch_page uses and apply_rescores'
+    conditional UPDATE. on_fetch runs after a page is read, to simulate a manager
+    acting while the page is being scored.
+    """
+
+    def __init__(self, rows, on_fetch=None):
+        self.rows = {row["id"]: row for row in rows}
+        self.on_fetch = on_fetch
+        self.version = 0
+        self._query = None
+
+    # select chain
+    def table(self, name):
+        assert name == "loan_applications"
+        self._query = {"after": None, "limit": None}
+        return self
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        assert column == "final_status" and values == RESCORABLE_STATUSES
+        return self
+
+    @property
+    def not_(self):
+        return self
+
+    def is_(self, column, value):
+        return self
+
+    def gt(self, column, value):
+        self._query["after"] = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, count):
+        self._query["limit"] = count
+        return self
+
+    def rpc(self, name, params):
+        assert name == "apply_rescores"
+        self._query = {"rpc": params["p_updates"]}
+        return self
+
+    def execute(self):
+        if "rpc" in self._query:
+            applied = []
+            for update in self._query["rpc"]:
+                row = self.rows.get(update["id"])
+                if row is None or row["final_status"] not in RESCORABLE_STATUSES:
+                    continue
+                if row["updated_at"] != update["expected_updated_at"]:
+                    continue
+                row.update(eligibility_score=update["eligibility_score"], final_status=update["final_status"],
+                           updated_at=self._bump())
+                applied.append({"application_id": row["id"]})
+            return type("Result", (), {"data": applied})()
+
+        page = sorted(
+            (dict(row) for row in self.rows.values()
+             if row["final_status"] in RESCORABLE_STATUSES
+             and (self._query["after"] is None or row["id"] > self._query["after"])),
+            key=lambda row: row["id"],
+        )[:self._query["limit"]]
+        if self.on_fetch:
+            self.on_fetch(self, page)
+        return type("Result", (), {"data": page})()
+
+    def _bump(self):
+        self.version += 1
+        return f"2025-11-21T10:00:{self.version:02d}+00:00"
+
+
+def test_rescore_writes_every_undecided_row(monkeypatch):
+    rows = [_row(credit_score=780) for _ in range(5)] + [_row(credit_score=500) for _ in range(2)]
+    table = FakeApplications(rows)
+    monkeypatch.setattr(database, "supabase", table)
+
+    progress = RescoreService(page_size=3).run()
+
+    assert progress == {"processed": 7, "eligible": 5, "needs_review": 2, "skipped": 0,
+                        "pages": 3, "last_id": max(row["id"] for row in rows), "done": True}
+    assert {row["final_status"] for row in table.rows.values()} == {"eligible", "needs_review"}
+
+
+def test_decisions_made_after_the_read_are_not_overwritten(monkeypatch):
+    rows = [_row() for _ in range(4)]
+    decided, edited = sorted(row["id"] for row in rows)[:2]
+
+    def manager_acts(table, page):
+        # Between fetch_page and write_page: one approval, one other update
+        table.rows[decided]["final_status"] = "approved"
+        table.rows[decided]["updated_at"] = table._bump()
+        table.rows[edited]["updated_at"] = table._bump()
+
+    table = FakeApplications(rows, on_fetch=manager_acts)
+    monkeypatch.setattr(database, "supabase", table)
+
+    progress = RescoreService(page_size=10).run()
+
+    assert progress["processed"] == 2 and progress["skipped"] == 2
+    assert table.rows[decided]["final_status"] == "approved"
+    assert table.rows[edited]["final_status"] == "pending"
+
+
+def test_rescore_request_is_bounded():
+    assert RescoreRequest().max_pages == 10
+    assert str(RescoreRequest(after_id="5c0c8c2e-8f52-4a4e-9a36-0c2a8e1d9b10").after_id).startswith("5c0c8c2e")
+    for invalid in ({"max_pages": None}, {"max_pages": 0}, {"max_pages": 101}, {"after_id": "x' OR 1=1"}):
+        with pytest.raises(pydantic.ValidationError):
+            RescoreRequest(**invalid)
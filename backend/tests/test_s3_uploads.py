@@ -0,0 +1,166 @@
+"""Presigned and multipart uploads against moto's S3."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+moto = pytest.importorskip("moto")
+requests = pytest.importorskip("requests")
+
+from aws_clients import aws_clients
+from aws_services import S3Service, S3UnavailableError, UploadRequestError
+from config import settings
+
+MB = 1024 * 1024
+BUCKET = "test-loan-documents"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "USE_MOCK_S3", False)
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 32 * MB)
+    # Clients must be created inside the mock
+    monkeypatch.setattr(aws_clients, "_session", None)
+    monkeypatch.setattr(aws_clients, "_clients", {})
+    monkeypatch.setattr(aws_clients, "_usage", {})
+
+    with moto.mock_aws():
+        service = S3Service()
+        service.client.create_bucket(Bucket=BUCKET)
+        yield service
+
+
+def _session_id():
+    return uuid.uuid4().hex
+
+
+def _upload_parts(upload, data):
+    parts = []
+    for part in upload["parts"]:
+        start = (part["part_number"] - 1) * upload["part_size"]
+        response = requests.put(part["upload_url"], data=data[start:start + upload["part_size"]])
+        assert response.status_code == 200
+        parts.append({"part_number": part["part_number"], "etag": response.headers["ETag"]})
+    return parts
+
+
+def test_presigned_post_uploads_straight_to_the_bucket(s3):
+    session_id = _session_id()
+
+    post = asyncio.run(s3.generate_presigned_upload_url(session_id, "aadhaar", "PNG"))
+
+    assert post["key"].startswith(f"applications/{session_id}/aadhaar/") and post["key"].endswith(".png")
+    assert post["content_type"] == "image/png"
+    assert post["fields"]["Content-Type"] == "image/png"
+    response = requests.post(post["upload_url"], data=post["fields"], files={"file": b"\x89PNG scan"})
+    assert response.status_code in (200, 204)
+    head = s3.client.head_object(Bucket=BUCKET, Key=post["key"])
+    assert head["ContentType"] == "image/png"
+    assert head["ContentLength"] == len(b"\x89PNG scan")
+
+
+def test_unsupported_extension_and_session_are_rejected(s3):
+    with pytest.raises(UploadRequestError, match="Unsupported file extension"):
+        asyncio.run(s3.generate_presigned_upload_url(_session_id(), "aadhaar", "exe"))
+    with pytest.raises(UploadRequestError, match="Invalid session_id"):
+        asyncio.run(s3.generate_presigned_upload_url("../other", "aadhaar", "pdf"))
+
+
+def test_multipart_upload_round_trip(s3):
+    session_id = _session_id()
+    data = bytes(range(256)) * (11 * MB // 256)  # two parts: 8 MB + 3 MB
+
+    upload = asyncio.run(s3.create_multipart_upload(session_id, "bank_statement", "pdf", len(data)))
+
+    assert upload["part_size"] == settings.S3_MULTIPART_PART_SIZE
+    assert upload["part_count"] == 2 and len(upload["parts"]) == 2
+    parts = _upload_parts(upload, data)
+
+    # Parts may be reported in any order
+    result = asyncio.run(s3.complete_multipart_upload(session_id, upload["key"], upload["upload_id"], parts[::-1]))
+
+    assert result["size"] == len(data)
+    stored = s3.client.get_object(Bucket=BUCKET, Key=upload["key"])
+    assert stored["ContentType"] == "application/pdf"
+    assert stored["Body"].read() == data
+
+
+def test_part_urls_are_presigned_in_batches(s3, monkeypatch):
+    monkeypatch.setattr(settings, "S3_MULTIPART_URL_BATCH", 2)
+    session_id = _session_id()
+
+    upload = asyncio.run(s3.create_multipart_upload(session_id, "bank_statement", "pdf", 30 * MB))
+
+    assert upload["part_count"] == 4
+    assert [part["part_number"] for part in upload["parts"]] == [1, 2]
+    more = asyncio.run(s3.presign_upload_parts(session_id, upload["key"], upload["upload_id"], [3, 4]))
+    assert [part["part_number"] for part in more] == [3, 4]
+    assert all(upload["upload_id"] in part["upload_url"] for part in more)
+
+    with pytest.raises(UploadRequestError, match="At most 2 parts"):
+        asyncio.run(s3.presign_upload_parts(session_id, upload["key"], upload["upload_id"], [3, 4, 5]))
+    with pytest.raises(UploadRequestError, match="between 1 and"):
+        asyncio.run(s3.presign_upload_parts(session_id, upload["key"], upload["upload_id"], [0]))
+    with pytest.raises(UploadRequestError, match="does not belong"):
+        asyncio.run(s3.presign_upload_parts(_session_id(), upload["key"], upload["upload_id"], [3]))
+
+
+def test_declared_and_assembled_size_limits(s3, monkeypatch):
+    session_id = _session_id()
+    with pytest.raises(UploadRequestError, match="exceeds"):
+        asyncio.run(s3.create_multipart_upload(session_id, "bank_statement", "pdf", 33 * MB))
+
+    # The client lies about the size: declared 1 MB, uploads 6 MB
+    data = b"x" * (6 * MB)
+    upload = asyncio.run(s3.create_multipart_upload(session_id, "bank_statement", "pdf", MB))
+    parts = _upload_parts(upload, data)
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 5 * MB)
+
+    with pytest.raises(UploadRequestError, match="exceeds"):
+        asyncio.run(s3.complete_multipart_upload(session_id, upload["key"], upload["upload_id"], parts))
+    assert s3.client.list_objects_v2(Bucket=BUCKET, Prefix=upload["key"]).get("KeyCount") == 0
+
+
+def test_abort_discards_the_upload(s3):
+    session_id = _session_id()
+    upload = asyncio.run(s3.create_multipart_upload(session_id, "aadhaar", "jpg", 2 * MB))
+
+    asyncio.run(s3.abort_multipart_upload(session_id, upload["key"], upload["upload_id"]))
+
+    assert not s3.client.list_multipart_uploads(Bucket=BUCKET).get("Uploads")
+    with pytest.raises(UploadRequestError, match="does not belong"):
+        asyncio.run(s3.abort_multipart_upload(_session_id(), upload["key"], upload["upload_id"]))
+
+
+def test_multipart_needs_a_real_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "USE_MOCK_S3", True)
+
+    with pytest.raises(S3UnavailableError):
+        asyncio.run(S3Service().create_multipart_upload(_session_id(), "aadhaar", "pdf", MB))
+
+
+def test_signing_failure_is_a_503_not_a_mock_url(s3, monkeypatch):
+    from botocore.exceptions import NoCredentialsError
+    from main import app
+
+    def no_credentials(**kwargs):
+        raise NoCredentialsError()
+
+    monkeypatch.setattr(s3.client, "generate_presigned_post", no_credentials)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    with pytest.raises(S3UnavailableError):
+        asyncio.run(s3.generate_presigned_upload_url(_session_id(), "aadhaar", "pdf"))
+
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post("/upload-url", json={"session_id": _session_id(), "file_type": "aadhaar"})
+
+    assert asyncio.run(request()).status_code == 503
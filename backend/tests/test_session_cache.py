@@ -0,0 +1,191 @@
+"""
+Chat session state cache: hits skip the select, misses and invalidations reload,
+and state cached by one worker is never trusted after another changed the row.
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+import chat_service as chat_module
+import database
+import verification_service as verification_module
+from chat_service import ChatService, StaleSessionState
+from config import settings
+from session_cache import InMemorySessionBackend, SessionStateBackend, SessionStateCache
+
+SESSION = "session-1"
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeApplications:
+    """
+    One loan_applications row keyed by session_id. updated_at is bumped on every
+    update (like loan_applications_set_updated_at) and commit_chat_turn checks it.
+    """
+
+    def __init__(self, **fields):
+        self._versions = itertools.count(1)
+        self.row = {"session_id": SESSION, "name": None, "income_claimed": None, "loan_amount": None,
+                    "employment_type": None, "credit_score": None, "updated_at": self._bump()}
+        self.row.update(fields)
+        self.selects = 0
+        self.writes = []
+        self.on_select = None
+        self._query = None
+
+    def _bump(self):
+        return f"2025-11-26T09:00:00.{next(self._versions):06d}+00:00"
+
+    def table(self, name):
+        assert name == "loan_applications"
+        self._query = {"filters": {}}
+        return self
+
+    def select(self, columns):
+        self._query["select"] = columns
+        return self
+
+    def update(self, values):
+        self._query["update"] = values
+        return self
+
+    def eq(self, column, value):
+        self._query["filters"][column] = value
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def rpc(self, name, params):
+        assert name == "commit_chat_turn"
+        self._query = {"rpc": params}
+        return self
+
+    def _matches(self, filters):
+        return all(self.row.get(column) == value for column, value in filters.items())
+
+    def execute(self):
+        query = self._query
+        if "rpc" in query:
+            params = query["rpc"]
+            expected = params["p_expected_updated_at"]
+            if expected is not None and expected != self.row["updated_at"]:
+                return Result({"applied": False, "updated_at": self.row["updated_at"]})
+            if params["p_updates"]:
+                self._write(params["p_updates"])
+            return Result({"applied": True, "updated_at": self.row["updated_at"]})
+
+        if "update" in query:
+            if not self._matches(query["filters"]):
+                return Result([])
+            self._write(query["update"])
+            return Result([dict(self.row)])
+
+        self.selects += 1
+        columns = query["select"].split(",")
+        result = Result({column: self.row[column] for column in columns} if self._matches(query["filters"]) else None)
+        if self.on_select:
+            self.on_select(self)
+        return result
+
+    def _write(self, values):
+        self.writes.append(dict(values))
+        self.row.update(values)
+        self.row["updated_at"] = self._bump()
+
+
+@pytest.fixture(params=[False, True], ids=["rpc", "write_behind"])
+def db(request, monkeypatch):
+    fake = FakeApplications()
+    monkeypatch.setattr(database, "supabase", fake)
+    monkeypatch.setattr(settings, "CHAT_HISTORY_WRITE_BEHIND", request.param)
+
+    async def enqueue(session_id, role, message):
+        pass
+
+    monkeypatch.setattr(chat_module.chat_history_writer, "enqueue", enqueue)
+    return fake
+
+
+def _worker():
+    """A ChatService with its own per-process cache, like one uvicorn worker."""
+    service = ChatService()
+    service.conversation_state = SessionStateCache(InMemorySessionBackend(100, 60))
+    return service
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStateBackend()
+
+
+def test_cache_hit_skips_the_select(db):
+    worker = _worker()
+    asyncio.run(worker.conversation_state.set(SESSION, {"updated_at": db.row["updated_at"]}))
+
+    result = asyncio.run(worker.process_message(SESSION, "Asha"))
+
+    assert result["response"].startswith("Nice to meet you, Asha")
+    assert db.selects == 0
+    assert db.writes == [{"name": "Asha"}]
+    assert worker.conversation_state.hits == 1
+
+
+def test_cache_miss_reads_the_row_and_caches_the_new_version(db):
+    worker = _worker()
+
+    asyncio.run(worker.process_message(SESSION, "Asha"))
+    state = asyncio.run(worker.conversation_state.get(SESSION))
+
+    assert db.selects == 1
+    assert worker.conversation_state.misses == 1
+    assert state["step"] == "income_claimed"
+    assert state["updated_at"] == db.row["updated_at"]
+
+
+def test_invalidation_forces_a_reload(db, monkeypatch):
+    worker = _worker()
+    monkeypatch.setattr(verification_module, "session_state_cache", worker.conversation_state)
+    asyncio.run(worker.process_message(SESSION, "Asha"))
+
+    asyncio.run(verification_module.verification_service.save_aadhaar_result(SESSION, {"verified": True}))
+
+    assert asyncio.run(worker.conversation_state.get(SESSION)) is None
+    asyncio.run(worker.process_message(SESSION, "50000"))
+    assert db.selects == 2
+    assert db.row["income_claimed"] == 50000.0
+
+
+def test_stale_state_from_another_worker_is_reloaded_not_written(db):
+    first, second = _worker(), _worker()
+    for worker in (first, second):
+        asyncio.run(worker.conversation_state.set(SESSION, {"updated_at": db.row["updated_at"]}))
+
+    asyncio.run(second.process_message(SESSION, "Asha"))
+    # first still believes the chat is waiting for a name
+    result = asyncio.run(first.process_message(SESSION, "50000"))
+
+    assert db.row["name"] == "Asha"
+    assert db.row["income_claimed"] == 50000.0
+    assert db.writes == [{"name": "Asha"}, {"income_claimed": 50000.0}]
+    assert result["response"] == "Great! How much loan amount are you looking for?"
+    state = asyncio.run(first.conversation_state.get(SESSION))
+    assert state["step"] == "loan_amount"
+    assert state["updated_at"] == db.row["updated_at"]
+
+
+def test_gives_up_when_the_row_keeps_changing(db):
+    worker = _worker()
+    # Another writer bumps the row between every read and write
+    db.on_select = lambda fake: fake.row.update(updated_at=fake._bump())
+
+    with pytest.raises(StaleSessionState):
+        asyncio.run(worker.process_message(SESSION, "Asha"))
+
+    assert db.writes == []
@@ -0,0 +1,211 @@
+"""
+statement_parser must derive the same income and EMI as the per-keyword regex
+scans it replaced (reproduced below from the original process_bank_statement),
+and StatementStreamParser must agree with parse_statement however the text is chunked.
+"""
+
+import asyncio
+import random
+import re
+import time
+
+import pytest
+
+from document_service import DocumentService, DocumentTooLargeError
+from statement_parser import SOURCE_CONFIDENCE, StatementStreamParser, parse_statement, parse_transactions
+
+LEGACY_INCOME_PATTERNS = [
+    r'salary\s*credit\s*[:\-]?\s*₹?\s*([\d,]+)',
+    r'credit\s*[:\-]?\s*₹?\s*([\d,]+)',
+    r'income\s*[:\-]?\s*₹?\s*([\d,]+)'
+]
+
+LEGACY_EMI_PATTERNS = [
+    r'emi\s*[:\-]?\s*₹?\s*([\d,]+)',
+    r'loan\s*debit\s*[:\-]?\s*₹?\s*([\d,]+)',
+    r'debit\s*[:\-]?\s*₹?\s*([\d,]+)'
+]
+
+
+def legacy_extract(document_text):
+    """The original extraction, without its random fallback (None when nothing matched)."""
+    document_lower = document_text.lower()
+    income = emi = None
+    for pattern in LEGACY_INCOME_PATTERNS:
+        matches = re.findall(pattern, document_lower, re.IGNORECASE)
+        if matches:
+            income = max(float(m.replace(",", "")) for m in matches)
+            break
+    for pattern in LEGACY_EMI_PATTERNS:
+        matches = re.findall(pattern, document_lower, re.IGNORECASE)
+        if matches:
+            amounts = [float(m.replace(",", "")) for m in matches]
+            emi = sum(amounts) / len(amounts)
+            break
+    return income, emi
+
+
+KEYWORDS = ["Salary Credit", "SALARY CREDIT", "salarycredit", "ſalary credit", "Credit", "credit",
+            "Income", "ıncome", "EMI", "emi", "Loan Debit", "loan  debit", "Debit", "debit"]
+NOISE = ["premium", "semi", "discredit", "incomes", "remit", "UPI", "ATM withdrawal", "balance",
+         "opening", "debited", "credited", "Ref", "Jan", "#"]
+SEPARATORS = ["", " ", ": ", ":", " - ", "-", " ₹", ": ₹ ", "\n", "\t"]
+
+
+def _amount(rng):
+    value = rng.randint(0, 500000)
+    return f"{value:,}" if rng.random() < 0.5 else str(value)
+
+
+def _statement(rng, lines):
+    out = []
+    for _ in range(lines):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            if rng.random() < 0.6:
+                parts.append(rng.choice(KEYWORDS) + rng.choice(SEPARATORS) + _amount(rng))
+            else:
+                parts.append(rng.choice(NOISE) + rng.choice(SEPARATORS) + rng.choice(["", _amount(rng)]))
+        out.append(" ".join(parts))
+    return "\n".join(out)
+
+
+def test_matches_legacy_patterns_on_random_statements():
+    rng = random.Random(12)
+    for _ in range(3000):
+        text = _statement(rng, rng.randint(0, 8))
+        parsed = parse_statement(text)
+        income, emi = legacy_extract(text)
+        assert parsed["income"] == income, text
+        assert parsed["emi"] == pytest.approx(emi) if emi is not None else parsed["emi"] is None, text
+
+
+def test_classifies_each_keyword():
+    text = "Salary Credit: ₹52,000\nCREDIT 1,200\nincome 300\nEMI - 8,500\nLoan Debit 4000\ndebit: 75"
+
+    assert parse_transactions(text) == [
+        {"type": "salary_credit", "amount": 52000.0},
+        {"type": "credit", "amount": 1200.0},
+        {"type": "income", "amount": 300.0},
+        {"type": "emi", "amount": 8500.0},
+        {"type": "loan_debit", "amount": 4000.0},
+        {"type": "debit", "amount": 75.0},
+    ]
+
+
+def test_priority_and_confidence():
+    parsed = parse_statement("credit 90,000\nsalary credit 40,000\nsalary credit 45,000\ndebit 100\nloan debit 7,000")
+
+    assert parsed["income"] == 45000.0
+    assert parsed["income_confidence"] == SOURCE_CONFIDENCE["salary_credit"]
+    assert parsed["emi"] == 7000.0
+    assert parsed["emi_confidence"] == SOURCE_CONFIDENCE["loan_debit"]
+
+
+def test_nothing_recognised():
+    parsed = parse_statement("Opening balance 10,000\nATM withdrawal 500")
+
+    assert parsed["transactions"] == []
+    assert parsed["income"] is None and parsed["income_confidence"] == 0.0
+    assert parsed["emi"] is None and parsed["emi_confidence"] == 0.0
+
+
+def _realistic_statement(rng, lines):
+    """Mostly card and UPI lines, with a few salary credits and EMI debits."""
+    out = []
+    for day in range(lines):
+        date = f"2024-01-{day % 28 + 1:02d}"
+        roll = rng.random()
+        if roll < 0.02:
+            out.append(f"{date} NEFT SALARY CREDIT ₹{rng.randint(30000, 90000):,}")
+        elif roll < 0.04:
+            out.append(f"{date} HDFC LOAN EMI {rng.randint(3000, 9000):,}")
+        else:
+            out.append(f"{date} UPI/{rng.randint(10 ** 9, 10 ** 10)}/Swiggy payment ref {rng.randint(100, 9999)} "
+                       f"balance {rng.randint(1000, 99999)}")
+    return "\n".join(out)
+
+
+def _split(data, rng, max_chunk):
+    chunks, start = [], 0
+    while start < len(data):
+        end = start + rng.randint(1, max_chunk)
+        chunks.append(data[start:end])
+        start = end
+    return chunks
+
+
+def _stream(chunks, keep_transactions=True):
+    parser = StatementStreamParser(keep_transactions=keep_transactions)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def test_stream_matches_one_shot_for_any_chunking():
+    rng = random.Random(14)
+    for _ in range(500):
+        text = _statement(rng, rng.randint(0, 12))
+        expected = parse_statement(text)
+        max_chunk = rng.choice([1, 2, 7, 64, 4096])
+
+        # Text chunks split anywhere, including inside keywords, separators and amounts
+        assert _stream(_split(text, rng, max_chunk)) == expected, text
+        # Byte chunks may also split the UTF-8 encoding of ₹, ſ and ı
+        assert _stream(_split(text.encode("utf-8"), rng, max_chunk)) == expected, text
+
+
+def test_stream_keeps_only_totals_by_default():
+    text = "salary credit 50,000\n" * 1000 + "emi 5,000\n" * 1000
+    parsed = _stream(_split(text, random.Random(1), 100), keep_transactions=False)
+
+    assert parsed["transactions"] == []
+    assert parsed["income"] == 50000.0 and parsed["emi"] == 5000.0
+
+
+def test_stream_carry_stays_bounded():
+    parser = StatementStreamParser(max_carry=64)
+    for _ in range(1000):
+        parser.feed("opening balance carried forward " * 32)
+        assert len(parser._carry) <= 64
+    parser.feed("salary credit 1")
+    parser.feed("2,500\n")
+
+    assert parser.close()["income"] == 12500.0
+
+
+def test_stream_service_rejects_oversized_bodies():
+    async def body(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    service = DocumentService()
+    text = "Salary Credit: ₹52,000\nEMI 8,500\n" * 50
+    data = text.encode("utf-8")
+
+    streamed = asyncio.run(service.process_bank_statement_stream(body(_split(data, random.Random(2), 33)), len(data)))
+    one_shot = service._process_bank_statement(text)
+    assert streamed == {**one_shot, "transactions": []}
+
+    with pytest.raises(DocumentTooLargeError):
+        asyncio.run(service.process_bank_statement_stream(body(_split(data, random.Random(2), 33)), len(data) - 1))
+
+
+@pytest.mark.benchmark
+def test_single_pass_is_faster_than_legacy_scans():
+    text = _realistic_statement(random.Random(5), 20000)
+    assert parse_statement(text)["income"] == legacy_extract(text)[0]
+
+    def best_of(fn, runs=5):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn(text)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    legacy = best_of(legacy_extract)
+    current = best_of(parse_statement)
+
+    print(f"\n{len(text) // 1024} KiB statement: legacy {legacy * 1000:.1f} ms, single pass {current * 1000:.1f} ms")
+    assert current < legacy
@@ -0,0 +1,162 @@
+"""TextractPipeline driven by fake_textract replaying recorded block JSON."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from fake_textract import FakeTextractClient
+from statement_parser import parse_statement
+from textract_pipeline import RESULTS_PAGE_SIZE, TextractJobError, TextractPipeline, line_confidence
+
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "textract_bank_statement.json")
+
+
+def _pipeline(client, **kwargs):
+    return TextractPipeline(client, poll_interval=0.001, max_poll_interval=0.005, **kwargs)
+
+
+def _recorded_lines():
+    with open(RECORDING, encoding="utf-8") as f:
+        blocks = json.load(f)["Blocks"]
+    return [block for block in blocks if block["BlockType"] == "LINE"]
+
+
+def _synthetic_recording(pages, lines_per_page, words_per_line=3):
+    """A large document whose LINE and WORD blocks span several results pages."""
+    blocks = []
+    for page in range(1, pages + 1):
+        blocks.append({"BlockType": "PAGE", "Page": page, "Confidence": 99.0})
+        for line in range(lines_per_page):
+            amount = 1000 + page * 100 + line
+            text = "salary credit" if line == 0 else "emi"
+            blocks.append({"BlockType": "LINE", "Page": page, "Text": f"{text} {amount}",
+                           "Confidence": 80.0 + (page + line) % 20})
+            blocks.extend({"BlockType": "WORD", "Page": page, "Text": "w", "Confidence": 50.0}
+                          for _ in range(words_per_line))
+    return {"Blocks": blocks}
+
+
+class TrackingTextract(FakeTextractClient):
+    """Counts jobs between start and their last results page."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.peak = 0
+        self._tracking = threading.Lock()
+
+    def start_document_text_detection(self, DocumentLocation, **kwargs):
+        with self._tracking:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        return super().start_document_text_detection(DocumentLocation, **kwargs)
+
+    def get_document_text_detection(self, JobId, MaxResults=1000, NextToken=None):
+        response = super().get_document_text_detection(JobId, MaxResults, NextToken)
+        if response["JobStatus"] == "SUCCEEDED" and "NextToken" not in response:
+            with self._tracking:
+                self.in_flight -= 1
+        return response
+
+
+def test_extract_text_joins_pages_and_aggregates_line_confidence():
+    client = FakeTextractClient.from_file(RECORDING, in_progress_polls=2)
+    lines = _recorded_lines()
+
+    result = asyncio.run(_pipeline(client).extract_text("bucket", "statement.pdf"))
+
+    assert result["pages"] == 3
+    assert result["extracted_text"] == "\n".join(line["Text"] for line in lines)
+    assert result["lines"] == len(lines)
+    confidences = [line["Confidence"] / 100 for line in lines]
+    assert result["confidence"] == round(sum(confidences) / len(confidences), 4)
+    assert result["min_confidence"] == round(min(confidences), 4)
+    # WORD and PAGE blocks do not count towards line confidence
+    with open(RECORDING, encoding="utf-8") as f:
+        assert line_confidence(json.load(f)["Blocks"]) == {k: result[k] for k in ("lines", "confidence", "min_confidence")}
+
+
+def test_bank_statement_is_parsed_as_pages_arrive():
+    client = FakeTextractClient.from_file(RECORDING)
+    text = "\n".join(line["Text"] for line in _recorded_lines())
+
+    result = asyncio.run(_pipeline(client).parse_bank_statement("bucket", "statement.pdf"))
+
+    expected = parse_statement(text)
+    assert result["pages"] == 3
+    assert result["parsed"] == {**expected, "transactions": []}
+    assert result["parsed"]["income"] == 64000.0
+    assert result["parsed"]["emi"] == 8750.0
+    assert result["ocr"]["lines"] == len(_recorded_lines())
+
+
+def test_pages_spanning_results_pages_stay_whole():
+    recording = _synthetic_recording(pages=6, lines_per_page=150)
+    client = FakeTextractClient(recording, in_progress_polls=0)
+    pipeline = _pipeline(client)
+
+    async def collect():
+        job_id = await pipeline.start_job("bucket", "large.pdf")
+        return [page async for page in pipeline.pages(job_id)]
+
+    pages = asyncio.run(collect())
+
+    assert len(recording["Blocks"]) > 3 * RESULTS_PAGE_SIZE  # several NextToken round trips
+    assert [page["page"] for page in pages] == list(range(1, 7))
+    assert all(page["stats"].lines == 150 for page in pages)
+    assert pages[2]["text"].splitlines()[0] == "salary credit 1300"
+
+
+def test_concurrent_jobs_are_capped():
+    client = TrackingTextract(_synthetic_recording(pages=3, lines_per_page=50), latency_seconds=0.005)
+    pipeline = _pipeline(client, max_concurrent_jobs=2)
+
+    async def main():
+        return await asyncio.gather(*(pipeline.extract_text("bucket", f"doc-{i}.pdf") for i in range(6)))
+
+    results = asyncio.run(main())
+
+    assert all(result["pages"] == 3 for result in results)
+    assert client.peak == 2
+
+
+def test_failed_and_stuck_jobs_raise():
+    class FailingTextract(FakeTextractClient):
+        def get_document_text_detection(self, JobId, MaxResults=1000, NextToken=None):
+            return {"JobStatus": "FAILED", "StatusMessage": "UnsupportedDocumentException"}
+
+    with pytest.raises(TextractJobError, match="UnsupportedDocumentException"):
+        asyncio.run(_pipeline(FailingTextract({"Blocks": []})).extract_text("bucket", "bad.pdf"))
+
+    stuck = FakeTextractClient({"Blocks": []}, in_progress_polls=10 ** 6)
+    with pytest.raises(TextractJobError, match="did not finish"):
+        asyncio.run(_pipeline(stuck, job_timeout=0.05).extract_text("bucket", "slow.pdf"))
+
+
+@pytest.mark.benchmark
+def test_documents_are_processed_concurrently():
+    recording = _synthetic_recording(pages=4, lines_per_page=300)
+    keys = [f"statement-{i}.pdf" for i in range(4)]
+
+    async def sequential(pipeline):
+        return [await pipeline.parse_bank_statement("bucket", key) for key in keys]
+
+    async def concurrent(pipeline):
+        return await asyncio.gather(*(pipeline.parse_bank_statement("bucket", key) for key in keys))
+
+    timings = {}
+    results = {}
+    for name, run in (("sequential", sequential), ("concurrent", concurrent)):
+        pipeline = _pipeline(FakeTextractClient(recording, latency_seconds=0.02), max_concurrent_jobs=4)
+        start = time.perf_counter()
+        results[name] = asyncio.run(run(pipeline))
+        timings[name] = time.perf_counter() - start
+
+    print(f"\n4 statements x 4 pages, 20 ms per Textract call: sequential {timings['sequential'] * 1000:.0f} ms, "
+          f"concurrent {timings['concurrent'] * 1000:.0f} ms")
+    assert results["sequential"] == results["concurrent"]
+    assert timings["concurrent"] < timings["sequential"] * 0.6
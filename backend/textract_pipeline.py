@@ -0,0 +1,207 @@
+"""
+Asynchronous Textract pipeline for multi-page documents
+Starts a text detection job, polls it to completion and pages through the results,
+handing each document page on as soon as its blocks have arrived.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config import settings
+from executors import blocking_pools
+from statement_parser import StatementStreamParser
+
+logger = logging.getLogger(__name__)
+
+RESULTS_PAGE_SIZE = 1000
+
+
+class TextractJobError(Exception):
+    pass
+
+
+class ConfidenceStats:
+    """Per-line OCR confidence aggregated over a page or a whole document (0-1 scale)."""
+
+    def __init__(self):
+        self.lines = 0
+        self.total = 0.0
+        self.minimum: Optional[float] = None
+
+    def add(self, confidence: float) -> None:
+        self.lines += 1
+        self.total += confidence
+        if self.minimum is None or confidence < self.minimum:
+            self.minimum = confidence
+
+    def merge(self, other: "ConfidenceStats") -> None:
+        self.lines += other.lines
+        self.total += other.total
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lines": self.lines,
+            "confidence": round(self.total / self.lines, 4) if self.lines else 0.0,
+            "min_confidence": round(self.minimum, 4) if self.minimum is not None else 0.0
+        }
+
+
+def build_page(page_number: int, line_blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Assemble one page's LINE blocks into text plus confidence stats."""
+    stats = ConfidenceStats()
+    for block in line_blocks:
+        stats.add(block.get("Confidence", 0.0) / 100.0)
+    return {
+        "page": page_number,
+        "text": "\n".join(block.get("Text", "") for block in line_blocks),
+        "stats": stats
+    }
+
+
+def line_confidence(blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Confidence aggregated over every LINE block in a Textract response."""
+    stats = ConfidenceStats()
+    for block in blocks:
+        if block.get("BlockType") == "LINE":
+            stats.add(block.get("Confidence", 0.0) / 100.0)
+    return stats.as_dict()
+
+
+class TextractPipeline:
+    """
+    Job-based Textract text detection.
+
+    Results come back as a NextToken chain, so result pages are fetched one
+    after another; document pages are handed on through a queue of page_buffer
+    pages, which lets parsing overlap the next fetch without letting fetching
+    run unboundedly ahead. At most max_concurrent_jobs documents are in
+    flight at once, to stay inside Textract's concurrent job limit.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 5.0,
+        job_timeout: float = 300.0,
+        max_concurrent_jobs: int = 4,
+        page_buffer: int = 4,
+    ):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.job_timeout = job_timeout
+        self.page_buffer = page_buffer
+        self._jobs = asyncio.Semaphore(max_concurrent_jobs)
+
+    async def _call(self, method: str, **kwargs: Any) -> Dict[str, Any]:
+        return await blocking_pools.run("textract", getattr(self.client, method), **kwargs)
+
+    async def start_job(self, bucket: str, key: str) -> str:
+        params: Dict[str, Any] = {"DocumentLocation": {"S3Object": {"Bucket": bucket, "Name": key}}}
+        if settings.TEXTRACT_SNS_TOPIC_ARN and settings.TEXTRACT_SNS_ROLE_ARN:
+            params["NotificationChannel"] = {
+                "SNSTopicArn": settings.TEXTRACT_SNS_TOPIC_ARN,
+                "RoleArn": settings.TEXTRACT_SNS_ROLE_ARN
+            }
+        response = await self._call("start_document_text_detection", **params)
+        return response["JobId"]
+
+    async def wait_for_job(self, job_id: str) -> Dict[str, Any]:
+        """Poll with backoff until the job leaves IN_PROGRESS; returns the first results page."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.job_timeout
+        interval = self.poll_interval
+
+        while True:
+            response = await self._call("get_document_text_detection", JobId=job_id, MaxResults=RESULTS_PAGE_SIZE)
+            status = response.get("JobStatus")
+            if status in ("SUCCEEDED", "PARTIAL_SUCCESS"):
+                if status == "PARTIAL_SUCCESS":
+                    logger.warning(f"Textract job {job_id} partially succeeded: {response.get('Warnings')}")
+                return response
+            if status == "FAILED":
+                raise TextractJobError(f"Textract job {job_id} failed: {response.get('StatusMessage')}")
+            if loop.time() + interval > deadline:
+                raise TextractJobError(f"Textract job {job_id} did not finish within {self.job_timeout}s")
+
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, self.max_poll_interval)
+
+    async def pages(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield document pages in order, each as soon as all its LINE blocks are in."""
+        response = await self.wait_for_job(job_id)
+        current_page: Optional[int] = None
+        lines: List[Dict[str, Any]] = []
+
+        while True:
+            for block in response.get("Blocks", []):
+                if block.get("BlockType") != "LINE":
+                    continue
+                page_number = block.get("Page", 1)
+                if current_page is not None and page_number != current_page:
+                    yield build_page(current_page, lines)
+                    lines = []
+                current_page = page_number
+                lines.append(block)
+
+            next_token = response.get("NextToken")
+            if not next_token:
+                break
+            response = await self._call(
+                "get_document_text_detection", JobId=job_id, MaxResults=RESULTS_PAGE_SIZE, NextToken=next_token
+            )
+
+        if current_page is not None:
+            yield build_page(current_page, lines)
+
+    async def _buffered_pages(self, bucket: str, key: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run the fetch side as its own task so it keeps going while pages are consumed."""
+        async with self._jobs:
+            job_id = await self.start_job(bucket, key)
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.page_buffer)
+
+            async def produce() -> None:
+                try:
+                    async for page in self.pages(job_id):
+                        await queue.put(page)
+                    await queue.put(None)
+                except Exception as e:
+                    await queue.put(e)
+
+            producer = asyncio.create_task(produce())
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                producer.cancel()
+
+    async def extract_text(self, bucket: str, key: str) -> Dict[str, Any]:
+        """OCR a (multi-page) document into text with aggregated line confidence."""
+        stats = ConfidenceStats()
+        texts = []
+        pages = 0
+        async for page in self._buffered_pages(bucket, key):
+            texts.append(page["text"])
+            stats.merge(page["stats"])
+            pages += 1
+        return {"extracted_text": "\n".join(texts), "pages": pages, **stats.as_dict()}
+
+    async def parse_bank_statement(self, bucket: str, key: str) -> Dict[str, Any]:
+        """OCR a bank statement, feeding each page into the statement parser as it arrives."""
+        parser = StatementStreamParser()
+        stats = ConfidenceStats()
+        pages = 0
+        async for page in self._buffered_pages(bucket, key):
+            parser.feed(page["text"] + "\n")
+            stats.merge(page["stats"])
+            pages += 1
+        return {"parsed": parser.close(), "pages": pages, "ocr": stats.as_dict()}
@@ -0,0 +1,163 @@
+"""
+Verification and scoring of loan applications
+Applies Aadhaar, bank statement and scoring results to loan_applications. Used by
+the synchronous endpoints and by the background verification job, which chains
+OCR -> statement parsing -> Aadhaar check -> scoring.
+"""
+
+import logging
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+from aws_services import s3_service, sagemaker_service, textract_service
+from config import settings
+from database import get_supabase, run_query
+from document_cache import document_result_cache, object_key
+from document_service import document_service
+from job_queue import job_queue
+from model_runtime import model_runtime
+from session_cache import session_state_cache
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_JOB = "verification"
+
+
+class VerificationService:
+
+    async def save_aadhaar_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        supabase = get_supabase()
+        await run_query(supabase.table("loan_applications").update({
+            "aadhaar_verified": result["verified"]
+        }).eq("session_id", session_id))
+        await session_state_cache.invalidate(session_id)
+
+    async def save_bank_statement_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        supabase = get_supabase()
+        await run_query(supabase.table("loan_applications").update({
+            "income_extracted": result["income_extracted"],
+            "emi_detected": result["emi_detected"],
+            "documents_verified": result["status"] != "not_found"
+        }).eq("session_id", session_id))
+        await session_state_cache.invalidate(session_id)
+
+    async def score_application(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Score the application and store the result.
+
+        Returns:
+            Prediction (eligibility_score, eligible, shap_explanation) plus a
+            user-facing message, or None when the session has no application
+        """
+        supabase = get_supabase()
+
+        result = await run_query(supabase.table("loan_applications").select("*").eq("session_id", session_id).maybe_single())
+        if not result.data:
+            return None
+
+        application = result.data
+        # NULL columns score as 0 / "", the same as predict_eligibility_batch's fillna
+        features = {
+            "credit_score": application.get("credit_score") or 0,
+            "income_extracted": application.get("income_extracted") or 0,
+            "loan_amount": application.get("loan_amount") or 0,
+            "emi_detected": application.get("emi_detected") or 0,
+            "employment_type": application.get("employment_type") or ""
+        }
+
+        prediction = await self.predict(features)
+
+        await run_query(supabase.table("loan_applications").update({
+            "eligibility_score": prediction["eligibility_score"],
+            "shap_explanation": prediction["shap_explanation"],
+            "final_status": "eligible" if prediction["eligible"] else "needs_review"
+        }).eq("session_id", session_id))
+
+        message = "Congratulations! You are eligible for the loan." if prediction["eligible"] else \
+                  "Your application needs further review. Consider improving your credit score or reducing existing EMIs."
+
+        return {
+            "eligibility_score": prediction["eligibility_score"],
+            "eligible": prediction["eligible"],
+            "shap_explanation": prediction["shap_explanation"],
+            "message": message
+        }
+
+    async def predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score one applicant on the SageMaker endpoint (micro-batched with concurrent
+        calls) when one is configured, otherwise on the local model.
+        """
+        if sagemaker_service.remote:
+            prediction = await sagemaker_service.predict_eligibility(features)
+            # The endpoint returns a score only; there are no factors to show
+            return {**prediction, "shap_explanation": []}
+        return model_runtime.predict_eligibility(features)
+
+    async def cached_ocr(self, kind: str, key: str, ocr: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run OCR on an uploaded object once per object version: results are cached
+        under the object's ETag, so resubmissions and job retries skip Textract.
+        Failed extractions are not cached.
+        """
+        etag = await s3_service.object_etag(key)
+        if etag is None:
+            return await ocr()
+
+        cache_key = object_key(kind, s3_service.bucket_name, key, etag)
+        result = document_result_cache.get(cache_key)
+        if result is None:
+            result = await ocr()
+            if result.get("success", True):
+                document_result_cache.set(cache_key, result)
+        return result
+
+    async def run_verification_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Job handler: OCR (for documents given as S3 keys) -> statement parsing ->
+        Aadhaar check -> scoring, saving each result to loan_applications.
+        """
+        session_id = job["session_id"]
+        payload = job["payload"]
+        bucket = settings.S3_BUCKET_NAME
+        outcome: Dict[str, Any] = {}
+
+        aadhaar_text = payload.get("aadhaar_text")
+        if payload.get("aadhaar_s3_key"):
+            key = payload["aadhaar_s3_key"]
+            ocr = await self.cached_ocr("aadhaar-ocr", key, lambda: textract_service.extract_document_from_s3(bucket, key))
+            if not ocr["success"]:
+                raise RuntimeError(f"Aadhaar OCR failed: {ocr.get('error')}")
+            aadhaar_text = ocr["extracted_text"]
+
+        statement = None
+        if payload.get("bank_statement_s3_key"):
+            key = payload["bank_statement_s3_key"]
+            ocr = await self.cached_ocr(
+                "bank-statement-ocr", key, lambda: textract_service.parse_bank_statement_from_s3(bucket, key)
+            )
+            statement = document_service.statement_result(ocr["parsed"])
+            statement["ocr_confidence"] = ocr["ocr"]["confidence"]
+        elif payload.get("bank_statement_text") is not None:
+            statement = document_service.process_bank_statement(payload["bank_statement_text"])
+
+        if statement is not None:
+            await self.save_bank_statement_result(session_id, statement)
+            statement.pop("transactions", None)
+            outcome["bank_statement"] = statement
+
+        if aadhaar_text is not None:
+            aadhaar = document_service.verify_aadhaar(aadhaar_text)
+            await self.save_aadhaar_result(session_id, aadhaar)
+            outcome["aadhaar"] = {"verified": aadhaar["verified"], "message": aadhaar["message"]}
+
+        if payload.get("score", True):
+            prediction = await self.score_application(session_id)
+            if prediction is None:
+                raise LookupError(f"No application for session {session_id}")
+            outcome["prediction"] = prediction
+
+        return outcome
+
+
+verification_service = VerificationService()
+job_queue.register(VERIFICATION_JOB, verification_service.run_verification_job)
@@ -0,0 +1,41 @@
+"""
+Standalone job worker
+Runs background jobs without serving HTTP, so workers scale separately from API pods.
+Point API pods and workers at the same store (JOB_STORE=supabase) and set JOB_WORKERS=0
+on the API pods.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from config import settings
+from executors import blocking_pools
+from job_queue import job_queue
+from model_runtime import model_runtime
+import verification_service  # noqa: F401  registers the verification job handler
+
+
+async def main(workers: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    model_runtime.start()
+    job_queue.start(workers)
+    print(f"✅ Job worker running with {workers} workers on the {settings.JOB_STORE} store")
+
+    await stop.wait()
+    await job_queue.stop()
+    blocking_pools.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.workers))
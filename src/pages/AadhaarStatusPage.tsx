@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { CheckCircle, Loader2 } from 'lucide-react';
+import { apiService } from '../services/api';
 import { useToast } from '../components/Toast';
 
 export function AadhaarStatusPage() {
@@ -17,10 +18,34 @@ export function AadhaarStatusPage() {
       return;
     }
 
-    setTimeout(() => {
-      setVerified(true);
-      setLoading(false);
-    }, 2000);
+    const jobId = localStorage.getItem('verification_job_id');
+    if (!jobId) {
+      navigate('/upload-documents');
+      return;
+    }
+
+    let cancelled = false;
+
+    const pollJob = async () => {
+      try {
+        let job = await apiService.getJob(jobId, 10);
+        while (!cancelled && (job.status === 'queued' || job.status === 'running')) {
+          job = await apiService.getJob(jobId, 10);
+        }
+        if (cancelled) return;
+        setVerified(job.status === 'succeeded' && !!job.result?.aadhaar?.verified);
+      } catch (error) {
+        if (!cancelled) showToast('Failed to check verification status', 'error');
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
+
+    pollJob();
+
+    return () => {
+      cancelled = true;
+    };
   }, [navigate, showToast]);
 
   const handleContinue = () => {
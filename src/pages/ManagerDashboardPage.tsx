@@ -4,6 +4,10 @@ import { LogOut, Eye, CheckCircle, XCircle, Loader2, FileText, TrendingUp, Trend
 import { apiService, ApplicationSummary, ApplicationDetail } from '../services/api';
 import { useToast } from '../components/Toast';
 
+const PAGE_SIZE = 50;
+// Statuses a manager can still approve or reject
+const DECIDABLE_STATUSES = ['eligible', 'needs_review'];
+
 export function ManagerDashboardPage() {
   const navigate = useNavigate();
   const { showToast, ToastComponent } = useToast();
@@ -12,6 +16,13 @@ export function ManagerDashboardPage() {
   const [loading, setLoading] = useState(true);
   const [actionLoading, setActionLoading] = useState(false);
   const [managerName, setManagerName] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [statusFilter, setStatusFilter] = useState('');
+  const [createdFrom, setCreatedFrom] = useState('');
+  const [createdTo, setCreatedTo] = useState('');
+  const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set());
+  const [bulkLoading, setBulkLoading] = useState(false);
 
   useEffect(() => {
     const token = localStorage.getItem('manager_token');
@@ -25,19 +36,30 @@ export function ManagerDashboardPage() {
 
     setManagerName(name || 'Manager');
     fetchApplications();
-  }, [navigate, showToast]);
+  }, [navigate, showToast, statusFilter, createdFrom, createdTo]);
 
-  const fetchApplications = async () => {
+  const fetchApplications = async (cursor: string | null = null) => {
     const token = localStorage.getItem('manager_token');
     if (!token) return;
 
+    if (cursor) setLoadingMore(true);
+
     try {
-      const response = await apiService.getApplications(token);
-      setApplications(response.applications);
+      const response = await apiService.getApplications(token, {
+        limit: PAGE_SIZE,
+        cursor,
+        status: statusFilter,
+        created_from: createdFrom ? new Date(`${createdFrom}T00:00:00`).toISOString() : undefined,
+        created_to: createdTo ? new Date(`${createdTo}T23:59:59.999`).toISOString() : undefined,
+      });
+      setApplications((current) => (cursor ? [...current, ...response.applications] : response.applications));
+      if (!cursor) setSelectedIds(new Set());
+      setNextCursor(response.next_cursor);
     } catch (error) {
       showToast('Failed to fetch applications', 'error');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -95,7 +117,60 @@ export function ManagerDashboardPage() {
     }
   };
 
-  const handleLogout = () => {
+  const decidableApps = applications.filter((app) => DECIDABLE_STATUSES.includes(app.final_status));
+  const allSelected = decidableApps.length > 0 && decidableApps.every((app) => selectedIds.has(app.id));
+
+  const toggleSelected = (applicationId: string) => {
+    setSelectedIds((current) => {
+      const next = new Set(current);
+      if (next.has(applicationId)) {
+        next.delete(applicationId);
+      } else {
+        next.add(applicationId);
+      }
+      return next;
+    });
+  };
+
+  const toggleSelectAll = () => {
+    setSelectedIds(allSelected ? new Set() : new Set(decidableApps.map((app) => app.id)));
+  };
+
+  const handleBulkDecision = async (decision: 'approved' | 'rejected') => {
+    const token = localStorage.getItem('manager_token');
+    if (!token || selectedIds.size === 0) return;
+
+    setBulkLoading(true);
+
+    try {
+      // expected_updated_at makes the server skip applications changed since this page loaded
+      const response = await apiService.decideApplications(
+        applications
+          .filter((app) => selectedIds.has(app.id))
+          .map((app) => ({ application_id: app.id, decision, expected_updated_at: app.updated_at })),
+        token
+      );
+      const skipped = response.conflicts + response.not_found;
+      showToast(
+        skipped > 0
+          ? `${response.applied} ${decision}, ${skipped} skipped because they changed since you loaded them`
+          : `${response.applied} applications ${decision}`,
+        skipped > 0 ? 'info' : 'success'
+      );
+      fetchApplications();
+    } catch (error) {
+      showToast(`Failed to ${decision === 'approved' ? 'approve' : 'reject'} applications`, 'error');
+    } finally {
+      setBulkLoading(false);
+    }
+  };
+
+  const handleLogout = async () => {
+    const token = localStorage.getItem('manager_token');
+    if (token) {
+      // Revoke server-side; sign out locally even if the request fails
+      await apiService.managerLogout(token).catch(() => undefined);
+    }
     localStorage.removeItem('manager_token');
     localStorage.removeItem('manager_name');
     localStorage.removeItem('manager_email');
@@ -159,14 +234,81 @@ export function ManagerDashboardPage() {
 
       <div className="max-w-7xl mx-auto px-4 py-8">
         <div className="bg-white rounded-lg shadow-md overflow-hidden">
-          <div className="px-6 py-4 border-b">
+          <div className="px-6 py-4 border-b flex flex-wrap items-center justify-between gap-4">
             <h2 className="text-xl font-bold text-gray-900">Loan Applications</h2>
+            <div className="flex flex-wrap items-center gap-3">
+              <select
+                value={statusFilter}
+                onChange={(e) => setStatusFilter(e.target.value)}
+                className="px-3 py-2 border border-gray-300 rounded-lg text-sm"
+              >
+                <option value="">All statuses</option>
+                <option value="pending">Pending</option>
+                <option value="eligible">Eligible</option>
+                <option value="needs_review">Needs review</option>
+                <option value="approved">Approved</option>
+                <option value="rejected">Rejected</option>
+              </select>
+              <input
+                type="date"
+                value={createdFrom}
+                onChange={(e) => setCreatedFrom(e.target.value)}
+                className="px-3 py-2 border border-gray-300 rounded-lg text-sm"
+              />
+              <span className="text-sm text-gray-500">to</span>
+              <input
+                type="date"
+                value={createdTo}
+                onChange={(e) => setCreatedTo(e.target.value)}
+                className="px-3 py-2 border border-gray-300 rounded-lg text-sm"
+              />
+            </div>
           </div>
 
+          {selectedIds.size > 0 && (
+            <div className="px-6 py-3 border-b bg-blue-50 flex flex-wrap items-center justify-between gap-3">
+              <span className="text-sm font-medium text-blue-900">{selectedIds.size} selected</span>
+              <div className="flex items-center gap-3">
+                <button
+                  onClick={() => handleBulkDecision('approved')}
+                  disabled={bulkLoading}
+                  className="flex items-center gap-2 px-4 py-2 bg-green-600 text-white rounded-lg text-sm font-semibold hover:bg-green-700 disabled:bg-gray-300 disabled:cursor-not-allowed"
+                >
+                  {bulkLoading ? <Loader2 className="w-4 h-4 animate-spin" /> : <CheckCircle className="w-4 h-4" />}
+                  Approve selected
+                </button>
+                <button
+                  onClick={() => handleBulkDecision('rejected')}
+                  disabled={bulkLoading}
+                  className="flex items-center gap-2 px-4 py-2 bg-red-600 text-white rounded-lg text-sm font-semibold hover:bg-red-700 disabled:bg-gray-300 disabled:cursor-not-allowed"
+                >
+                  {bulkLoading ? <Loader2 className="w-4 h-4 animate-spin" /> : <XCircle className="w-4 h-4" />}
+                  Reject selected
+                </button>
+                <button
+                  onClick={() => setSelectedIds(new Set())}
+                  disabled={bulkLoading}
+                  className="text-sm text-gray-600 hover:text-gray-900"
+                >
+                  Clear
+                </button>
+              </div>
+            </div>
+          )}
+
           <div className="overflow-x-auto">
             <table className="w-full">
               <thead className="bg-gray-50">
                 <tr>
+                  <th className="px-6 py-3 text-left">
+                    <input
+                      type="checkbox"
+                      checked={allSelected}
+                      onChange={toggleSelectAll}
+                      disabled={decidableApps.length === 0}
+                      aria-label="Select all undecided applications"
+                    />
+                  </th>
                   <th className="px-6 py-3 text-left text-xs font-semibold text-gray-700 uppercase tracking-wider">
                     Name
                   </th>
@@ -190,13 +332,22 @@ export function ManagerDashboardPage() {
               <tbody className="bg-white divide-y divide-gray-200">
                 {applications.length === 0 ? (
                   <tr>
-                    <td colSpan={6} className="px-6 py-8 text-center text-gray-500">
+                    <td colSpan={7} className="px-6 py-8 text-center text-gray-500">
                       No applications found
                     </td>
                   </tr>
                 ) : (
                   applications.map((app) => (
                     <tr key={app.id} className="hover:bg-gray-50">
+                      <td className="px-6 py-4 whitespace-nowrap">
+                        <input
+                          type="checkbox"
+                          checked={selectedIds.has(app.id)}
+                          onChange={() => toggleSelected(app.id)}
+                          disabled={!DECIDABLE_STATUSES.includes(app.final_status)}
+                          aria-label={`Select ${app.name || 'application'}`}
+                        />
+                      </td>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div className="text-sm font-medium text-gray-900">
                           {app.name || 'N/A'}
@@ -235,6 +386,19 @@ export function ManagerDashboardPage() {
               </tbody>
             </table>
           </div>
+
+          {nextCursor && (
+            <div className="px-6 py-4 border-t flex justify-center">
+              <button
+                onClick={() => fetchApplications(nextCursor)}
+                disabled={loadingMore}
+                className="flex items-center gap-2 px-4 py-2 text-blue-600 hover:text-blue-800 disabled:text-gray-400"
+              >
+                {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       </div>
 
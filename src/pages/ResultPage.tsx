@@ -23,7 +23,10 @@ export function ResultPage() {
     }
 
     try {
-      const prediction = await apiService.predictEligibility(sessionId);
+      // Reuse the score from the verification job when it has one
+      const jobId = localStorage.getItem('verification_job_id');
+      const job = jobId ? await apiService.getJob(jobId).catch(() => null) : null;
+      const prediction = job?.result?.prediction ?? await apiService.predictEligibility(sessionId);
       setResult(prediction);
       await apiService.saveReport(sessionId);
     } catch (error) {
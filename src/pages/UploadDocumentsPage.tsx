@@ -40,12 +40,17 @@ export function UploadDocumentsPage() {
 
     try {
       const aadhaarText = `Aadhaar document uploaded: ${aadhaarFile.name}. Government of India. Aadhaar Number: 1234 5678 9012`;
-      await apiService.verifyAadhaar(sessionId, aadhaarText);
-
       const bankText = `Bank Statement uploaded: ${bankStatementFile.name}. Salary Credit: ₹55000. EMI Debit: ₹12000.`;
-      await apiService.processBankStatement(sessionId, bankText);
 
-      showToast('Documents verified successfully!', 'success');
+      // Verification and scoring run as one background job; the status page polls it
+      const job = await apiService.createVerificationJob({
+        session_id: sessionId,
+        aadhaar_text: aadhaarText,
+        bank_statement_text: bankText,
+      });
+      localStorage.setItem('verification_job_id', job.job_id);
+
+      showToast('Documents submitted for verification!', 'success');
 
       setTimeout(() => {
         navigate('/verify-aadhaar');
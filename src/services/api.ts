@@ -26,8 +26,11 @@ export interface AadhaarVerifyResponse {
 }
 
 export interface BankStatementResponse {
-  income_extracted: number;
-  emi_detected: number;
+  income_extracted: number | null;
+  emi_detected: number | null;
+  status: 'complete' | 'partial' | 'not_found';
+  confidence: number;
+  transactions: Array<{ type: string; amount: number }>;
   message: string;
 }
 
@@ -58,6 +61,40 @@ export interface ApplicationSummary {
   credit_score?: number;
   final_status: string;
   created_at: string;
+  updated_at?: string;
+}
+
+export interface ApplicationPage {
+  applications: ApplicationSummary[];
+  next_cursor: string | null;
+}
+
+export interface ApplicationListParams {
+  limit?: number;
+  cursor?: string | null;
+  status?: string;
+  created_from?: string;
+  created_to?: string;
+}
+
+export interface DecisionItem {
+  application_id: string;
+  decision: 'approved' | 'rejected';
+  expected_updated_at?: string;
+}
+
+export interface DecisionResult {
+  application_id: string;
+  outcome: 'applied' | 'conflict' | 'not_found';
+  final_status: string | null;
+  updated_at: string | null;
+}
+
+export interface BulkDecisionResponse {
+  results: DecisionResult[];
+  applied: number;
+  conflicts: number;
+  not_found: number;
 }
 
 export interface ApplicationDetail {
@@ -81,6 +118,32 @@ export interface ApplicationDetail {
   updated_at: string;
 }
 
+export interface VerificationJobRequest {
+  session_id: string;
+  aadhaar_text?: string;
+  aadhaar_s3_key?: string;
+  bank_statement_text?: string;
+  bank_statement_s3_key?: string;
+  score?: boolean;
+}
+
+export interface JobResponse {
+  job_id: string;
+  type: string;
+  session_id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  attempts: number;
+  result?: {
+    aadhaar?: { verified: boolean; message: string };
+    bank_statement?: Omit<BankStatementResponse, 'transactions'>;
+    prediction?: PredictResponse;
+  } | null;
+  error?: string | null;
+  created_at: string;
+  updated_at: string;
+  finished_at?: string | null;
+}
+
 export const apiService = {
   startSession: async (channel: string): Promise<SessionResponse> => {
     const response = await api.post('/start-session', { channel });
@@ -107,6 +170,16 @@ export const apiService = {
     return response.data;
   },
 
+  createVerificationJob: async (request: VerificationJobRequest): Promise<JobResponse> => {
+    const response = await api.post('/jobs/verification', request);
+    return response.data;
+  },
+
+  getJob: async (job_id: string, wait = 0): Promise<JobResponse> => {
+    const response = await api.get(`/jobs/${job_id}`, { params: wait ? { wait } : {} });
+    return response.data;
+  },
+
   saveReport: async (session_id: string): Promise<void> => {
     await api.post('/save-report', { session_id });
   },
@@ -116,8 +189,18 @@ export const apiService = {
     return response.data;
   },
 
-  getApplications: async (token: string): Promise<{ applications: ApplicationSummary[] }> => {
+  managerLogout: async (token: string): Promise<void> => {
+    await api.post('/manager/logout', {}, {
+      headers: { Authorization: `Bearer ${token}` }
+    });
+  },
+
+  getApplications: async (token: string, params: ApplicationListParams = {}): Promise<ApplicationPage> => {
+    const query = Object.fromEntries(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    );
     const response = await api.get('/manager/applications', {
+      params: query,
       headers: { Authorization: `Bearer ${token}` }
     });
     return response.data;
@@ -143,4 +226,12 @@ export const apiService = {
       { headers: { Authorization: `Bearer ${token}` } }
     );
   },
+
+  decideApplications: async (decisions: DecisionItem[], token: string): Promise<BulkDecisionResponse> => {
+    const response = await api.post('/manager/decisions',
+      { decisions },
+      { headers: { Authorization: `Bearer ${token}` } }
+    );
+    return response.data;
+  },
 };
@@ -0,0 +1,42 @@
+/*
+  # Single round-trip chat turn commit
+
+  1. New Functions
+    - `commit_chat_turn(p_session_id, p_user_message, p_assistant_message, p_updates)`
+      - inserts the user and assistant chat_history rows in one statement
+      - applies the collected application field from `p_updates` (jsonb) to
+        loan_applications in the same transaction
+      - only name, income_claimed, loan_amount, employment_type and credit_score
+        can be updated through it
+*/
+
+CREATE OR REPLACE FUNCTION commit_chat_turn(
+  p_session_id text,
+  p_user_message text,
+  p_assistant_message text,
+  p_updates jsonb DEFAULT '{}'::jsonb
+)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_ts timestamptz := clock_timestamp();
+BEGIN
+  -- The assistant row is stamped after the user row so history always sorts in order
+  INSERT INTO chat_history (session_id, role, message, timestamp)
+  VALUES
+    (p_session_id, 'user', p_user_message, v_ts),
+    (p_session_id, 'assistant', p_assistant_message, v_ts + interval '1 microsecond');
+
+  IF p_updates IS NOT NULL AND p_updates <> '{}'::jsonb THEN
+    UPDATE loan_applications
+    SET
+      name = CASE WHEN p_updates ? 'name' THEN p_updates->>'name' ELSE name END,
+      income_claimed = CASE WHEN p_updates ? 'income_claimed' THEN (p_updates->>'income_claimed')::numeric ELSE income_claimed END,
+      loan_amount = CASE WHEN p_updates ? 'loan_amount' THEN (p_updates->>'loan_amount')::numeric ELSE loan_amount END,
+      employment_type = CASE WHEN p_updates ? 'employment_type' THEN p_updates->>'employment_type' ELSE employment_type END,
+      credit_score = CASE WHEN p_updates ? 'credit_score' THEN (p_updates->>'credit_score')::integer ELSE credit_score END
+    WHERE session_id = p_session_id;
+  END IF;
+END;
+$$;
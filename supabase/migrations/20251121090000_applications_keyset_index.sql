@@ -0,0 +1,15 @@
+/*
+  # Keyset pagination indexes for the manager dashboard
+
+  1. New Indexes
+    - `idx_loan_applications_created_at_id` on (created_at DESC, id DESC)
+      serves the newest-first listing and its (created_at, id) cursor condition
+    - `idx_loan_applications_status_created_at_id` on
+      (final_status, created_at DESC, id DESC) serves the same listing filtered by status
+*/
+
+CREATE INDEX IF NOT EXISTS idx_loan_applications_created_at_id
+  ON loan_applications (created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_loan_applications_status_created_at_id
+  ON loan_applications (final_status, created_at DESC, id DESC);
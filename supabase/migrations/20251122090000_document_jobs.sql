@@ -0,0 +1,90 @@
+/*
+  # Background job queue
+
+  1. New Tables
+    - `document_jobs`
+      - `id` (uuid, primary key) - job identifier returned to clients
+      - `type` (text) - job handler name, e.g. `verification`
+      - `session_id` (text) - loan application session the job works on
+      - `payload` (jsonb) - handler input
+      - `status` (text) - queued/running/succeeded/failed
+      - `result` (jsonb) - handler output once succeeded
+      - `error` (text) - last error message
+      - `attempts` (integer) - times the job has been claimed
+      - `max_attempts` (integer) - attempts before the job is marked failed
+      - `claimed_by` (text) - worker currently holding the job
+      - `lease_expires_at` (timestamptz) - a running job past its lease can be reclaimed
+      - `run_after` (timestamptz) - earliest time the job may be claimed (retry backoff)
+      - `created_at`, `updated_at`, `finished_at` (timestamptz)
+
+  2. New Functions
+    - `claim_document_job(p_worker_id, p_lease_seconds)`
+      - atomically claims the oldest runnable job (queued, or running with an
+        expired lease) using FOR UPDATE SKIP LOCKED, so any number of workers
+        can poll concurrently without claiming the same job
+
+  3. Security
+    - RLS enabled; service role manages all rows
+*/
+
+CREATE TABLE IF NOT EXISTS document_jobs (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  type text NOT NULL,
+  session_id text NOT NULL,
+  payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+  status text NOT NULL DEFAULT 'queued',
+  result jsonb,
+  error text,
+  attempts integer NOT NULL DEFAULT 0,
+  max_attempts integer NOT NULL DEFAULT 3,
+  claimed_by text,
+  lease_expires_at timestamptz,
+  run_after timestamptz NOT NULL DEFAULT now(),
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now(),
+  finished_at timestamptz
+);
+
+-- Serves the claim query: runnable jobs in age order
+CREATE INDEX IF NOT EXISTS idx_document_jobs_runnable
+  ON document_jobs(status, run_after, created_at)
+  WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_document_jobs_session_id ON document_jobs(session_id);
+
+ALTER TABLE document_jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage document jobs"
+  ON document_jobs
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+CREATE OR REPLACE FUNCTION claim_document_job(
+  p_worker_id text,
+  p_lease_seconds integer
+)
+RETURNS SETOF document_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE document_jobs
+  SET
+    status = 'running',
+    attempts = document_jobs.attempts + 1,
+    claimed_by = p_worker_id,
+    lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+    updated_at = now()
+  WHERE document_jobs.id = (
+    SELECT j.id
+    FROM document_jobs j
+    WHERE (j.status = 'queued' AND j.run_after <= now())
+       OR (j.status = 'running' AND j.lease_expires_at < now())
+    ORDER BY j.created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING document_jobs.*;
+END;
+$$;
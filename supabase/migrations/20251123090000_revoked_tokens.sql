@@ -0,0 +1,35 @@
+/*
+  # Manager token revocation list
+
+  1. New Tables
+    - `revoked_tokens`
+      - `token_id` (text, primary key) - the token's `jti` claim
+      - `manager_id` (uuid) - manager the token was issued to
+      - `expires_at` (timestamptz) - token expiry; rows past it no longer matter
+      - `revoked_at` (timestamptz)
+
+  2. Notes
+    - API workers cache verified tokens and re-read unexpired rows periodically,
+      so a logout on one worker is honoured by all of them
+    - Expired rows can be deleted at any time
+
+  3. Security
+    - RLS enabled; service role manages all rows
+*/
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+  token_id text PRIMARY KEY,
+  manager_id uuid REFERENCES managers(id) ON DELETE CASCADE,
+  expires_at timestamptz NOT NULL,
+  revoked_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens(expires_at);
+
+ALTER TABLE revoked_tokens ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage revoked tokens"
+  ON revoked_tokens
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
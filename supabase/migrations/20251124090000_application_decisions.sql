@@ -0,0 +1,136 @@
+/*
+  # Bulk manager decisions with an audit trail
+
+  1. New Tables
+    - `application_decisions`
+      - `id` (uuid, primary key)
+      - `application_id` (uuid) - decided application
+      - `manager_id` (uuid) - manager who made the decision
+      - `previous_status` (text) - final_status before the decision
+      - `new_status` (text) - approved/rejected
+      - `decided_at` (timestamptz)
+
+  2. New Triggers
+    - `loan_applications_set_updated_at` stamps `updated_at = now()` on every update
+      of loan_applications, so it changes whenever scoring, verification or the chat
+      touches an application and can be used as a version for optimistic concurrency
+
+  3. New Functions
+    - `decide_applications(p_manager_id, p_decisions)`
+      - `p_decisions` is a jsonb array of {id, status, expected_updated_at}; when an
+        id appears more than once the last entry wins
+      - applies every decision in one UPDATE; a row whose updated_at no longer matches
+        expected_updated_at (someone changed it since the manager loaded it) is left
+        alone and reported as a conflict
+      - writes one application_decisions row per applied decision in the same statement
+      - returns one row per requested id with outcome applied, conflict or not_found
+
+  4. Security
+    - RLS enabled; service role manages all rows
+*/
+
+CREATE TABLE IF NOT EXISTS application_decisions (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  application_id uuid NOT NULL REFERENCES loan_applications(id) ON DELETE CASCADE,
+  manager_id uuid REFERENCES managers(id) ON DELETE SET NULL,
+  previous_status text,
+  new_status text NOT NULL,
+  decided_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_application_decisions_application_id
+  ON application_decisions(application_id, decided_at DESC);
+CREATE INDEX IF NOT EXISTS idx_application_decisions_manager_id
+  ON application_decisions(manager_id, decided_at DESC);
+
+ALTER TABLE application_decisions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can manage application decisions"
+  ON application_decisions
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at := now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS loan_applications_set_updated_at ON loan_applications;
+CREATE TRIGGER loan_applications_set_updated_at
+  BEFORE UPDATE ON loan_applications
+  FOR EACH ROW
+  EXECUTE FUNCTION set_updated_at();
+
+CREATE OR REPLACE FUNCTION decide_applications(
+  p_manager_id uuid,
+  p_decisions jsonb
+)
+RETURNS TABLE (
+  application_id uuid,
+  session_id text,
+  final_status text,
+  updated_at timestamptz,
+  outcome text
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_ts timestamptz := clock_timestamp();
+BEGIN
+  RETURN QUERY
+  WITH decisions AS (
+    -- One row per id (the last one sent): UPDATE ... FROM with duplicate ids would
+    -- pick a row arbitrarily
+    SELECT DISTINCT ON (d.id) d.id, d.status, d.expected_updated_at
+    FROM ROWS FROM (
+      jsonb_to_recordset(p_decisions) AS (id uuid, status text, expected_updated_at timestamptz)
+    ) WITH ORDINALITY AS d(id, status, expected_updated_at, ord)
+    WHERE d.status IN ('approved', 'rejected')
+    ORDER BY d.id, d.ord DESC
+  ),
+  -- Lock matching rows; under READ COMMITTED the updated_at check is re-evaluated
+  -- against the latest row version if another transaction got there first
+  current_rows AS (
+    SELECT la.id, la.final_status AS previous_status
+    FROM loan_applications la
+    JOIN decisions d ON d.id = la.id
+    WHERE d.expected_updated_at IS NULL OR la.updated_at = d.expected_updated_at
+    FOR UPDATE OF la
+  ),
+  applied AS (
+    UPDATE loan_applications la
+    SET final_status = d.status  -- updated_at is set by loan_applications_set_updated_at
+    FROM decisions d
+    JOIN current_rows c ON c.id = d.id
+    WHERE la.id = d.id
+    RETURNING la.id, la.session_id, la.final_status, la.updated_at, c.previous_status
+  ),
+  audit AS (
+    INSERT INTO application_decisions (application_id, manager_id, previous_status, new_status, decided_at)
+    SELECT a.id, p_manager_id, a.previous_status, a.final_status, v_ts
+    FROM applied a
+  )
+  -- loan_applications here still shows the pre-update snapshot, i.e. the
+  -- current values of rows that were not applied
+  SELECT
+    d.id,
+    COALESCE(a.session_id, la.session_id),
+    COALESCE(a.final_status, la.final_status),
+    COALESCE(a.updated_at, la.updated_at),
+    CASE
+      WHEN a.id IS NOT NULL THEN 'applied'
+      WHEN la.id IS NULL THEN 'not_found'
+      ELSE 'conflict'
+    END
+  FROM decisions d
+  LEFT JOIN applied a ON a.id = d.id
+  LEFT JOIN loan_applications la ON la.id = d.id;
+END;
+$$;
@@ -0,0 +1,40 @@
+/*
+  # Conditional write-back for bulk re-scoring
+
+  1. New Functions
+    - `apply_rescores(p_updates)`
+      - `p_updates` is a jsonb array of {id, eligibility_score, shap_explanation,
+        final_status, expected_updated_at} built from one page of rescore_service
+      - updates a row only while its final_status is still pending, eligible or
+        needs_review and its updated_at still equals expected_updated_at, so a manager
+        decision (or any other change) made after the page was read is never
+        overwritten; updated_at is bumped by loan_applications_set_updated_at
+      - returns the ids that were updated; every other id in the page was skipped
+*/
+
+CREATE OR REPLACE FUNCTION apply_rescores(p_updates jsonb)
+RETURNS TABLE (application_id uuid)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+  RETURN QUERY
+  -- Under READ COMMITTED the WHERE clause is re-checked against the latest row
+  -- version when a concurrent decision holds the row lock, so it skips that row
+  UPDATE loan_applications la
+  SET eligibility_score = u.eligibility_score,
+      shap_explanation = u.shap_explanation,
+      final_status = u.final_status
+  FROM jsonb_to_recordset(p_updates) AS u(
+    id uuid,
+    eligibility_score numeric,
+    shap_explanation jsonb,
+    final_status text,
+    expected_updated_at timestamptz
+  )
+  WHERE la.id = u.id
+    AND la.final_status IN ('pending', 'eligible', 'needs_review')
+    AND la.updated_at IS NOT DISTINCT FROM u.expected_updated_at
+  RETURNING la.id;
+END;
+$$;
@@ -0,0 +1,66 @@
+/*
+  # Versioned chat turn commit
+
+  1. Changed Functions
+    - `commit_chat_turn(p_session_id, p_user_message, p_assistant_message, p_updates,
+      p_expected_updated_at)`
+      - `p_expected_updated_at` is the loan_applications.updated_at the caller's
+        session state was read at; when it is given and no longer matches, nothing
+        is written and `applied` is false, so a worker holding stale cached state
+        reloads the row instead of writing a field onto the wrong step
+      - returns {"applied": bool, "updated_at": timestamptz} with the row's
+        updated_at after the turn (bumped by loan_applications_set_updated_at when
+        a field was applied); null when the session has no application
+*/
+
+DROP FUNCTION IF EXISTS commit_chat_turn(text, text, text, jsonb);
+
+CREATE OR REPLACE FUNCTION commit_chat_turn(
+  p_session_id text,
+  p_user_message text,
+  p_assistant_message text,
+  p_updates jsonb DEFAULT '{}'::jsonb,
+  p_expected_updated_at timestamptz DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_ts timestamptz := clock_timestamp();
+  v_updated_at timestamptz;
+BEGIN
+  -- Lock the application so the version cannot change between the check and the write
+  SELECT updated_at INTO v_updated_at
+  FROM loan_applications
+  WHERE session_id = p_session_id
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+
+  IF p_expected_updated_at IS NOT NULL AND v_updated_at IS DISTINCT FROM p_expected_updated_at THEN
+    RETURN jsonb_build_object('applied', false, 'updated_at', v_updated_at);
+  END IF;
+
+  -- The assistant row is stamped after the user row so history always sorts in order
+  INSERT INTO chat_history (session_id, role, message, timestamp)
+  VALUES
+    (p_session_id, 'user', p_user_message, v_ts),
+    (p_session_id, 'assistant', p_assistant_message, v_ts + interval '1 microsecond');
+
+  IF p_updates IS NOT NULL AND p_updates <> '{}'::jsonb THEN
+    UPDATE loan_applications
+    SET
+      name = CASE WHEN p_updates ? 'name' THEN p_updates->>'name' ELSE name END,
+      income_claimed = CASE WHEN p_updates ? 'income_claimed' THEN (p_updates->>'income_claimed')::numeric ELSE income_claimed END,
+      loan_amount = CASE WHEN p_updates ? 'loan_amount' THEN (p_updates->>'loan_amount')::numeric ELSE loan_amount END,
+      employment_type = CASE WHEN p_updates ? 'employment_type' THEN p_updates->>'employment_type' ELSE employment_type END,
+      credit_score = CASE WHEN p_updates ? 'credit_score' THEN (p_updates->>'credit_score')::integer ELSE credit_score END
+    WHERE session_id = p_session_id
+    RETURNING updated_at INTO v_updated_at;
+  END IF;
+
+  RETURN jsonb_build_object('applied', true, 'updated_at', v_updated_at);
+END;
+$$;